@@ -1,18 +1,38 @@
 # Importaciones
-from typing import List
+from datetime import datetime
+from typing import List, Literal
 
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Query, Request, Response
+from fastapi.responses import StreamingResponse
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from database.connection import obtener_db
+from api.usuario import requerir_rol
+from database.connection import obtener_db_async, obtener_db_lectura
+from models.Asistencia import EstadoAsistencia
+from models.Usuario import RolUsuario
 from schemas.asistencia import CrearAsistencia, RespuestaAsistencia
+from schemas.usuario import UsuarioPrincipal
+from services import respuesta_rapida
 from services.asistencia_service import (
-    actualizar_asistencia_service,
-    crear_asistencia_service,
-    eliminar_asistencia_service,
-    obtener_asistencia_id_service,
-    obtener_asistencia_service,
+    CAMPOS_RESPUESTA_ASISTENCIA,
+    actualizar_asistencia_service_async,
+    crear_asistencia_service_async,
+    eliminar_asistencia_service_async,
+    exportar_asistencias_service,
+    obtener_asistencia_filas_service_async,
+    obtener_asistencia_id_service_async,
+    obtener_asistencia_service_async,
 )
+from services.paginacion import CABECERA_CURSOR, LIMITE_MAXIMO, siguiente_cursor
+from services.respuesta_rapida import respuesta_filas
+from services.version_cambio_service import (
+    AMBITO_ASISTENCIAS,
+    ambito_asistencias_clase,
+    comprobar_version_async,
+)
+
+# Tipo de contenido de cada formato de exportación
+TIPOS_EXPORTACION = {"csv": "text/csv; charset=utf-8", "ndjson": "application/x-ndjson"}
 
 # Rutas de asistencia
 router = APIRouter(prefix="/asistencias", tags=["Asistencias"])
@@ -20,35 +40,99 @@ router = APIRouter(prefix="/asistencias", tags=["Asistencias"])
 
 # Ruta para crear una asistencia
 @router.post("/", response_model=RespuestaAsistencia)
-def crear_asistencia(asistencia: CrearAsistencia, db: Session = Depends(obtener_db)):
-    return crear_asistencia_service(db, asistencia)
+async def crear_asistencia(
+    asistencia: CrearAsistencia, db: AsyncSession = Depends(obtener_db_async)
+):
+    return await crear_asistencia_service_async(db, asistencia)
 
 
 # Ruta para obtener lista de asistencias (con filtros opcionales)
 @router.get("/", response_model=List[RespuestaAsistencia])
-def lista_asistencias(
+async def lista_asistencias(
+    request: Request,
+    response: Response,
     claseId: str | None = None,
     usuarioId: str | None = None,
-    db: Session = Depends(obtener_db),
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=LIMITE_MAXIMO),
+    desde: datetime | None = None,
+    hasta: datetime | None = None,
+    estado: EstadoAsistencia | None = None,
+    profesorId: str | None = None,
+    db: AsyncSession = Depends(obtener_db_lectura),
 ):
-    return obtener_asistencia_service(db, id_clase=claseId, id_usuario=usuarioId)
+    # 304 si el cliente ya tiene la versión actual, sin ejecutar la consulta
+    ambito = ambito_asistencias_clase(claseId) if claseId else AMBITO_ASISTENCIAS
+    if no_modificada := await comprobar_version_async(db, request, response, ambito):
+        return no_modificada
+
+    if respuesta_rapida.RESPUESTA_RAPIDA:
+        obtener = obtener_asistencia_filas_service_async
+    else:
+        obtener = obtener_asistencia_service_async
+
+    asistencias = await obtener(
+        db,
+        id_clase=claseId,
+        id_usuario=usuarioId,
+        limit=limit,
+        cursor=cursor,
+        desde=desde,
+        hasta=hasta,
+        estado=estado,
+        id_profesor=profesorId,
+    )
+
+    if siguiente := siguiente_cursor(asistencias, limit):
+        response.headers[CABECERA_CURSOR] = siguiente
+
+    if respuesta_rapida.RESPUESTA_RAPIDA:
+        return respuesta_filas(CAMPOS_RESPUESTA_ASISTENCIA, asistencias, response)
+
+    return asistencias
+
+
+# Ruta para exportar asistencias (declarada antes de /{id_asistencia})
+@router.get("/exportar")
+async def exportar_asistencias(
+    formato: Literal["csv", "ndjson"] = "csv",
+    claseId: str | None = None,
+    usuarioId: str | None = None,
+    desde: datetime | None = None,
+    hasta: datetime | None = None,
+    db: AsyncSession = Depends(obtener_db_lectura),
+    admin: UsuarioPrincipal = Depends(requerir_rol(RolUsuario.admin)),
+):
+    return StreamingResponse(
+        exportar_asistencias_service(db, formato, claseId, usuarioId, desde, hasta),
+        media_type=TIPOS_EXPORTACION[formato],
+        headers={
+            "Content-Disposition": f'attachment; filename="asistencias.{formato}"'
+        },
+    )
 
 
 # Ruta para obtener una asistencia por ID
 @router.get("/{id_asistencia}", response_model=RespuestaAsistencia)
-def obtener_asistencia(id_asistencia: str, db: Session = Depends(obtener_db)):
-    return obtener_asistencia_id_service(db, id_asistencia)
+async def obtener_asistencia(
+    id_asistencia: str, db: AsyncSession = Depends(obtener_db_lectura)
+):
+    return await obtener_asistencia_id_service_async(db, id_asistencia)
 
 
 # Ruta para actualizar una asistencia
 @router.put("/{id_asistencia}", response_model=RespuestaAsistencia)
-def actualizar_asistencia(
-    id_asistencia: str, asistencia: CrearAsistencia, db: Session = Depends(obtener_db)
+async def actualizar_asistencia(
+    id_asistencia: str,
+    asistencia: CrearAsistencia,
+    db: AsyncSession = Depends(obtener_db_async),
 ):
-    return actualizar_asistencia_service(db, id_asistencia, asistencia)
+    return await actualizar_asistencia_service_async(db, id_asistencia, asistencia)
 
 
 # Ruta para eliminar una asistencia
 @router.delete("/{id_asistencia}", status_code=204)
-def eliminar_asistencia(id_asistencia: str, db: Session = Depends(obtener_db)):
-    eliminar_asistencia_service(db, id_asistencia)
+async def eliminar_asistencia(
+    id_asistencia: str, db: AsyncSession = Depends(obtener_db_async)
+):
+    await eliminar_asistencia_service_async(db, id_asistencia)
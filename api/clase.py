@@ -1,20 +1,41 @@
 # Importaciones
+from datetime import date, datetime
 from typing import List
 
-from fastapi import APIRouter, Depends
-from sqlmodel import Session
+from fastapi import APIRouter, Depends, Query, Request, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from api.usuario import requerir_rol
-from database.connection import obtener_db
-from models.Usuario import RolUsuario, Usuario
-from schemas.clase import CrearClase, RespuestaClase
+from database.connection import obtener_db_async, obtener_db_lectura
+from models.Usuario import RolUsuario
+from schemas.asistencia import (
+    CrearAsistenciaLote,
+    EstadisticasAsistencia,
+    MarcarAsistencia,
+    RespuestaAsistencia,
+    RespuestaAsistenciaLote,
+)
+from schemas.clase import CrearClase, RespuestaClase, RespuestaListaClase
+from schemas.usuario import UsuarioPrincipal
+from services import respuesta_rapida
+from services.asistencia_service import (
+    crear_asistencias_lote_service_async,
+    marcar_asistencia_service_async,
+    obtener_estadisticas_clase_service_async,
+)
 from services.clase_service import (
-    actualizar_clase_service,
-    crear_clase_service,
-    eliminar_clase_service,
-    obtener_clase_id_service,
-    obtener_clases_service,
+    CAMPOS_RESPUESTA_CLASE,
+    actualizar_clase_service_async,
+    crear_clase_service_async,
+    eliminar_clase_service_async,
+    obtener_clase_id_service_async,
+    obtener_clases_filas_service_async,
+    obtener_clases_service_async,
+    obtener_lista_clase_service_async,
 )
+from services.paginacion import CABECERA_CURSOR, LIMITE_MAXIMO, siguiente_cursor
+from services.respuesta_rapida import respuesta_filas
+from services.version_cambio_service import AMBITO_CLASES, comprobar_version_async
 
 # Rutas de clase
 router = APIRouter(prefix="/clases", tags=["clases"])
@@ -22,42 +43,132 @@ router = APIRouter(prefix="/clases", tags=["clases"])
 
 # Ruta para crear una clase
 @router.post("/", response_model=RespuestaClase)
-def crear_clase(
+async def crear_clase(
     clase: CrearClase,
-    db: Session = Depends(obtener_db),
-    profesor: Usuario = Depends(requerir_rol(RolUsuario.profesor)),
+    db: AsyncSession = Depends(obtener_db_async),
+    profesor: UsuarioPrincipal = Depends(requerir_rol(RolUsuario.profesor)),
 ):
-    return crear_clase_service(db, clase, profesor.id)
+    return await crear_clase_service_async(db, clase, profesor.id)
 
 
 # Ruta para obtener lista de clases
 @router.get("/", response_model=List[RespuestaClase])
-def lista_clases(db: Session = Depends(obtener_db)):
-    return obtener_clases_service(db)
+async def lista_clases(
+    request: Request,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=LIMITE_MAXIMO),
+    profesorId: str | None = None,
+    desde: date | None = None,
+    hasta: date | None = None,
+    db: AsyncSession = Depends(obtener_db_lectura),
+):
+    # 304 si el cliente ya tiene la versión actual, sin ejecutar la consulta
+    if no_modificada := await comprobar_version_async(
+        db, request, response, AMBITO_CLASES
+    ):
+        return no_modificada
+
+    if respuesta_rapida.RESPUESTA_RAPIDA:
+        obtener = obtener_clases_filas_service_async
+    else:
+        obtener = obtener_clases_service_async
+
+    clases = await obtener(
+        db,
+        limit=limit,
+        cursor=cursor,
+        id_profesor=profesorId,
+        desde=desde,
+        hasta=hasta,
+    )
+
+    if siguiente := siguiente_cursor(clases, limit, ("fecha", "id")):
+        response.headers[CABECERA_CURSOR] = siguiente
+
+    if respuesta_rapida.RESPUESTA_RAPIDA:
+        # RespuestaClase devuelve la fecha sin la hora
+        return respuesta_filas(
+            CAMPOS_RESPUESTA_CLASE, clases, response, {"fecha": datetime.date}
+        )
+
+    return clases
 
 
 # Ruta para obtener una clase por ID
 @router.get("/{id_clase}", response_model=RespuestaClase)
-def obtener_clase(id_clase: str, db: Session = Depends(obtener_db)):
-    return obtener_clase_id_service(db, id_clase)
+async def obtener_clase(
+    id_clase: str,
+    request: Request,
+    response: Response,
+    db: AsyncSession = Depends(obtener_db_lectura),
+):
+    if no_modificada := await comprobar_version_async(
+        db, request, response, AMBITO_CLASES
+    ):
+        return no_modificada
+
+    return await obtener_clase_id_service_async(db, id_clase)
+
+
+# Ruta para obtener la lista de una clase (profesor y asistencias con el
+# nombre de cada estudiante)
+@router.get("/{id_clase}/lista", response_model=RespuestaListaClase)
+async def lista_clase(id_clase: str, db: AsyncSession = Depends(obtener_db_lectura)):
+    return await obtener_lista_clase_service_async(db, id_clase)
 
 
 # Ruta para actualizar una clase
 @router.put("/{id_clase}", response_model=RespuestaClase)
-def actualizar_clase(
+async def actualizar_clase(
     id_clase: str,
     clase: CrearClase,
-    db: Session = Depends(obtener_db),
-    profesor: Usuario = Depends(requerir_rol(RolUsuario.profesor)),
+    db: AsyncSession = Depends(obtener_db_async),
+    profesor: UsuarioPrincipal = Depends(requerir_rol(RolUsuario.profesor)),
 ):
-    return actualizar_clase_service(db, id_clase, clase)
+    return await actualizar_clase_service_async(db, id_clase, clase)
 
 
 # Ruta para eliminar una clase
 @router.delete("/{id_clase}", status_code=204)
-def eliminar_clase(
+async def eliminar_clase(
+    id_clase: str,
+    db: AsyncSession = Depends(obtener_db_async),
+    profesor: UsuarioPrincipal = Depends(requerir_rol(RolUsuario.profesor)),
+):
+    await eliminar_clase_service_async(db, id_clase)
+
+
+# Ruta para registrar el pase de lista de una clase
+@router.post("/{id_clase}/asistencias/lote", response_model=RespuestaAsistenciaLote)
+async def crear_asistencias_lote(
+    id_clase: str,
+    lote: CrearAsistenciaLote,
+    db: AsyncSession = Depends(obtener_db_async),
+    profesor: UsuarioPrincipal = Depends(requerir_rol(RolUsuario.profesor)),
+):
+    return await crear_asistencias_lote_service_async(db, id_clase, lote)
+
+
+# Ruta para fijar el estado de la asistencia de un usuario en una clase
+# (la crea o la actualiza)
+@router.put("/{id_clase}/asistencias/{id_usuario}", response_model=RespuestaAsistencia)
+async def marcar_asistencia(
+    id_clase: str,
+    id_usuario: str,
+    datos: MarcarAsistencia,
+    db: AsyncSession = Depends(obtener_db_async),
+    profesor: UsuarioPrincipal = Depends(requerir_rol(RolUsuario.profesor)),
+):
+    return await marcar_asistencia_service_async(db, id_clase, id_usuario, datos)
+
+
+# Ruta para obtener las estadísticas de asistencia de una clase
+@router.get("/{id_clase}/estadisticas", response_model=EstadisticasAsistencia)
+async def estadisticas_clase(
     id_clase: str,
-    db: Session = Depends(obtener_db),
-    profesor: Usuario = Depends(requerir_rol(RolUsuario.profesor)),
+    desde: datetime | None = None,
+    hasta: datetime | None = None,
+    db: AsyncSession = Depends(obtener_db_lectura),
 ):
-    eliminar_clase_service(db, id_clase)
+    return await obtener_estadisticas_clase_service_async(db, id_clase, desde, hasta)
@@ -0,0 +1,92 @@
+# Importaciones
+from datetime import date
+from typing import List
+
+from fastapi import APIRouter, Depends, Query, Response
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from api.usuario import requerir_rol
+from database.connection import obtener_db_async, obtener_db_lectura
+from models.Usuario import RolUsuario
+from schemas.clase import RespuestaClase
+from schemas.horario import (
+    ActualizarSesionesHorario,
+    CrearHorario,
+    RespuestaCrearHorario,
+    RespuestaHorario,
+    RespuestaSesionesHorario,
+)
+from schemas.usuario import UsuarioPrincipal
+from services.horario_service import (
+    actualizar_sesiones_horario_service_async,
+    cancelar_sesiones_horario_service_async,
+    crear_horario_service_async,
+    obtener_clases_horario_service_async,
+    obtener_horario_id_service_async,
+)
+from services.paginacion import CABECERA_CURSOR, LIMITE_MAXIMO, siguiente_cursor
+
+# Rutas de horario
+router = APIRouter(prefix="/horarios", tags=["horarios"])
+
+
+# Ruta para crear un horario y generar sus clases
+@router.post("/", response_model=RespuestaCrearHorario)
+async def crear_horario(
+    horario: CrearHorario,
+    db: AsyncSession = Depends(obtener_db_async),
+    profesor: UsuarioPrincipal = Depends(requerir_rol(RolUsuario.profesor)),
+):
+    return await crear_horario_service_async(db, horario, profesor.id)
+
+
+# Ruta para obtener un horario por ID
+@router.get("/{id_horario}", response_model=RespuestaHorario)
+async def obtener_horario(
+    id_horario: str, db: AsyncSession = Depends(obtener_db_lectura)
+):
+    return await obtener_horario_id_service_async(db, id_horario)
+
+
+# Ruta para obtener las clases de un horario
+@router.get("/{id_horario}/clases", response_model=List[RespuestaClase])
+async def lista_clases_horario(
+    id_horario: str,
+    response: Response,
+    cursor: str | None = None,
+    limit: int = Query(100, ge=1, le=LIMITE_MAXIMO),
+    db: AsyncSession = Depends(obtener_db_lectura),
+):
+    clases = await obtener_clases_horario_service_async(db, id_horario, limit, cursor)
+
+    if siguiente := siguiente_cursor(clases, limit, ("fecha", "id")):
+        response.headers[CABECERA_CURSOR] = siguiente
+
+    return clases
+
+
+# Ruta para modificar las clases futuras de un horario del profesor
+@router.put("/{id_horario}/sesiones", response_model=RespuestaSesionesHorario)
+async def actualizar_sesiones_horario(
+    id_horario: str,
+    datos: ActualizarSesionesHorario,
+    desde: date | None = None,
+    db: AsyncSession = Depends(obtener_db_async),
+    profesor: UsuarioPrincipal = Depends(requerir_rol(RolUsuario.profesor)),
+):
+    return await actualizar_sesiones_horario_service_async(
+        db, id_horario, profesor.id, datos, desde
+    )
+
+
+# Ruta para cancelar las clases futuras de un horario del profesor
+@router.delete("/{id_horario}/sesiones", response_model=RespuestaSesionesHorario)
+async def cancelar_sesiones_horario(
+    id_horario: str,
+    desde: date | None = None,
+    db: AsyncSession = Depends(obtener_db_async),
+    profesor: UsuarioPrincipal = Depends(requerir_rol(RolUsuario.profesor)),
+):
+    return await cancelar_sesiones_horario_service_async(
+        db, id_horario, profesor.id, desde
+    )
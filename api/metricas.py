@@ -0,0 +1,59 @@
+# Importaciones
+import hmac
+
+from fastapi import APIRouter, Depends, HTTPException, Request, status
+from fastapi.responses import PlainTextResponse
+
+from api.usuario import requerir_rol
+from configuracion import obtener_texto
+from models.Usuario import RolUsuario
+from services.metricas import TIPO_CONTENIDO, metricas
+
+# Token con el que la herramienta de monitorización (Prometheus) lee las
+# métricas. Sin él, solo las lee un administrador.
+METRICAS_TOKEN = obtener_texto("API_METRICAS_TOKEN")
+
+# Rutas de métricas
+router = APIRouter(tags=["metricas"])
+
+
+async def verificar_token_metricas(request: Request) -> None:
+    """
+    Verifica que la petición incluye el token de métricas
+    (Authorization: Bearer <API_METRICAS_TOKEN>).
+
+    Argumentos:
+        request: Petición
+
+    Excepciones:
+        HTTPException: 401 si el token falta o no coincide
+    """
+    esquema, _, token = request.headers.get("authorization", "").partition(" ")
+
+    if not (
+        METRICAS_TOKEN
+        and esquema.lower() == "bearer"
+        and hmac.compare_digest(token.encode(), METRICAS_TOKEN.encode())
+    ):
+        raise HTTPException(
+            status_code=status.HTTP_401_UNAUTHORIZED,
+            detail="Token de métricas no válido",
+            headers={"WWW-Authenticate": "Bearer"},
+        )
+
+
+# Las métricas exponen rutas, latencias y sentencias: requieren el token de
+# métricas si está configurado o, si no, un administrador
+autorizar_metricas = (
+    verificar_token_metricas if METRICAS_TOKEN else requerir_rol(RolUsuario.admin)
+)
+
+
+# Ruta para obtener las métricas en el formato de texto de Prometheus
+@router.get(
+    "/metrics",
+    response_class=PlainTextResponse,
+    dependencies=[Depends(autorizar_metricas)],
+)
+async def obtener_metricas():
+    return PlainTextResponse(metricas.exportar(), media_type=TIPO_CONTENIDO)
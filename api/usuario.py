@@ -1,28 +1,73 @@
 # Importaciones
-import secrets
 from datetime import datetime, timedelta
-from typing import List
-
-import jwt
-from fastapi import APIRouter, Depends, HTTPException, status
+from typing import List, Literal
+
+from fastapi import (
+    APIRouter,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+    UploadFile,
+    status,
+)
 from fastapi.security import OAuth2PasswordBearer, OAuth2PasswordRequestForm
 from jwt.exceptions import InvalidTokenError
-from sqlmodel import Session
-
-from database.connection import obtener_db
-from models.Usuario import RolUsuario, Usuario
-from schemas.usuario import ActualizarUsuario, CrearUsuario, RespuestaUsuario, Token
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from configuracion import obtener_texto
+from database.connection import obtener_db_async, obtener_db_lectura
+from models.Usuario import RolUsuario
+from schemas.asistencia import EstadisticasAsistencia
+from schemas.usuario import (
+    ActualizarUsuario,
+    CrearUsuario,
+    EstadisticasCache,
+    RespuestaImportacionUsuarios,
+    RespuestaUsuario,
+    Token,
+    UsuarioPrincipal,
+)
+from services import respuesta_rapida
+from services.asistencia_service import obtener_estadisticas_usuario_service_async
+from services.cache_usuarios import cache_usuarios
+from services.claves_jwt import cargar_claves
+from services.paginacion import CABECERA_CURSOR, LIMITE_MAXIMO, siguiente_cursor
+from services.respuesta_rapida import respuesta_filas
+from services.revocacion_service import (
+    cargar_lista_revocacion_async,
+    lista_revocacion,
+    obtener_version_token_async,
+)
 from services.usuario_services import (
-    actualizar_usuario_id,
-    crear_usuario,
-    desactivar_usuario,
-    obtener_usuario_correo_electronico,
-    obtener_usuario_id,
-    obtener_usuarios,
-    verificar_contrasena,
+    CAMPOS_RESPUESTA_USUARIO,
+    actualizar_usuario_id_async,
+    crear_usuario_async,
+    desactivar_usuario_async,
+    importar_usuarios_async,
+    obtener_principal_usuario_async,
+    obtener_usuario_correo_electronico_async,
+    obtener_usuario_id_async,
+    obtener_usuarios_async,
+    obtener_usuarios_filas_async,
+    verificar_contrasena_async,
 )
 
-CLAVE_SECRETA = secrets.token_hex(32)  # 32 carácteres hexadecimales
+# Claves de firma de los tokens (compartidas entre procesos si se configuran)
+claves_jwt = cargar_claves()
+
+# Modos de autorización:
+#   estricto: comprueba en la base de datos (o en la caché) que el usuario
+#             sigue activo y su rol actual.
+#   sin_estado: confía en el rol y la versión incluidos en el token y solo
+#               consulta la lista de revocación en memoria.
+MODOS_AUTENTICACION = ("estricto", "sin_estado")
+MODO_AUTENTICACION = obtener_texto("AUTH_MODO", "estricto")
+
+if MODO_AUTENTICACION not in MODOS_AUTENTICACION:
+    raise ValueError(
+        f"AUTH_MODO debe ser uno de {MODOS_AUTENTICACION}: {MODO_AUTENTICACION}"
+    )
 
 # Rutas de usuario
 router = APIRouter(prefix="/usuarios", tags=["usuarios"])
@@ -30,7 +75,7 @@ router = APIRouter(prefix="/usuarios", tags=["usuarios"])
 
 def crear_token_acceso(datos: dict, delta_expira: timedelta | None = None):
     """
-    Crea un token de acceso.
+    Crea un token de acceso firmado con la clave activa.
 
     Argumentos:
         datos: Datos a codificar
@@ -45,15 +90,18 @@ def crear_token_acceso(datos: dict, delta_expira: timedelta | None = None):
     )
     codifica.update({"exp": expira})
 
-    return jwt.encode(codifica, CLAVE_SECRETA, algorithm="HS256")
+    return claves_jwt.firmar(codifica)
 
 
-def obtener_usuario_actual(
-    db: Session = Depends(obtener_db),
+async def obtener_usuario_actual(
+    db: AsyncSession = Depends(obtener_db_async),
     token: str = Depends(OAuth2PasswordBearer(tokenUrl="usuarios/inicio_sesion")),
 ):
     """
-    Obtiene el usuario actual.
+    Obtiene el usuario actual (id, rol y estado).
+    En modo estricto se resuelve desde la caché de usuarios y solo consulta
+    la base de datos si el usuario no está en ella o su entrada ha caducado.
+    En modo sin estado se obtiene de los datos del token.
 
     Argumentos:
         db: Sesión de base de datos
@@ -66,7 +114,7 @@ def obtener_usuario_actual(
         HTTPException: Si el token es inválido
     """
     try:
-        datos = jwt.decode(token, CLAVE_SECRETA, algorithms="HS256")
+        datos = claves_jwt.decodificar(token)
         id_usuario: str = datos.get("sub")
 
         if id_usuario is None:
@@ -74,14 +122,56 @@ def obtener_usuario_actual(
     except InvalidTokenError:
         raise HTTPException(status_code=401, detail="Token inválido...")
 
-    usuario = obtener_usuario_id(db, id_usuario)
+    if MODO_AUTENTICACION == "sin_estado":
+        return await obtener_usuario_token(db, id_usuario, datos)
 
-    if not usuario:
-        raise HTTPException(status_code=401, detail="Usuario no encontrado")
+    usuario = cache_usuarios.obtener(id_usuario)
+
+    if usuario is None:
+        usuario = await obtener_principal_usuario_async(db, id_usuario)
+
+        if not usuario:
+            raise HTTPException(status_code=401, detail="Usuario no encontrado")
+
+        cache_usuarios.guardar(usuario)
 
     return usuario
 
 
+async def obtener_usuario_token(
+    db: AsyncSession, id_usuario: str, datos: dict
+) -> UsuarioPrincipal:
+    """
+    Obtiene el usuario actual a partir de los datos del token (modo sin estado).
+    Solo accede a la base de datos para recargar la lista de revocación
+    cuando ha pasado su intervalo de recarga.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_usuario: ID del usuario (sub)
+        datos: Datos decodificados del token
+
+    Retorna:
+        Usuario actual
+
+    Excepciones:
+        HTTPException: Si el token no incluye el rol o ha sido revocado
+    """
+    if lista_revocacion.necesita_recarga():
+        await cargar_lista_revocacion_async(db)
+
+    rol = datos.get("rol")
+    version = datos.get("ver", 0)
+
+    if rol not in RolUsuario.__members__ or not isinstance(version, int):
+        raise HTTPException(status_code=401, detail="Token inválido")
+
+    if not lista_revocacion.es_valido(id_usuario, version):
+        raise HTTPException(status_code=401, detail="Token revocado")
+
+    return UsuarioPrincipal(id=id_usuario, rol=RolUsuario(rol), activo=True)
+
+
 def requerir_rol(rol: RolUsuario):
     """
     Requiere un rol específico.
@@ -96,7 +186,9 @@ def requerir_rol(rol: RolUsuario):
         HTTPException: Si el usuario no tiene el rol requerido
     """
 
-    def verificar_rol(usuario: Usuario = Depends(obtener_usuario_actual)):
+    async def verificar_rol(
+        usuario: UsuarioPrincipal = Depends(obtener_usuario_actual),
+    ):
         if usuario.rol != rol:
             raise HTTPException(
                 status_code=status.HTTP_403_FORBIDDEN, detail="Permiso denegado"
@@ -108,59 +200,140 @@ def requerir_rol(rol: RolUsuario):
 
 # Ruta para crear un usuario
 @router.post("/", response_model=RespuestaUsuario)
-def crear_usuario_endpoint(usuario: CrearUsuario, db: Session = Depends(obtener_db)):
-    return crear_usuario(db, usuario)
+async def crear_usuario_endpoint(
+    usuario: CrearUsuario, db: AsyncSession = Depends(obtener_db_async)
+):
+    return await crear_usuario_async(db, usuario)
+
+
+# Ruta para importar usuarios desde un archivo CSV o NDJSON
+@router.post("/importar", response_model=RespuestaImportacionUsuarios)
+async def importar_usuarios(
+    archivo: UploadFile,
+    formato: Literal["csv", "ndjson"] | None = None,
+    db: AsyncSession = Depends(obtener_db_async),
+    admin: UsuarioPrincipal = Depends(requerir_rol(RolUsuario.admin)),
+):
+    # Sin formato explícito se deduce de la extensión del archivo
+    if formato is None:
+        extension = (archivo.filename or "").rsplit(".", 1)[-1].lower()
+        formato = "ndjson" if extension in ("ndjson", "jsonl") else "csv"
+
+    try:
+        contenido = (await archivo.read()).decode("utf-8-sig")
+    except UnicodeDecodeError:
+        raise HTTPException(
+            status_code=400, detail="El archivo debe estar codificado en UTF-8"
+        )
+
+    return await importar_usuarios_async(db, contenido, formato)
 
 
 # Ruta para obtener lista de usuarios
 @router.get("/", response_model=List[RespuestaUsuario])
-def lista_usuarios(
-    skip: int = 0,
-    limit: int = 100,
-    db: Session = Depends(obtener_db),
-    admin: Usuario = Depends(requerir_rol(RolUsuario.admin)),
+async def lista_usuarios(
+    response: Response,
+    skip: int = Query(0, ge=0),
+    limit: int = Query(100, ge=1, le=LIMITE_MAXIMO),
+    cursor: str | None = None,
+    db: AsyncSession = Depends(obtener_db_lectura),
+    admin: UsuarioPrincipal = Depends(requerir_rol(RolUsuario.admin)),
 ):
-    return obtener_usuarios(db, skip=skip, limit=limit)
+    if respuesta_rapida.RESPUESTA_RAPIDA:
+        obtener = obtener_usuarios_filas_async
+    else:
+        obtener = obtener_usuarios_async
+
+    usuarios = await obtener(db, skip=skip, limit=limit, cursor=cursor)
+
+    if siguiente := siguiente_cursor(usuarios, limit):
+        response.headers[CABECERA_CURSOR] = siguiente
+
+    if respuesta_rapida.RESPUESTA_RAPIDA:
+        return respuesta_filas(CAMPOS_RESPUESTA_USUARIO, usuarios, response)
+
+    return usuarios
 
 
 # Ruta para actualizar un usuario
 @router.put("/{id_usuario}", response_model=RespuestaUsuario)
-def actualizar_usuario(
+async def actualizar_usuario(
     id_usuario: str,
     actualizar_usuario: ActualizarUsuario,
-    db: Session = Depends(obtener_db),
-    usuario_actual: Usuario = Depends(obtener_usuario_actual),
+    db: AsyncSession = Depends(obtener_db_async),
+    usuario_actual: UsuarioPrincipal = Depends(obtener_usuario_actual),
 ):
     if usuario_actual.rol != RolUsuario.admin and usuario_actual.id != id_usuario:
         raise HTTPException(status_code=403, detail="Permiso denegado")
-    return actualizar_usuario_id(db, id_usuario, actualizar_usuario)
+    return await actualizar_usuario_id_async(db, id_usuario, actualizar_usuario)
 
 
 # Ruta para eliminar un usuario
 @router.delete("/{id_usuario}")
-def eliminar_usuario(id_usuario: str, db: Session = Depends(obtener_db)):
-    desactivar_usuario(db, id_usuario)
+async def eliminar_usuario(
+    id_usuario: str, db: AsyncSession = Depends(obtener_db_async)
+):
+    await desactivar_usuario_async(db, id_usuario)
     return {"detalle": "Usuario desactivado"}
 
 
 # Ruta para iniciar sesión
 @router.post("/inicio_sesion", response_model=Token)
-def inicio_sesion(
+async def inicio_sesion(
     datos_formulario: OAuth2PasswordRequestForm = Depends(),
-    db: Session = Depends(obtener_db),
+    db: AsyncSession = Depends(obtener_db_async),
 ):
-    usuario = obtener_usuario_correo_electronico(db, datos_formulario.username)
+    usuario = await obtener_usuario_correo_electronico_async(
+        db, datos_formulario.username
+    )
 
-    if not usuario or not verificar_contrasena(
+    if not usuario or not await verificar_contrasena_async(
         datos_formulario.password, usuario.contrasena
     ):
         raise HTTPException(status_code=400, detail="Usuario o contraseña incorrectos")
 
-    token_acceso = crear_token_acceso({"sub": usuario.id}, timedelta(minutes=60))
+    # El rol y la versión permiten autorizar sin consultar la base de datos
+    version = await obtener_version_token_async(db, usuario.id)
+    token_acceso = crear_token_acceso(
+        {"sub": usuario.id, "rol": usuario.rol.value, "ver": version},
+        timedelta(minutes=60),
+    )
     return {"access_token": token_acceso, "token_type": "bearer"}
 
 
 # Ruta para obtener el usuario actual
 @router.get("/me", response_model=RespuestaUsuario)
-def me(usuario_actual: Usuario = Depends(obtener_usuario_actual)):
-    return usuario_actual
+async def me(
+    usuario_actual: UsuarioPrincipal = Depends(obtener_usuario_actual),
+    db: AsyncSession = Depends(obtener_db_lectura),
+):
+    usuario = await obtener_usuario_id_async(db, usuario_actual.id)
+
+    if not usuario:
+        raise HTTPException(status_code=401, detail="Usuario no encontrado")
+
+    return usuario
+
+
+# Ruta para obtener los contadores de la caché de usuarios
+@router.get("/cache/estadisticas", response_model=EstadisticasCache)
+async def estadisticas_cache(
+    admin: UsuarioPrincipal = Depends(requerir_rol(RolUsuario.admin)),
+):
+    return cache_usuarios.estadisticas()
+
+
+# Ruta para obtener las estadísticas de asistencia de un usuario
+@router.get("/{id_usuario}/estadisticas", response_model=EstadisticasAsistencia)
+async def estadisticas_usuario(
+    id_usuario: str,
+    desde: datetime | None = None,
+    hasta: datetime | None = None,
+    db: AsyncSession = Depends(obtener_db_lectura),
+    usuario_actual: UsuarioPrincipal = Depends(obtener_usuario_actual),
+):
+    if usuario_actual.rol == RolUsuario.estudiante and usuario_actual.id != id_usuario:
+        raise HTTPException(status_code=403, detail="Permiso denegado")
+    return await obtener_estadisticas_usuario_service_async(
+        db, id_usuario, desde, hasta
+    )
@@ -0,0 +1,126 @@
+"""
+Benchmark del arranque en frío de un trabajador de la API.
+
+Cada repetición se ejecuta en un proceso nuevo de Python, como un trabajador
+que arranca al escalar, sobre una base de datos SQLite ya migrada. Mide:
+    importacion: importar main (rutas, modelos, middlewares).
+    arranque: el lifespan de la aplicación hasta que acepta peticiones.
+    primera_peticion: GET /clases/, que abre la primera conexión y construye
+        la pila de middlewares.
+    segunda_peticion: la misma petición en caliente, como referencia.
+    proceso: desde que se lanza el proceso hasta que termina.
+
+Uso:
+    python -m benchmarks.arranque [--repeticiones 10]
+
+Escribe el resultado en JSON (mediana y mínimo en milisegundos de cada fase)
+por la salida estándar, junto al commit medido.
+"""
+
+# Importaciones
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+from benchmarks.suite import obtener_commit
+
+# Fases medidas en cada proceso, en orden
+FASES = ("importacion", "arranque", "primera_peticion", "segunda_peticion")
+
+# Ruta de la petición medida
+RUTA = "/clases/"
+
+
+async def medir_trabajador() -> dict[str, float]:
+    # Se ejecuta en el proceso hijo: segundos de cada fase
+    import httpx
+
+    tiempos = {}
+    inicio = time.perf_counter()
+    import main
+
+    tiempos["importacion"] = time.perf_counter() - inicio
+
+    inicio = time.perf_counter()
+    async with main.app.router.lifespan_context(main.app):
+        tiempos["arranque"] = time.perf_counter() - inicio
+
+        transporte = httpx.ASGITransport(app=main.app)
+        async with httpx.AsyncClient(transport=transporte, base_url="http://t") as c:
+            for fase in ("primera_peticion", "segunda_peticion"):
+                inicio = time.perf_counter()
+                respuesta = await c.get(RUTA)
+                tiempos[fase] = time.perf_counter() - inicio
+                assert respuesta.status_code == 200, respuesta.text
+
+    return tiempos
+
+
+def lanzar_trabajador(entorno: dict[str, str]) -> dict[str, float]:
+    # Lanza un proceso nuevo y devuelve sus tiempos y el total del proceso
+    inicio = time.perf_counter()
+    resultado = subprocess.run(
+        [sys.executable, "-m", "benchmarks.arranque", "--trabajador"],
+        env=entorno,
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    tiempos = json.loads(resultado.stdout)
+    tiempos["proceso"] = time.perf_counter() - inicio
+    return tiempos
+
+
+def resumir(muestras: list[float]) -> dict:
+    # Mediana y mínimo en milisegundos
+    return {
+        "mediana_ms": round(statistics.median(muestras) * 1e3, 2),
+        "min_ms": round(min(muestras) * 1e3, 2),
+    }
+
+
+def main(argumentos: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--repeticiones", type=int, default=10)
+    parser.add_argument("--trabajador", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args(argumentos)
+
+    if args.trabajador:
+        sys.stdout.write(json.dumps(asyncio.run(medir_trabajador())) + "\n")
+        return
+
+    ruta_db = os.path.join(tempfile.mkdtemp(), "arranque.db")
+    entorno = {**os.environ, "DATABASE_URL": f"sqlite:///{ruta_db}"}
+    entorno.pop("DATABASE_ASYNC_URL", None)
+
+    # El esquema se crea una vez, como en un despliegue, antes de los trabajadores
+    subprocess.run(
+        [sys.executable, "-m", "database.migraciones"],
+        env=entorno,
+        capture_output=True,
+        check=True,
+    )
+
+    # Un primer proceso de calentamiento (caché de bytecode y del sistema)
+    lanzar_trabajador(entorno)
+    muestras = [lanzar_trabajador(entorno) for _ in range(args.repeticiones)]
+
+    resultados = {
+        "commit": obtener_commit(),
+        "repeticiones": args.repeticiones,
+        **{
+            fase: resumir([muestra[fase] for muestra in muestras])
+            for fase in (*FASES, "proceso")
+        },
+    }
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
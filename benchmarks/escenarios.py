@@ -0,0 +1,149 @@
+"""
+Escenarios de carga de la suite de benchmarks.
+
+Cada escenario es una corrutina que recibe el cliente, el contexto y un
+generador aleatorio, hace la preparación que necesite (sin medir) y devuelve
+la petición que se mide como (método, ruta, argumentos de httpx).
+"""
+
+# Importaciones
+import random
+from dataclasses import dataclass, field
+
+import httpx
+
+from database.generar_datos import CONTRASENA, correo
+from models.Asistencia import EstadoAsistencia
+from models.Usuario import RolUsuario
+
+# Petición medida: método, ruta y argumentos de httpx
+Peticion = tuple[str, str, dict]
+
+# Elementos de cada tipo que se muestrean de la base de datos
+TAMANO_MUESTRA = 1000
+
+# Estudiantes de cada pase de lista
+ALUMNOS_PASE_LISTA = 25
+
+
+@dataclass
+class Contexto:
+    """
+    Datos de la base de datos poblada que usan los escenarios.
+
+    Atributos:
+        estudiantes: Número de estudiantes generados
+        clases: Identificadores de una muestra de clases
+        asistencias: Identificadores de una muestra de asistencias
+        usuarios: Identificadores de una muestra de estudiantes
+        cabeceras_profesor: Cabecera de autenticación de un profesor
+    """
+
+    estudiantes: int
+    clases: list[str]
+    asistencias: list[str]
+    usuarios: list[str]
+    cabeceras_profesor: dict[str, str] = field(default_factory=dict)
+
+
+async def iniciar_sesion(cliente: httpx.AsyncClient, correo_electronico: str) -> dict:
+    """
+    Inicia sesión con la contraseña de los datos generados.
+
+    Retorna:
+        Cabecera Authorization con el token
+    """
+    respuesta = await cliente.post(
+        "/usuarios/inicio_sesion",
+        data={"username": correo_electronico, "password": CONTRASENA},
+    )
+    respuesta.raise_for_status()
+    return {"Authorization": f"Bearer {respuesta.json()['access_token']}"}
+
+
+async def login(cliente, contexto: Contexto, rng: random.Random) -> Peticion:
+    # Inicio de sesión de un estudiante (verificación Argon2)
+    indice = rng.randrange(contexto.estudiantes)
+    datos = {
+        "username": correo(RolUsuario.estudiante, indice),
+        "password": CONTRASENA,
+    }
+    return "POST", "/usuarios/inicio_sesion", {"data": datos}
+
+
+async def pase_lista(cliente, contexto: Contexto, rng: random.Random) -> Peticion:
+    # Pase de lista completo de una clase nueva (la clase se crea sin medir)
+    respuesta = await cliente.post(
+        "/clases/",
+        json={
+            "nombre": "Clase benchmark",
+            "fecha": "2026-01-15",
+            "horaInicio": "10:00:00",
+            "horaFin": "11:00:00",
+        },
+        headers=contexto.cabeceras_profesor,
+    )
+    respuesta.raise_for_status()
+
+    alumnos = rng.sample(
+        contexto.usuarios, min(ALUMNOS_PASE_LISTA, len(contexto.usuarios))
+    )
+    lote = {
+        "asistencias": [
+            {"usuarioId": id_usuario, "estado": rng.choice(list(EstadoAsistencia))}
+            for id_usuario in alumnos
+        ]
+    }
+    ruta = f"/clases/{respuesta.json()['id']}/asistencias/lote"
+    return "POST", ruta, {"json": lote, "headers": contexto.cabeceras_profesor}
+
+
+async def listado_clases(cliente, contexto: Contexto, rng: random.Random) -> Peticion:
+    # Primera página del listado de clases
+    return "GET", "/clases/", {"params": {"limit": 100}}
+
+
+async def listado_asistencias(
+    cliente, contexto: Contexto, rng: random.Random
+) -> Peticion:
+    # Primera página del listado de asistencias
+    return "GET", "/asistencias/", {"params": {"limit": 100}}
+
+
+async def filtro_clase(cliente, contexto: Contexto, rng: random.Random) -> Peticion:
+    # Asistencias de una clase
+    params = {"claseId": rng.choice(contexto.clases), "limit": 100}
+    return "GET", "/asistencias/", {"params": params}
+
+
+async def filtro_usuario(cliente, contexto: Contexto, rng: random.Random) -> Peticion:
+    # Asistencias de un estudiante
+    params = {"usuarioId": rng.choice(contexto.usuarios), "limit": 100}
+    return "GET", "/asistencias/", {"params": params}
+
+
+async def actualizacion(cliente, contexto: Contexto, rng: random.Random) -> Peticion:
+    # Cambio de estado de una asistencia existente
+    id_asistencia = rng.choice(contexto.asistencias)
+    respuesta = await cliente.get(f"/asistencias/{id_asistencia}")
+    respuesta.raise_for_status()
+
+    asistencia = respuesta.json()
+    datos = {
+        "usuarioId": asistencia["usuarioId"],
+        "claseId": asistencia["claseId"],
+        "estado": rng.choice(list(EstadoAsistencia)),
+    }
+    return "PUT", f"/asistencias/{id_asistencia}", {"json": datos}
+
+
+# Escenarios disponibles, en el orden en que se ejecutan
+ESCENARIOS = {
+    "login": login,
+    "pase_lista": pase_lista,
+    "listado_clases": listado_clases,
+    "listado_asistencias": listado_asistencias,
+    "filtro_clase": filtro_clase,
+    "filtro_usuario": filtro_usuario,
+    "actualizacion": actualizacion,
+}
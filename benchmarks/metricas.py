@@ -0,0 +1,118 @@
+"""
+Benchmark del coste del middleware de métricas (API_METRICAS).
+
+Mide:
+    middleware: una petición ASGI a una aplicación mínima, con y sin
+        MiddlewareMetricas, para aislar el coste del registro por petición.
+    sentencia: una sentencia SQLite en memoria, con y sin los eventos de
+        instrumentar_engine (API_METRICAS_BD), dentro de una petición.
+
+Uso:
+    python -m benchmarks.metricas [--iteraciones 200000]
+
+Escribe el resultado en JSON por la salida estándar.
+"""
+
+# Importaciones
+import argparse
+import asyncio
+import json
+import time
+
+from sqlalchemy import create_engine, text
+
+from services.metricas import (
+    EstadisticasBd,
+    Metricas,
+    MiddlewareMetricas,
+    estadisticas_bd,
+    instrumentar_engine,
+)
+
+
+class RutaFalsa:
+    # Lo único que el middleware lee de la ruta es la plantilla
+    path = "/clases/{id_clase}"
+
+
+async def aplicacion(scope, receive, send):
+    # Aplicación ASGI mínima: resuelve la ruta y responde 200 sin cuerpo
+    scope["route"] = RutaFalsa
+    await send({"type": "http.response.start", "status": 200, "headers": []})
+    await send({"type": "http.response.body", "body": b""})
+
+
+async def recibir():
+    return {"type": "http.request", "body": b"", "more_body": False}
+
+
+async def enviar(mensaje):
+    pass
+
+
+async def medir_asgi(app, iteraciones: int) -> float:
+    # Segundos por petición
+    inicio = time.perf_counter()
+    for _ in range(iteraciones):
+        scope = {"type": "http", "method": "GET", "path": "/clases/1"}
+        await app(scope, recibir, enviar)
+    return (time.perf_counter() - inicio) / iteraciones
+
+
+def medir_sentencias(instrumentado: bool, iteraciones: int) -> float:
+    # Segundos por sentencia
+    engine = create_engine("sqlite://")
+    if instrumentado:
+        instrumentar_engine(engine)
+
+    token = estadisticas_bd.set(EstadisticasBd())
+    try:
+        with engine.connect() as conexion:
+            sentencia = text("SELECT 1")
+            conexion.execute(sentencia)
+            inicio = time.perf_counter()
+            for _ in range(iteraciones):
+                conexion.execute(sentencia)
+            return (time.perf_counter() - inicio) / iteraciones
+    finally:
+        estadisticas_bd.reset(token)
+        engine.dispose()
+
+
+def comparar(sin: float, con: float) -> dict:
+    # Tiempos en microsegundos y coste añadido
+    return {
+        "sin_metricas_us": round(sin * 1e6, 3),
+        "con_metricas_us": round(con * 1e6, 3),
+        "coste_us": round((con - sin) * 1e6, 3),
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--iteraciones", type=int, default=200000)
+    args = parser.parse_args()
+
+    middleware = MiddlewareMetricas(aplicacion, Metricas())
+
+    async def medir_middleware():
+        # Calentamiento y medida de ambas variantes en el mismo bucle
+        await medir_asgi(middleware, 1000)
+        sin = await medir_asgi(aplicacion, args.iteraciones)
+        con = await medir_asgi(middleware, args.iteraciones)
+        return comparar(sin, con)
+
+    iteraciones_bd = max(1, args.iteraciones // 10)
+    resultados = {
+        "iteraciones": args.iteraciones,
+        "middleware": asyncio.run(medir_middleware()),
+        "sentencia": comparar(
+            medir_sentencias(False, iteraciones_bd),
+            medir_sentencias(True, iteraciones_bd),
+        ),
+    }
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
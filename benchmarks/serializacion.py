@@ -0,0 +1,252 @@
+"""
+Benchmark del coste por fila de los listados con y sin respuesta rápida
+(API_RESPUESTA_RAPIDA).
+
+Para cada listado (clases, asistencias y usuarios) mide:
+    serializacion: solo la conversión de la página en la respuesta HTTP
+        (validación con el response_model y json frente a orjson sobre
+        tuplas de columnas), con los datos ya leídos.
+    peticion: la petición completa en proceso (consulta, lectura de filas y
+        serialización).
+
+Uso:
+    python -m benchmarks.serializacion [--filas 10000] [--repeticiones 5]
+
+Escribe el resultado en JSON por la salida estándar.
+"""
+
+# Importaciones
+import argparse
+import asyncio
+import json
+import os
+import statistics
+import tempfile
+import time
+from datetime import date, datetime
+from datetime import time as hora
+
+# La base de datos del benchmark se crea en un fichero temporal antes de
+# importar la aplicación
+RUTA_DB = os.path.join(tempfile.mkdtemp(), "benchmark.db")
+os.environ["DATABASE_URL"] = f"sqlite:///{RUTA_DB}"
+
+# Los listados se piden en una sola página de --filas registros
+os.environ.setdefault("PAGINACION_LIMITE_MAXIMO", str(10**9))
+
+import httpx  # noqa: E402
+from fastapi import Response  # noqa: E402
+from fastapi.responses import JSONResponse  # noqa: E402
+from fastapi.routing import serialize_response  # noqa: E402
+from sqlalchemy import insert  # noqa: E402
+from sqlmodel import Session  # noqa: E402
+
+from api.usuario import obtener_usuario_actual  # noqa: E402
+from database.connection import async_engine, engine  # noqa: E402
+from database.migraciones import migrar  # noqa: E402
+from main import app  # noqa: E402
+from models.Asistencia import Asistencia, EstadoAsistencia  # noqa: E402
+from models.Clase import Clase  # noqa: E402
+from models.Usuario import RolUsuario, Usuario  # noqa: E402
+from schemas.usuario import UsuarioPrincipal  # noqa: E402
+from services import respuesta_rapida  # noqa: E402
+from services.asistencia_service import (  # noqa: E402
+    obtener_asistencia_filas_service,
+    obtener_asistencias_service,
+)
+from services.clase_service import (  # noqa: E402
+    obtener_clases_filas_service,
+    obtener_clases_service,
+)
+from services.respuesta_rapida import respuesta_filas  # noqa: E402
+from services.usuario_services import (  # noqa: E402
+    obtener_usuarios,
+    obtener_usuarios_filas,
+)
+
+# Listados medidos: ruta, servicio ORM y servicio de filas (respuesta rápida)
+LISTADOS = {
+    "clases": ("/clases/", obtener_clases_service, obtener_clases_filas_service),
+    "asistencias": (
+        "/asistencias/",
+        obtener_asistencias_service,
+        obtener_asistencia_filas_service,
+    ),
+    "usuarios": ("/usuarios/", obtener_usuarios, obtener_usuarios_filas),
+}
+
+# Conversiones que aplica cada ruta en modo rápido
+CONVERSIONES = {"clases": {"fecha": datetime.date}}
+
+
+def poblar(filas: int) -> None:
+    # Inserta `filas` usuarios, clases y asistencias (una por clase)
+    estados = list(EstadoAsistencia)
+    migrar(engine)
+
+    with Session(engine) as db:
+        profesor = Usuario(
+            nombre="Profesor",
+            apellido="Benchmark",
+            correoElectronico="profesor@benchmark.test",
+            contrasena="sin-cifrar",
+            rol=RolUsuario.profesor,
+        )
+        usuarios = [profesor] + [
+            Usuario(
+                nombre=f"Estudiante{i}",
+                apellido="Benchmark",
+                correoElectronico=f"estudiante{i}@benchmark.test",
+                contrasena="sin-cifrar",
+                rol=RolUsuario.estudiante,
+            )
+            for i in range(filas - 1)
+        ]
+        clases = [
+            Clase(
+                nombre=f"Clase {i}",
+                fecha=datetime.combine(date(2025, 9, 1 + i % 28), hora.min),
+                horaInicio=hora(8, 0),
+                horaFin=hora(9, 0),
+                profesorId=profesor.id,
+            )
+            for i in range(filas)
+        ]
+        asistencias = [
+            Asistencia(
+                usuarioId=usuarios[i].id,
+                claseId=clase.id,
+                estado=estados[i % len(estados)],
+            )
+            for i, clase in enumerate(clases)
+        ]
+
+        for modelo, registros in (
+            (Usuario, usuarios),
+            (Clase, clases),
+            (Asistencia, asistencias),
+        ):
+            db.exec(insert(modelo), params=[r.model_dump() for r in registros])
+        db.commit()
+
+
+def medir(funcion, repeticiones: int) -> float:
+    # Mediana en segundos de `repeticiones` ejecuciones, tras un calentamiento
+    funcion()
+    tiempos = []
+    for _ in range(repeticiones):
+        inicio = time.perf_counter()
+        funcion()
+        tiempos.append(time.perf_counter() - inicio)
+    return statistics.median(tiempos)
+
+
+def comparar(normal: float, rapida: float, filas: int) -> dict:
+    # Tiempos de ambos modos y coste por fila
+    return {
+        "normal_ms": round(normal * 1000, 2),
+        "rapida_ms": round(rapida * 1000, 2),
+        "normal_us_por_fila": round(normal * 1e6 / filas, 3),
+        "rapida_us_por_fila": round(rapida * 1e6 / filas, 3),
+        "mejora": round(normal / rapida, 2),
+    }
+
+
+def medir_serializacion(nombre: str, filas: int, repeticiones: int) -> dict:
+    # Solo la conversión en respuesta HTTP, con la página ya leída
+    ruta, obtener, obtener_filas = LISTADOS[nombre]
+    campo = next(
+        r.response_field
+        for r in app.routes
+        if getattr(r, "path", None) == ruta and "GET" in r.methods
+    )
+
+    with Session(engine) as db:
+        objetos = obtener(db, limit=filas)
+        tuplas = obtener_filas(db, limit=filas)
+
+    campos = tuple(tuplas[0]._fields)
+    bucle = asyncio.new_event_loop()
+
+    def normal():
+        # Lo que hace FastAPI con el response_model: validar y codificar
+        contenido = bucle.run_until_complete(
+            serialize_response(field=campo, response_content=objetos)
+        )
+        JSONResponse(contenido)
+
+    def rapida():
+        respuesta_filas(campos, tuplas, Response(), CONVERSIONES.get(nombre))
+
+    try:
+        return comparar(medir(normal, repeticiones), medir(rapida, repeticiones), filas)
+    finally:
+        bucle.close()
+
+
+async def medir_peticion(
+    cliente: httpx.AsyncClient, ruta: str, filas: int, repeticiones: int
+) -> dict:
+    # La petición completa en proceso, en cada modo
+    tiempos = {}
+
+    for modo in (False, True):
+        respuesta_rapida.RESPUESTA_RAPIDA = modo
+        muestras = []
+
+        for _ in range(repeticiones + 1):
+            inicio = time.perf_counter()
+            respuesta = await cliente.get(ruta, params={"limit": filas})
+            muestras.append(time.perf_counter() - inicio)
+            assert respuesta.status_code == 200, respuesta.text
+            assert len(respuesta.json()) == filas
+
+        # La primera petición es de calentamiento
+        tiempos[modo] = statistics.median(muestras[1:])
+
+    return comparar(tiempos[False], tiempos[True], filas)
+
+
+async def medir_peticiones(filas: int, repeticiones: int) -> dict:
+    transporte = httpx.ASGITransport(app=app)
+    resultados = {}
+
+    async with httpx.AsyncClient(transport=transporte, base_url="http://test") as c:
+        for nombre, (ruta, _, _) in LISTADOS.items():
+            resultados[nombre] = await medir_peticion(c, ruta, filas, repeticiones)
+
+    await async_engine.dispose()
+    return resultados
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--filas", type=int, default=10000)
+    parser.add_argument("--repeticiones", type=int, default=5)
+    args = parser.parse_args()
+
+    poblar(args.filas)
+
+    # Los usuarios solo los lista un administrador
+    admin = UsuarioPrincipal(id="benchmark", rol=RolUsuario.admin, activo=True)
+    app.dependency_overrides[obtener_usuario_actual] = lambda: admin
+
+    peticiones = asyncio.run(medir_peticiones(args.filas, args.repeticiones))
+    resultados = {
+        "filas": args.filas,
+        "repeticiones": args.repeticiones,
+        "listados": {
+            nombre: {
+                "serializacion": medir_serializacion(
+                    nombre, args.filas, args.repeticiones
+                ),
+                "peticion": peticiones[nombre],
+            }
+            for nombre in LISTADOS
+        },
+    }
+    print(json.dumps(resultados, indent=2))
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,239 @@
+"""
+Suite de benchmarks de carga sobre la aplicación en proceso.
+
+Puebla una base de datos SQLite con una escala de datos sintéticos (1k, 100k
+o 5M asistencias, o un número) mediante database.generar_datos y ejecuta los
+escenarios de benchmarks.escenarios contra la aplicación ASGI real con
+httpx. Para cada escenario informa de la latencia (media, p50, p95, p99 y
+máxima), el rendimiento y los códigos de estado, en JSON, para comparar
+resultados entre commits.
+
+Uso:
+    python -m benchmarks.suite [--escala 1k] [--peticiones 200]
+        [--concurrencia 8] [--escenarios login,filtro_clase] [--db ruta]
+        [--semilla 0] [--salida resultados.json]
+
+Con --db la base de datos se conserva y, si ya tiene datos, no se vuelve a
+poblar (útil con la escala 5M).
+"""
+
+# Importaciones
+import argparse
+import asyncio
+import json
+import math
+import os
+import platform
+import random
+import subprocess
+import sys
+import tempfile
+import time
+from collections import Counter
+from datetime import datetime, timezone
+
+# Escalas predefinidas (número de asistencias)
+ESCALAS = {"1k": 1_000, "100k": 100_000, "5M": 5_000_000}
+
+
+def obtener_escala(escala: str) -> int:
+    # Número de asistencias de una escala predefinida o indicada como número
+    return ESCALAS[escala] if escala in ESCALAS else int(escala)
+
+
+def percentil(muestras: list[float], p: float) -> float:
+    # Percentil por rango más cercano de una lista ordenada
+    return muestras[max(0, math.ceil(p / 100 * len(muestras)) - 1)]
+
+
+def resumir(latencias: list[float], codigos: Counter, duracion: float) -> dict:
+    # Resumen de un escenario (latencias en milisegundos)
+    muestras = sorted(latencias)
+    return {
+        "peticiones": len(muestras),
+        "errores": sum(n for codigo, n in codigos.items() if codigo >= 400),
+        "codigos": {str(codigo): n for codigo, n in sorted(codigos.items())},
+        "duracion_s": round(duracion, 3),
+        "peticiones_s": round(len(muestras) / duracion, 2) if duracion else None,
+        "latencia_ms": {
+            "media": round(sum(muestras) / len(muestras) * 1000, 3),
+            "p50": round(percentil(muestras, 50) * 1000, 3),
+            "p95": round(percentil(muestras, 95) * 1000, 3),
+            "p99": round(percentil(muestras, 99) * 1000, 3),
+            "max": round(muestras[-1] * 1000, 3),
+        },
+    }
+
+
+async def ejecutar_escenario(
+    cliente, escenario, contexto, peticiones: int, concurrencia: int, semilla: int
+) -> dict:
+    """
+    Ejecuta `peticiones` peticiones de un escenario con `concurrencia`
+    trabajadores concurrentes. Solo se mide la petición que devuelve el
+    escenario, no su preparación.
+
+    Retorna:
+        Resumen de latencias, rendimiento y códigos de estado
+    """
+    latencias: list[float] = []
+    codigos: Counter = Counter()
+    restantes = peticiones
+
+    async def trabajador(numero: int) -> None:
+        nonlocal restantes
+        rng = random.Random(semilla * 1000 + numero)
+
+        while restantes > 0:
+            restantes -= 1
+            metodo, ruta, argumentos = await escenario(cliente, contexto, rng)
+
+            inicio = time.perf_counter()
+            respuesta = await cliente.request(metodo, ruta, **argumentos)
+            latencias.append(time.perf_counter() - inicio)
+            codigos[respuesta.status_code] += 1
+
+    inicio = time.perf_counter()
+    await asyncio.gather(*(trabajador(n) for n in range(concurrencia)))
+    return resumir(latencias, codigos, time.perf_counter() - inicio)
+
+
+def obtener_commit() -> str | None:
+    # Commit actual del repositorio, si está disponible
+    try:
+        resultado = subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"],
+            capture_output=True,
+            text=True,
+            check=True,
+        )
+    except (OSError, subprocess.CalledProcessError):
+        return None
+    return resultado.stdout.strip()
+
+
+def obtener_argumentos(argumentos: list[str] | None = None) -> argparse.Namespace:
+    from benchmarks.escenarios import ESCENARIOS
+
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--escala", default="1k", help="1k, 100k, 5M o un número")
+    parser.add_argument("--peticiones", type=int, default=200)
+    parser.add_argument("--concurrencia", type=int, default=8)
+    parser.add_argument("--escenarios", default=",".join(ESCENARIOS))
+    parser.add_argument("--db", help="Fichero SQLite (por defecto, uno temporal)")
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--salida", help="Fichero JSON (por defecto, stdout)")
+    args = parser.parse_args(argumentos)
+
+    args.escenarios = args.escenarios.split(",")
+    if desconocidos := set(args.escenarios) - set(ESCENARIOS):
+        parser.error(f"Escenarios desconocidos: {', '.join(sorted(desconocidos))}")
+
+    return args
+
+
+async def ejecutar(args: argparse.Namespace) -> dict:
+    # La aplicación se importa después de fijar DATABASE_URL
+    import httpx
+    from sqlmodel import Session, func, select
+
+    from benchmarks.escenarios import (
+        ESCENARIOS,
+        TAMANO_MUESTRA,
+        Contexto,
+        iniciar_sesion,
+    )
+    from database.connection import obtener_async_engine, obtener_engine
+    from database.generar_datos import correo, dimensiones, generar_datos
+    from database.migraciones import migrar
+    from main import app
+    from models.Asistencia import Asistencia
+    from models.Clase import Clase
+    from models.Usuario import RolUsuario, Usuario
+    from services.pool_cifrado import pool_cifrado
+
+    asistencias = obtener_escala(args.escala)
+    engine = obtener_engine()
+    migrar(engine)
+
+    with Session(engine) as db:
+        poblada = db.exec(select(func.count()).select_from(Asistencia)).one() > 0
+
+    inicio = time.perf_counter()
+    if not poblada:
+        generar_datos(engine, asistencias, args.semilla)
+    tiempo_poblado = time.perf_counter() - inicio
+
+    with Session(engine) as db:
+
+        def muestra(columna, *condiciones):
+            statement = select(columna).where(*condiciones).limit(TAMANO_MUESTRA)
+            return list(db.exec(statement.order_by(func.random())).all())
+
+        contexto = Contexto(
+            estudiantes=db.exec(
+                select(func.count())
+                .select_from(Usuario)
+                .where(Usuario.rol == RolUsuario.estudiante)
+            ).one(),
+            clases=muestra(Clase.id),
+            asistencias=muestra(Asistencia.id),
+            usuarios=muestra(Usuario.id, Usuario.rol == RolUsuario.estudiante),
+        )
+
+    transporte = httpx.ASGITransport(app=app)
+    resultados = {}
+
+    try:
+        async with httpx.AsyncClient(
+            transport=transporte, base_url="http://benchmark"
+        ) as cliente:
+            contexto.cabeceras_profesor = await iniciar_sesion(
+                cliente, correo(RolUsuario.profesor, 0)
+            )
+
+            for nombre in args.escenarios:
+                resultados[nombre] = await ejecutar_escenario(
+                    cliente,
+                    ESCENARIOS[nombre],
+                    contexto,
+                    args.peticiones,
+                    args.concurrencia,
+                    args.semilla,
+                )
+    finally:
+        pool_cifrado.cerrar()
+        await obtener_async_engine().dispose()
+
+    return {
+        "commit": obtener_commit(),
+        "fecha": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "plataforma": platform.platform(),
+        "escala": args.escala,
+        "datos": dimensiones(asistencias),
+        "poblado_s": round(tiempo_poblado, 3) if not poblada else None,
+        "peticiones": args.peticiones,
+        "concurrencia": args.concurrencia,
+        "semilla": args.semilla,
+        "escenarios": resultados,
+    }
+
+
+def main(argumentos: list[str] | None = None) -> None:
+    args = obtener_argumentos(argumentos)
+
+    ruta_db = args.db or os.path.join(tempfile.mkdtemp(), "benchmark.db")
+    os.environ["DATABASE_URL"] = f"sqlite:///{ruta_db}"
+
+    resultado = json.dumps(asyncio.run(ejecutar(args)), indent=2)
+
+    if args.salida:
+        with open(args.salida, "w", encoding="utf-8") as fichero:
+            fichero.write(resultado + "\n")
+    else:
+        sys.stdout.write(resultado + "\n")
+
+
+if __name__ == "__main__":
+    main()
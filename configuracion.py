@@ -0,0 +1,76 @@
+# Importaciones
+import os
+
+from dotenv import load_dotenv
+
+# Cargar variables de entorno
+load_dotenv()
+
+# Valores que se interpretan como verdadero en variables booleanas
+VALORES_VERDADEROS = {"1", "true", "si", "sí", "yes", "on"}
+
+
+def obtener_texto(nombre: str, defecto: str | None = None) -> str | None:
+    """
+    Obtiene una variable de entorno de texto.
+
+    Argumentos:
+        nombre: Nombre de la variable
+        defecto: Valor si no está definida o está vacía
+
+    Retorna:
+        Valor de la variable
+    """
+    valor = os.getenv(nombre)
+    return valor if valor else defecto
+
+
+def obtener_entero(nombre: str, defecto: int) -> int:
+    """
+    Obtiene una variable de entorno entera.
+
+    Argumentos:
+        nombre: Nombre de la variable
+        defecto: Valor si no está definida o está vacía
+
+    Retorna:
+        Valor de la variable
+
+    Excepciones:
+        ValueError: Si el valor no es un entero
+    """
+    valor = os.getenv(nombre)
+    return int(valor) if valor else defecto
+
+
+def obtener_flotante(nombre: str, defecto: float) -> float:
+    """
+    Obtiene una variable de entorno decimal.
+
+    Argumentos:
+        nombre: Nombre de la variable
+        defecto: Valor si no está definida o está vacía
+
+    Retorna:
+        Valor de la variable
+
+    Excepciones:
+        ValueError: Si el valor no es un número
+    """
+    valor = os.getenv(nombre)
+    return float(valor) if valor else defecto
+
+
+def obtener_booleano(nombre: str, defecto: bool) -> bool:
+    """
+    Obtiene una variable de entorno booleana (1/true/si/yes/on).
+
+    Argumentos:
+        nombre: Nombre de la variable
+        defecto: Valor si no está definida o está vacía
+
+    Retorna:
+        Valor de la variable
+    """
+    valor = os.getenv(nombre)
+    return valor.strip().lower() in VALORES_VERDADEROS if valor else defecto
@@ -1,29 +1,329 @@
 # Importaciones
-import os
+import logging
+import time
+from functools import cache
 
-from dotenv import load_dotenv
+from fastapi import Request
+from sqlalchemy import Engine, event, make_url
+from sqlalchemy.ext.asyncio import AsyncEngine, create_async_engine
 from sqlmodel import Session, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-# Cargar variables de entorno
-load_dotenv()
+from configuracion import (
+    obtener_booleano,
+    obtener_entero,
+    obtener_flotante,
+    obtener_texto,
+)
+
+# El perfil se registra en el log de uvicorn, que muestra los mensajes INFO al
+# arrancar (el logger raíz solo muestra a partir de WARNING)
+logger = logging.getLogger("uvicorn.error")
+
+# Drivers asíncronos equivalentes a cada driver síncrono
+DRIVERS_ASYNC = {
+    "sqlite": "sqlite+aiosqlite",
+    "postgres": "postgresql+asyncpg",
+    "postgresql": "postgresql+asyncpg",
+    "postgresql+psycopg2": "postgresql+asyncpg",
+    "mysql": "mysql+aiomysql",
+    "mysql+pymysql": "mysql+aiomysql",
+}
+
+
+# Obtener la URL de conexión de la base de datos
+def obtener_url():
+    # URL de conexión de la base de datos
+    return obtener_texto("DATABASE_URL", "sqlite:///database.db")
+
+
+# Convertir una URL síncrona a su driver asíncrono (sqlite -> aiosqlite, ...)
+def obtener_url_async(url: str):
+    esquema, separador, resto = url.partition("://")
+    return f"{DRIVERS_ASYNC.get(esquema, esquema)}{separador}{resto}"
+
+
+def obtener_pragmas_sqlite() -> dict[str, str | int]:
+    """
+    Obtiene los PRAGMA del perfil SQLite que se aplican a cada conexión.
+    WAL permite lectores concurrentes con un escritor, synchronous=NORMAL es
+    seguro con WAL y evita un fsync por commit, y busy_timeout espera al
+    bloqueo en lugar de fallar con "database is locked".
+
+    Retorna:
+        Diccionario PRAGMA -> valor
+    """
+    return {
+        "journal_mode": obtener_texto("DB_SQLITE_JOURNAL_MODE", "WAL"),
+        "synchronous": obtener_texto("DB_SQLITE_SYNCHRONOUS", "NORMAL"),
+        "busy_timeout": obtener_entero("DB_SQLITE_BUSY_TIMEOUT", 5000),
+        "mmap_size": obtener_entero("DB_SQLITE_MMAP_SIZE", 268435456),
+        "cache_size": obtener_entero("DB_SQLITE_CACHE_SIZE", -64000),
+    }
+
+
+def obtener_opciones_engine(url: str) -> tuple[str, dict]:
+    """
+    Obtiene el perfil y los argumentos de create_engine a partir de las
+    variables de entorno DB_*. SQLite en memoria usa un pool de una sola
+    conexión, por lo que no admite las opciones de tamaño del pool.
+
+    Argumentos:
+        url: URL de conexión de la base de datos
+
+    Retorna:
+        Nombre del perfil y argumentos para create_engine
+    """
+    url_db = make_url(url)
+    opciones = {
+        "echo": obtener_booleano("DB_ECHO", False),
+        "pool_pre_ping": obtener_booleano("DB_POOL_PRE_PING", True),
+    }
+
+    es_sqlite = url_db.get_backend_name() == "sqlite"
+    en_memoria = url_db.database in (None, "", ":memory:") or (
+        url_db.query.get("mode") == "memory"
+    )
+
+    if not en_memoria:
+        opciones.update(
+            pool_size=obtener_entero("DB_POOL_SIZE", 5),
+            max_overflow=obtener_entero("DB_MAX_OVERFLOW", 10),
+            pool_recycle=obtener_entero("DB_POOL_RECYCLE", 1800),
+            pool_timeout=obtener_entero("DB_POOL_TIMEOUT", 30),
+        )
+
+    if es_sqlite:
+        return ("sqlite-memoria" if en_memoria else "sqlite"), opciones
+
+    return url_db.get_backend_name(), opciones
+
+
+def configurar_engine(engine: Engine, perfil: str, opciones: dict) -> None:
+    """
+    Aplica el perfil al motor: en SQLite registra los PRAGMA en cada nueva
+    conexión. Registra el perfil activo en el log de arranque de uvicorn.
+
+    Argumentos:
+        engine: Motor síncrono (o sync_engine de un motor asíncrono)
+        perfil: Perfil devuelto por obtener_opciones_engine
+        opciones: Argumentos con los que se creó el motor
+    """
+    detalles = " ".join(f"{opcion}={valor}" for opcion, valor in opciones.items())
+
+    if perfil == "sqlite":
+        pragmas = obtener_pragmas_sqlite()
+
+        @event.listens_for(engine, "connect")
+        def aplicar_pragmas(dbapi_connection, connection_record):
+            cursor = dbapi_connection.cursor()
+            for pragma, valor in pragmas.items():
+                cursor.execute(f"PRAGMA {pragma}={valor}")
+            cursor.close()
+
+        detalles += " " + " ".join(f"{p}={v}" for p, v in pragmas.items())
+
+    logger.info(
+        "Perfil de base de datos '%s' (%s): %s", perfil, engine.driver, detalles
+    )
 
 
 # Obtener motor de la base de datos
 def get_engine():
-    # URL de conexión de la base de datos
-    DATABASE_URL = os.getenv("DATABASE_URL")
+    url = obtener_url()
+    perfil, opciones = obtener_opciones_engine(url)
+
+    engine = create_engine(url, **opciones)
+    configurar_engine(engine, perfil, opciones)
+    return engine
+
+
+# Crear un motor asíncrono con el perfil de su URL
+def crear_async_engine(url: str):
+    perfil, opciones = obtener_opciones_engine(url)
+
+    async_engine = create_async_engine(url, **opciones)
+    configurar_engine(async_engine.sync_engine, perfil, opciones)
+    return async_engine
+
+
+# Obtener motor asíncrono de la base de datos
+def get_async_engine():
+    # DATABASE_ASYNC_URL permite indicar el driver asíncrono de forma explícita
+    url = obtener_texto("DATABASE_ASYNC_URL", obtener_url_async(obtener_url()))
+    return crear_async_engine(url)
+
+
+# Obtener motor asíncrono de la réplica de lectura (None si no hay réplica)
+def get_async_engine_lectura():
+    url = obtener_texto("DATABASE_READ_URL")
+    if not url:
+        return None
+
+    # DATABASE_READ_ASYNC_URL permite indicar el driver asíncrono de la réplica
+    return crear_async_engine(
+        obtener_texto("DATABASE_READ_ASYNC_URL", obtener_url_async(url))
+    )
+
 
-    if not DATABASE_URL:
-        DATABASE_URL = "sqlite:///database.db"
+# Cookie con el instante de la última escritura del cliente
+COOKIE_ESCRITURA = "escritura_reciente"
 
-    return create_engine(DATABASE_URL, echo=True)
 
+class EnrutadorLectura:
+    """
+    Elige el motor de las sesiones de solo lectura. Las lecturas van a la
+    réplica salvo las de un cliente que ha escrito en los últimos `ventana`
+    segundos (cookie COOKIE_ESCRITURA), que van al primario para que vea sus
+    propios cambios aunque la réplica aún no los tenga.
 
-# Motor de la base de datos
-engine = get_engine()
+    Atributos:
+        primario: Motor asíncrono del primario
+        replica: Motor asíncrono de la réplica (None envía todo al primario)
+        ventana: Segundos tras una escritura en los que el cliente lee del primario
+    """
+
+    def __init__(
+        self, primario: AsyncEngine, replica: AsyncEngine | None, ventana: float
+    ):
+        self.primario = primario
+        self.replica = replica
+        self.ventana = ventana
+
+    def escritura_reciente(self, request: Request) -> bool:
+        """
+        Comprueba si el cliente de la petición ha escrito dentro de la ventana.
+
+        Argumentos:
+            request: Petición
+
+        Retorna:
+            True si la cookie de escritura tiene menos de `ventana` segundos
+        """
+        try:
+            instante = float(request.cookies[COOKIE_ESCRITURA])
+        except (KeyError, ValueError):
+            return False
+
+        return time.time() - instante < self.ventana
+
+    def elegir(self, request: Request) -> AsyncEngine:
+        """
+        Obtiene el motor con el que se leen los datos de una petición.
+
+        Argumentos:
+            request: Petición
+
+        Retorna:
+            Motor de la réplica o del primario
+        """
+        if self.replica is None or self.escritura_reciente(request):
+            return self.primario
+
+        return self.replica
+
+
+# Los motores se crean en su primer uso y no al importar el módulo: importar
+# la aplicación no lee la configuración de la base de datos ni crea pools.
+
+
+# Motor de la base de datos (se crea una vez)
+@cache
+def obtener_engine():
+    return get_engine()
+
+
+# Motor asíncrono de la base de datos (se crea una vez)
+@cache
+def obtener_async_engine():
+    return get_async_engine()
+
+
+# Motor asíncrono de la réplica de lectura (se crea una vez; None sin réplica)
+@cache
+def obtener_async_engine_lectura():
+    return get_async_engine_lectura()
+
+
+# Enrutado de las lecturas entre la réplica y el primario (se crea una vez).
+# Tras escribir, el cliente lee del primario durante
+# DB_LECTURA_VENTANA_ESCRITURA segundos.
+@cache
+def obtener_enrutador_lectura():
+    return EnrutadorLectura(
+        obtener_async_engine(),
+        obtener_async_engine_lectura(),
+        obtener_flotante("DB_LECTURA_VENTANA_ESCRITURA", 5.0),
+    )
+
+
+# Nombres del módulo que se resuelven en el primer acceso
+# (from database.connection import engine)
+ATRIBUTOS_PEREZOSOS = {
+    "engine": obtener_engine,
+    "async_engine": obtener_async_engine,
+    "async_engine_lectura": obtener_async_engine_lectura,
+    "enrutador_lectura": obtener_enrutador_lectura,
+}
+
+
+def __getattr__(nombre: str):
+    if nombre in ATRIBUTOS_PEREZOSOS:
+        return ATRIBUTOS_PEREZOSOS[nombre]()
+    raise AttributeError(f"module {__name__!r} has no attribute {nombre!r}")
+
+
+def engines_creados() -> list[Engine]:
+    """
+    Obtiene los motores síncronos creados hasta el momento (los asíncronos,
+    por su sync_engine), por ejemplo para instrumentarlos.
+
+    Retorna:
+        Motores síncronos
+    """
+    engines = []
+
+    if obtener_engine.cache_info().currsize:
+        engines.append(obtener_engine())
+    if obtener_async_engine.cache_info().currsize:
+        engines.append(obtener_async_engine().sync_engine)
+    if obtener_async_engine_lectura.cache_info().currsize:
+        if (engine_lectura := obtener_async_engine_lectura()) is not None:
+            engines.append(engine_lectura.sync_engine)
+
+    return engines
+
+
+async def cerrar_engines() -> None:
+    """
+    Cierra las conexiones del pool de los motores creados.
+    """
+    if obtener_async_engine.cache_info().currsize:
+        await obtener_async_engine().dispose()
+    if obtener_async_engine_lectura.cache_info().currsize:
+        if (engine_lectura := obtener_async_engine_lectura()) is not None:
+            await engine_lectura.dispose()
+    if obtener_engine.cache_info().currsize:
+        obtener_engine().dispose()
 
 
 # Depedencia para obtener la sesión de la BD
 def obtener_db():
-    with Session(engine) as session:
+    with Session(obtener_engine()) as session:
+        yield session
+
+
+# Dependencia para obtener la sesión asíncrona de la BD.
+# expire_on_commit=False evita recargas perezosas fuera del bucle de eventos.
+async def obtener_db_async():
+    async with AsyncSession(obtener_async_engine(), expire_on_commit=False) as session:
+        yield session
+
+
+# Dependencia para obtener una sesión asíncrona de solo lectura: en la réplica
+# si está configurada (DATABASE_READ_URL) o en el primario si el cliente acaba
+# de escribir. Solo la usan rutas GET.
+async def obtener_db_lectura(request: Request):
+    engine_lectura = obtener_enrutador_lectura().elegir(request)
+    async with AsyncSession(engine_lectura, expire_on_commit=False) as session:
         yield session
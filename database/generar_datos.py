@@ -0,0 +1,300 @@
+"""
+Generador de datos sintéticos para reproducir en local volúmenes de producción.
+
+Genera profesores, estudiantes repartidos en grupos, un horario semanal por
+grupo (una clase por grupo, semana y sesión) y la asistencia de cada
+estudiante a cada clase con proporciones realistas de presentes, retrasos y
+ausencias. Las filas se insertan directamente con INSERT de
+varias filas por lotes, sin pasar por los servicios: la contraseña se cifra
+una sola vez y se comparte por todos los usuarios, y no hay un commit por
+registro. Las clases se generan semana a semana, de modo que un número de
+asistencias menor que el curso completo equivale a un curso en marcha.
+
+Uso:
+    python -m database.generar_datos --asistencias 10000000 [--semilla 0]
+        [--alumnos-por-grupo 25] [--sesiones-semana 20] [--semanas 36]
+        [--lote 10000]
+
+Escribe en la base de datos de DATABASE_URL, que debe estar vacía.
+"""
+
+# Importaciones
+import argparse
+import json
+import math
+import random
+import sys
+import time
+import uuid
+from datetime import date, datetime
+from datetime import time as hora
+from datetime import timedelta
+
+from sqlalchemy import Engine, func, select
+
+from models.Asistencia import Asistencia, EstadoAsistencia
+from models.Clase import Clase
+from models.Usuario import RolUsuario, Usuario
+from services.usuario_services import cifrar_contrasena
+
+# Contraseña de todos los usuarios generados
+CONTRASENA = "datos-sinteticos"
+
+# Dominio de los correos electrónicos generados
+DOMINIO = "datos.test"
+
+# Lunes de la primera semana del curso generado
+INICIO_CURSO = date(2025, 9, 1)
+
+# Sesiones semanales que imparte cada profesor
+SESIONES_PROFESOR = 20
+
+# Proporción de estudiantes con ausencias frecuentes
+PROPORCION_ABSENTISTAS = 0.1
+
+# Probabilidad acumulada de presente y de retraso (el resto, ausente) de los
+# estudiantes regulares y de los absentistas
+PROBABILIDADES_REGULAR = (0.92, 0.96)
+PROBABILIDADES_ABSENTISTA = (0.68, 0.80)
+
+# Minutos de retraso de una asistencia con estado retraso
+MINUTOS_RETRASO = 10
+
+
+def correo(rol: RolUsuario, indice: int) -> str:
+    """
+    Correo electrónico del usuario generado número `indice` de un rol.
+    """
+    return f"{rol.value}{indice}@{DOMINIO}"
+
+
+def dimensiones(
+    asistencias: int,
+    alumnos_por_grupo: int = 25,
+    sesiones_semana: int = 20,
+    semanas: int = 36,
+) -> dict[str, int]:
+    """
+    Calcula el número de registros de cada tabla.
+
+    Argumentos:
+        asistencias: Número de asistencias
+        alumnos_por_grupo: Estudiantes de cada grupo
+        sesiones_semana: Clases semanales de cada grupo
+        semanas: Semanas del curso
+
+    Retorna:
+        Número de grupos, estudiantes, profesores, clases y asistencias
+    """
+    grupos = max(
+        1, math.ceil(asistencias / (alumnos_por_grupo * sesiones_semana * semanas))
+    )
+    return {
+        "grupos": grupos,
+        "estudiantes": grupos * alumnos_por_grupo,
+        "profesores": math.ceil(grupos * sesiones_semana / SESIONES_PROFESOR),
+        "clases": math.ceil(asistencias / alumnos_por_grupo),
+        "asistencias": asistencias,
+    }
+
+
+def generar_datos(
+    engine: Engine,
+    asistencias: int,
+    semilla: int = 0,
+    alumnos_por_grupo: int = 25,
+    sesiones_semana: int = 20,
+    semanas: int = 36,
+    lote: int = 10_000,
+) -> dict[str, int]:
+    """
+    Inserta los datos sintéticos en una base de datos con las tablas creadas.
+    Los índices de la tabla de asistencias se eliminan durante la carga y se
+    vuelven a crear al final, que es más rápido que mantenerlos fila a fila.
+
+    Argumentos:
+        engine: Motor de la base de datos
+        asistencias: Número de asistencias
+        semilla: Semilla de los datos generados
+        alumnos_por_grupo: Estudiantes de cada grupo
+        sesiones_semana: Clases semanales de cada grupo (de lunes a viernes)
+        semanas: Semanas del curso
+        lote: Filas por cada INSERT
+
+    Retorna:
+        Número de registros de cada tabla
+    """
+    rng = random.Random(semilla)
+    n = dimensiones(asistencias, alumnos_por_grupo, sesiones_semana, semanas)
+    contrasena = cifrar_contrasena(CONTRASENA)
+    registro = datetime.combine(INICIO_CURSO - timedelta(days=7), hora.min)
+
+    def nuevos_ids(cantidad: int) -> list[str]:
+        return [
+            str(uuid.UUID(int=rng.getrandbits(128), version=4)) for _ in range(cantidad)
+        ]
+
+    def usuarios(rol: RolUsuario, cantidad: int) -> list[dict]:
+        return [
+            {
+                "id": id_usuario,
+                "nombre": f"{rol.value.capitalize()}{i}",
+                "apellido": "Sintético",
+                "correoElectronico": correo(rol, i),
+                "contrasena": contrasena,
+                "rol": rol,
+                "fechaRegistro": registro,
+                "activo": True,
+            }
+            for i, id_usuario in enumerate(nuevos_ids(cantidad))
+        ]
+
+    estudiantes = usuarios(RolUsuario.estudiante, n["estudiantes"])
+    profesores = usuarios(RolUsuario.profesor, n["profesores"])
+    ids_estudiantes = [fila["id"] for fila in estudiantes]
+    ids_profesores = [fila["id"] for fila in profesores]
+
+    # Probabilidades de cada estudiante según su perfil
+    probabilidades = [
+        (
+            PROBABILIDADES_ABSENTISTA
+            if rng.random() < PROPORCION_ABSENTISTAS
+            else PROBABILIDADES_REGULAR
+        )
+        for _ in ids_estudiantes
+    ]
+
+    # Horario semanal: la sesión s es el día s % 5 a la hora 8 + s // 5
+    franjas = [
+        (s % 5, hora(8 + s // 5, 0), hora(9 + s // 5, 0))
+        for s in range(sesiones_semana)
+    ]
+
+    tabla_asistencia = Asistencia.__table__
+
+    with engine.begin() as conexion:
+        if conexion.execute(select(func.count()).select_from(Usuario)).scalar():
+            raise RuntimeError("La base de datos ya tiene usuarios")
+
+        conexion.execute(Usuario.__table__.insert(), estudiantes)
+        conexion.execute(Usuario.__table__.insert(), profesores)
+        conexion.execute(Usuario.__table__.insert(), usuarios(RolUsuario.admin, 1))
+
+        for indice in tabla_asistencia.indexes:
+            indice.drop(conexion)
+
+        clases: list[dict] = []
+        filas: list[dict] = []
+        restantes = asistencias
+
+        def insertar_pendientes(todo: bool = False) -> None:
+            # Las clases se insertan antes que sus asistencias (clave foránea)
+            if clases and (todo or len(filas) >= lote):
+                conexion.execute(Clase.__table__.insert(), clases)
+                clases.clear()
+            if filas and (todo or len(filas) >= lote):
+                conexion.execute(tabla_asistencia.insert(), filas)
+                filas.clear()
+
+        for semana in range(semanas):
+            lunes = INICIO_CURSO + timedelta(weeks=semana)
+
+            for grupo in range(n["grupos"]):
+                alumnos = range(
+                    grupo * alumnos_por_grupo, (grupo + 1) * alumnos_por_grupo
+                )
+
+                for s, (dia, inicio, fin) in enumerate(franjas):
+                    if restantes <= 0:
+                        break
+
+                    fecha = datetime.combine(lunes + timedelta(days=dia), inicio)
+                    id_clase = nuevos_ids(1)[0]
+                    clases.append(
+                        {
+                            "id": id_clase,
+                            "nombre": f"Grupo {grupo} - Sesión {s}",
+                            "fecha": datetime.combine(fecha.date(), hora.min),
+                            "horaInicio": inicio,
+                            "horaFin": fin,
+                            "profesorId": ids_profesores[
+                                (grupo * sesiones_semana + s) % len(ids_profesores)
+                            ],
+                            "horarioId": None,
+                        }
+                    )
+
+                    # Columnas de las asistencias de la clase, generadas juntas
+                    cantidad = min(alumnos_por_grupo, restantes)
+                    retraso = fecha + timedelta(minutes=MINUTOS_RETRASO)
+                    estados = []
+                    fechas = []
+                    for alumno in alumnos[:cantidad]:
+                        aleatorio = rng.random()
+                        presente, con_retraso = probabilidades[alumno]
+                        if aleatorio < presente:
+                            estados.append(EstadoAsistencia.presente)
+                            fechas.append(fecha)
+                        elif aleatorio < con_retraso:
+                            estados.append(EstadoAsistencia.retraso)
+                            fechas.append(retraso)
+                        else:
+                            estados.append(EstadoAsistencia.ausente)
+                            fechas.append(fecha)
+
+                    filas.extend(
+                        {
+                            "id": id_asistencia,
+                            "fecha": fecha_asistencia,
+                            "estado": estado,
+                            "usuarioId": ids_estudiantes[alumno],
+                            "claseId": id_clase,
+                        }
+                        for id_asistencia, fecha_asistencia, estado, alumno in zip(
+                            nuevos_ids(cantidad), fechas, estados, alumnos
+                        )
+                    )
+
+                    restantes -= cantidad
+                    insertar_pendientes()
+
+        insertar_pendientes(todo=True)
+
+        for indice in tabla_asistencia.indexes:
+            indice.create(conexion)
+
+    return n
+
+
+def main(argumentos: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--asistencias", type=int, required=True)
+    parser.add_argument("--semilla", type=int, default=0)
+    parser.add_argument("--alumnos-por-grupo", type=int, default=25)
+    parser.add_argument("--sesiones-semana", type=int, default=20)
+    parser.add_argument("--semanas", type=int, default=36)
+    parser.add_argument("--lote", type=int, default=10_000)
+    args = parser.parse_args(argumentos)
+
+    from database.connection import obtener_engine
+    from database.migraciones import migrar
+
+    engine = obtener_engine()
+    migrar(engine)
+
+    inicio = time.perf_counter()
+    n = generar_datos(
+        engine,
+        args.asistencias,
+        args.semilla,
+        args.alumnos_por_grupo,
+        args.sesiones_semana,
+        args.semanas,
+        args.lote,
+    )
+    n["segundos"] = round(time.perf_counter() - inicio, 1)
+    sys.stdout.write(json.dumps(n) + "\n")
+
+
+if __name__ == "__main__":
+    main()
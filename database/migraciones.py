@@ -0,0 +1,463 @@
+"""
+Migraciones versionadas del esquema de la base de datos.
+
+Cada migración tiene un número de versión y se aplica una sola vez, en su
+propia transacción, junto con el registro de su versión en la tabla
+version_esquema. La API no modifica el esquema al importarse ni al arrancar:
+las migraciones se aplican de forma explícita antes de desplegar.
+
+Uso:
+    python -m database.migraciones [--estado] [--hasta VERSION]
+
+Aplica las migraciones pendientes en la base de datos de DATABASE_URL (con
+--estado solo las muestra).
+"""
+
+# Importaciones
+import argparse
+import json
+import sys
+from dataclasses import dataclass
+from typing import Callable, Optional
+
+from sqlalchemy import (
+    JSON,
+    Boolean,
+    Column,
+    Connection,
+    Date,
+    DateTime,
+    Engine,
+    Enum,
+    ForeignKey,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    Time,
+    func,
+    inspect,
+    select,
+    text,
+)
+from sqlalchemy.schema import CreateColumn
+
+from database.zone_horary import madrid_utc
+
+# Tabla con las migraciones aplicadas. No forma parte de SQLModel.metadata:
+# solo la usan las migraciones.
+tabla_version_esquema = Table(
+    "version_esquema",
+    MetaData(),
+    Column("version", Integer, primary_key=True),
+    Column("nombre", String, nullable=False),
+    Column("fechaAplicacion", DateTime, nullable=False),
+)
+
+
+@dataclass(frozen=True)
+class Migracion:
+    """
+    Migración del esquema.
+
+    Atributos:
+        version: Número de versión (consecutivo, empezando por 1)
+        nombre: Nombre descriptivo
+        aplicar: Función que aplica la migración sobre una conexión con una
+            transacción abierta
+    """
+
+    version: int
+    nombre: str
+    aplicar: Callable[[Connection], None]
+
+
+# Cada migración define las tablas, columnas e índices que crea con su DDL
+# fijo, sin leer los modelos: editar un modelo no cambia lo que hace una
+# migración ya aplicada, sino que requiere una migración nueva. Las tablas de
+# otras migraciones a las que apuntan las claves foráneas se declaran solo
+# con su clave primaria (referencia) y no se crean.
+#
+# Todas comprueban el estado antes de cambiarlo, de modo que también adoptan
+# las bases de datos creadas por versiones anteriores de la API (que hacían
+# create_all al arrancar) con una parte del esquema ya creada.
+
+
+def referencia(metadata: MetaData, nombre: str) -> Table:
+    """
+    Declara una tabla existente por su clave primaria, solo para resolver
+    las claves foráneas que apuntan a ella.
+    """
+    return Table(nombre, metadata, Column("id", String, primary_key=True))
+
+
+def crear_tablas(conexion: Connection, *tablas: Table) -> None:
+    """
+    Crea las tablas que no existan y los índices que les falten.
+
+    Argumentos:
+        conexion: Conexión con una transacción abierta
+        tablas: Tablas a crear
+    """
+    for tabla in tablas:
+        tabla.create(conexion, checkfirst=True)
+        crear_indices(conexion, *tabla.indexes)
+
+
+def crear_indices(conexion: Connection, *indices: Index) -> None:
+    """
+    Crea los índices que no existan.
+
+    Argumentos:
+        conexion: Conexión con una transacción abierta
+        indices: Índices a crear
+    """
+    for indice in indices:
+        indice.create(conexion, checkfirst=True)
+
+
+def agregar_columna(conexion: Connection, columna: Column) -> None:
+    """
+    Añade una columna a una tabla existente si no la tiene, con su clave
+    foránea. Solo admite columnas que aceptan nulos (ALTER TABLE ADD COLUMN no
+    puede rellenar filas existentes sin un valor por defecto).
+
+    Argumentos:
+        conexion: Conexión con una transacción abierta
+        columna: Columna de la tabla
+    """
+    tabla = columna.table
+    existentes = {c["name"] for c in inspect(conexion).get_columns(tabla.name)}
+
+    if columna.name in existentes:
+        return
+
+    if not columna.nullable:
+        raise RuntimeError(
+            f"No se puede añadir la columna obligatoria {tabla.name}.{columna.name}"
+        )
+
+    preparer = conexion.dialect.identifier_preparer
+    nombre_tabla = preparer.format_table(tabla)
+    definicion = str(CreateColumn(columna).compile(dialect=conexion.dialect))
+
+    for clave in columna.foreign_keys:
+        destino = clave.column
+        definicion += (
+            f" REFERENCES {preparer.format_table(destino.table)}"
+            f" ({preparer.format_column(destino)})"
+        )
+
+    conexion.execute(text(f"ALTER TABLE {nombre_tabla} ADD COLUMN {definicion}"))
+
+
+def eliminar_asistencias_duplicadas(conexion: Connection, asistencia: Table) -> int:
+    """
+    Elimina las asistencias repetidas de un mismo usuario en una misma clase,
+    conservando la más reciente. Es necesario antes de crear el índice único
+    (claseId, usuarioId) en una base de datos existente.
+
+    Argumentos:
+        conexion: Conexión con una transacción abierta
+        asistencia: Tabla de asistencias
+
+    Retorna:
+        Número de asistencias eliminadas
+    """
+    c = asistencia.c
+    duplicados = conexion.execute(
+        select(c.claseId, c.usuarioId)
+        .group_by(c.claseId, c.usuarioId)
+        .having(func.count() > 1)
+    ).all()
+
+    eliminadas = 0
+
+    for id_clase, id_usuario in duplicados:
+        ids = conexion.scalars(
+            select(c.id)
+            .where(c.claseId == id_clase, c.usuarioId == id_usuario)
+            .order_by(c.fecha.desc(), c.id.desc())
+        ).all()
+
+        resultado = conexion.execute(asistencia.delete().where(c.id.in_(ids[1:])))
+        eliminadas += resultado.rowcount
+
+    return eliminadas
+
+
+def tablas_base(conexion: Connection) -> None:
+    """
+    Migración 1. Tablas de usuarios, clases y asistencias.
+    """
+    metadata = MetaData()
+
+    usuario = Table(
+        "usuario",
+        metadata,
+        Column("id", String, primary_key=True, index=True),
+        Column("nombre", String(50), nullable=False),
+        Column("apellido", String(60), nullable=False),
+        Column("correoElectronico", String(100), nullable=False),
+        Column("contrasena", String, nullable=False),
+        Column(
+            "rol",
+            Enum("admin", "profesor", "estudiante", name="rolusuario"),
+            nullable=False,
+        ),
+        Column("fechaRegistro", DateTime, nullable=False),
+        Column("activo", Boolean, nullable=False),
+        Index("ix_usuario_correoElectronico", "correoElectronico", unique=True),
+    )
+    clase = Table(
+        "clase",
+        metadata,
+        Column("id", String, primary_key=True, index=True),
+        Column("nombre", String(50), nullable=False),
+        Column("fecha", DateTime, nullable=False),
+        Column("horaInicio", Time, nullable=False),
+        Column("horaFin", Time, nullable=False),
+        Column("profesorId", String, ForeignKey("usuario.id"), nullable=False),
+    )
+    asistencia = Table(
+        "asistencia",
+        metadata,
+        Column("id", String, primary_key=True, index=True),
+        Column("fecha", DateTime, nullable=False),
+        Column(
+            "estado",
+            Enum("presente", "ausente", "retraso", name="estadoasistencia"),
+            nullable=False,
+        ),
+        Column("usuarioId", String, ForeignKey("usuario.id"), nullable=False),
+        Column("claseId", String, ForeignKey("clase.id"), nullable=False),
+    )
+
+    crear_tablas(conexion, usuario, clase, asistencia)
+
+
+def indices_asistencia(conexion: Connection) -> None:
+    """
+    Migración 2. Índices del historial de asistencias y de las asistencias de
+    una clase, y asistencia única por usuario y clase (se conserva la más
+    reciente de las repetidas).
+    """
+    asistencia = Table(
+        "asistencia",
+        MetaData(),
+        Column("id", String, primary_key=True),
+        Column("fecha", DateTime),
+        Column("usuarioId", String),
+        Column("claseId", String),
+    )
+    unico = Index(
+        "uq_asistencia_clase_usuario",
+        asistencia.c.claseId,
+        asistencia.c.usuarioId,
+        unique=True,
+    )
+
+    existentes = {i["name"] for i in inspect(conexion).get_indexes("asistencia")}
+
+    if unico.name not in existentes:
+        eliminar_asistencias_duplicadas(conexion, asistencia)
+
+    crear_indices(
+        conexion,
+        unico,
+        Index(
+            "ix_asistencia_usuario_fecha", asistencia.c.usuarioId, asistencia.c.fecha
+        ),
+        Index("ix_asistencia_clase_fecha", asistencia.c.claseId, asistencia.c.fecha),
+    )
+
+
+def horarios(conexion: Connection) -> None:
+    """
+    Migración 3. Tabla de horarios recurrentes y horario de cada clase.
+    """
+    metadata = MetaData()
+    referencia(metadata, "usuario")
+
+    horario = Table(
+        "horario",
+        metadata,
+        Column("id", String, primary_key=True, index=True),
+        Column("nombre", String(50), nullable=False),
+        Column("diasSemana", JSON, nullable=False),
+        Column("horaInicio", Time, nullable=False),
+        Column("horaFin", Time, nullable=False),
+        Column("fechaInicio", Date, nullable=False),
+        Column("fechaFin", Date, nullable=False),
+        Column("festivos", JSON, nullable=False),
+        Column("profesorId", String, ForeignKey("usuario.id"), nullable=False),
+    )
+    clase = Table(
+        "clase",
+        metadata,
+        Column("id", String, primary_key=True),
+        Column("horarioId", String, ForeignKey("horario.id"), nullable=True),
+    )
+
+    crear_tablas(conexion, horario)
+    agregar_columna(conexion, clase.c.horarioId)
+    crear_indices(conexion, Index("ix_clase_horarioId", clase.c.horarioId))
+
+
+def tablas_versiones(conexion: Connection) -> None:
+    """
+    Migración 4. Versiones de token (revocación) y versiones de cambio
+    (ETag y Last-Modified).
+    """
+    metadata = MetaData()
+    referencia(metadata, "usuario")
+
+    version_token = Table(
+        "version_token",
+        metadata,
+        Column("usuarioId", String, ForeignKey("usuario.id"), primary_key=True),
+        Column("version", Integer, nullable=False),
+        Column("fechaActualizacion", DateTime, nullable=False),
+    )
+    version_cambio = Table(
+        "version_cambio",
+        metadata,
+        Column("ambito", String(100), primary_key=True),
+        Column("version", Integer, nullable=False),
+        Column("fechaActualizacion", DateTime, nullable=False),
+    )
+
+    crear_tablas(conexion, version_token, version_cambio)
+
+
+def indices_filtros(conexion: Connection) -> None:
+    """
+    Migración 5. Índices de los filtros por fecha y profesor de los listados
+    de clases y asistencias.
+    """
+    metadata = MetaData()
+    clase = Table(
+        "clase",
+        metadata,
+        Column("id", String, primary_key=True),
+        Column("fecha", DateTime),
+        Column("profesorId", String),
+    )
+    asistencia = Table(
+        "asistencia",
+        metadata,
+        Column("id", String, primary_key=True),
+        Column("fecha", DateTime),
+    )
+
+    crear_indices(
+        conexion,
+        Index("ix_clase_fecha", clase.c.fecha, clase.c.id),
+        Index("ix_clase_profesor_fecha", clase.c.profesorId, clase.c.fecha, clase.c.id),
+        Index("ix_asistencia_fecha", asistencia.c.fecha),
+    )
+
+
+# Migraciones en orden de versión. Las nuevas se añaden al final y las ya
+# publicadas no se modifican.
+MIGRACIONES = (
+    Migracion(1, "tablas_base", tablas_base),
+    Migracion(2, "indices_asistencia", indices_asistencia),
+    Migracion(3, "horarios", horarios),
+    Migracion(4, "tablas_versiones", tablas_versiones),
+    Migracion(5, "indices_filtros", indices_filtros),
+)
+
+
+def versiones_aplicadas(conexion: Connection) -> set[int]:
+    """
+    Obtiene las versiones de las migraciones aplicadas.
+
+    Argumentos:
+        conexion: Conexión a la base de datos
+
+    Retorna:
+        Versiones aplicadas (vacío si la tabla version_esquema no existe)
+    """
+    if not inspect(conexion).has_table(tabla_version_esquema.name):
+        return set()
+
+    return set(conexion.scalars(select(tabla_version_esquema.c.version)).all())
+
+
+def migraciones_pendientes(engine: Engine) -> list[Migracion]:
+    """
+    Obtiene las migraciones que faltan por aplicar.
+
+    Argumentos:
+        engine: Motor de la base de datos
+
+    Retorna:
+        Migraciones pendientes, en orden de versión
+    """
+    with engine.connect() as conexion:
+        aplicadas = versiones_aplicadas(conexion)
+
+    return [m for m in MIGRACIONES if m.version not in aplicadas]
+
+
+def migrar(engine: Engine, hasta: Optional[int] = None) -> list[Migracion]:
+    """
+    Aplica las migraciones pendientes. Cada una se aplica en su propia
+    transacción junto con el registro de su versión, de modo que una
+    migración que falla no queda a medias ni registrada.
+
+    Argumentos:
+        engine: Motor de la base de datos
+        hasta: Última versión a aplicar (por defecto, todas)
+
+    Retorna:
+        Migraciones aplicadas
+    """
+    tabla_version_esquema.create(engine, checkfirst=True)
+    aplicadas = []
+
+    for migracion in migraciones_pendientes(engine):
+        if hasta is not None and migracion.version > hasta:
+            break
+
+        with engine.begin() as conexion:
+            migracion.aplicar(conexion)
+            conexion.execute(
+                tabla_version_esquema.insert().values(
+                    version=migracion.version,
+                    nombre=migracion.nombre,
+                    fechaAplicacion=madrid_utc(),
+                )
+            )
+
+        aplicadas.append(migracion)
+
+    return aplicadas
+
+
+def main(argumentos: list[str] | None = None) -> None:
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument("--estado", action="store_true")
+    parser.add_argument("--hasta", type=int)
+    args = parser.parse_args(argumentos)
+
+    from database.connection import obtener_engine
+
+    engine = obtener_engine()
+
+    if args.estado:
+        migraciones = migraciones_pendientes(engine)
+        clave = "pendientes"
+    else:
+        migraciones = migrar(engine, args.hasta)
+        clave = "aplicadas"
+
+    resultado = {clave: [f"{m.version:04d}_{m.nombre}" for m in migraciones]}
+    sys.stdout.write(json.dumps(resultado) + "\n")
+    engine.dispose()
+
+
+if __name__ == "__main__":
+    main()
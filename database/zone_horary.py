@@ -13,3 +13,14 @@ def madrid_utc():
     """
     madrid = datetime.now(ZoneInfo("Europe/Madrid"))
     return madrid.astimezone(ZoneInfo("UTC")).replace(tzinfo=None)
+
+
+def fecha_madrid():
+    """
+    Obtiene la fecha actual en Madrid.
+
+    Argumentos: None
+
+    Retorna: date
+    """
+    return datetime.now(ZoneInfo("Europe/Madrid")).date()
@@ -1,28 +1,68 @@
+# Importaciones
+from contextlib import asynccontextmanager
+
 # Importar FastAPI de su libreria
 from fastapi import FastAPI
 
 # Importar los endpoints desde la API
-from api import asistencia, clase, usuario
-from sqlmodel import SQLModel
+from api import asistencia, clase, horario, metricas, usuario
+
+# Importar la conexión a la base de datos. Los motores se crean en su primer
+# uso y el esquema se actualiza aparte (python -m database.migraciones).
+from database.connection import (
+    cerrar_engines,
+    engines_creados,
+    obtener_async_engine,
+    obtener_engine,
+    obtener_enrutador_lectura,
+)
+from services.escritura_reciente import MiddlewareEscrituraReciente
+from services.metricas import (
+    METRICAS_BD_HABILITADAS,
+    METRICAS_HABILITADAS,
+    MiddlewareMetricas,
+    instrumentar_engine,
+)
+from services.pool_cifrado import pool_cifrado
+
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Al arrancar se crean los motores (sin conectar ni modificar el esquema)
+    # y, si se miden las sentencias, se instrumentan para las métricas
+    obtener_engine()
+    obtener_async_engine()
+    obtener_enrutador_lectura()
+
+    if METRICAS_HABILITADAS and METRICAS_BD_HABILITADAS:
+        for engine in engines_creados():
+            instrumentar_engine(engine)
+
+    # Al apagar, cerrar las conexiones del pool de los motores y detener los
+    # procesos de cifrado
+    yield
+    await cerrar_engines()
+    pool_cifrado.cerrar()
 
-# Importar la base de datos y la conexión
-from database.connection import engine, obtener_db
-from models.Usuario import Usuario
 
 # Inicializar la API agregando un titulo, descripción y versión para que aparezca en la documentación automática
 app = FastAPI(
     title="Gestor de Asistencia",
     description="API para gestionar estudiantes, profesores, clases y asistencias",
     version="1.0.0",
+    lifespan=lifespan,
 )
 
 # Registrar las rutas (endpoints) desde los módulos.
 app.include_router(usuario.router)
 app.include_router(clase.router)
 app.include_router(asistencia.router)
+app.include_router(horario.router)
 
-# Crear todas las tablas definidas
-# engine = engine() # Ya es una instancia importada
+# Tras una escritura, las lecturas del cliente van al primario y no a la réplica
+app.add_middleware(MiddlewareEscrituraReciente)
 
-if engine:
-    SQLModel.metadata.create_all(engine)
+# Métricas por ruta (peticiones, duración, base de datos) en /metrics
+if METRICAS_HABILITADAS:
+    app.add_middleware(MiddlewareMetricas)
+    app.include_router(metricas.router)
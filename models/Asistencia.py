@@ -2,6 +2,7 @@
 import uuid
 from datetime import datetime
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 from database.zone_horary import madrid_utc
@@ -18,9 +19,25 @@ class Asistencia(SQLModel, table=True):
         estado: EstadoAsistencia - Estado de la asistencia.
         usuarioId: str - Identificador del usuario (fk).
         claseId: str - Identificador de la clase (fk).
+
+    Índices:
+        uq_asistencia_clase_usuario: (claseId, usuarioId) único - Un estudiante
+            solo puede tener una asistencia por clase.
+        ix_asistencia_usuario_fecha: (usuarioId, fecha) - Historial del usuario.
+        ix_asistencia_clase_fecha: (claseId, fecha) - Asistencias de la clase.
+        ix_asistencia_fecha: fecha - Asistencias por rango de fechas.
     """
 
     __tablename__ = "asistencia"  # Nombre de la tabla en la base de datos
+    __table_args__ = (
+        # Índice único en lugar de UniqueConstraint para poder crearlo con
+        # CREATE UNIQUE INDEX en bases de datos existentes (SQLite no admite
+        # ALTER TABLE ADD CONSTRAINT).
+        Index("uq_asistencia_clase_usuario", "claseId", "usuarioId", unique=True),
+        Index("ix_asistencia_usuario_fecha", "usuarioId", "fecha"),
+        Index("ix_asistencia_clase_fecha", "claseId", "fecha"),
+        Index("ix_asistencia_fecha", "fecha"),
+    )
 
     id: str = Field(
         default_factory=lambda: str(uuid.uuid4()),
@@ -1,7 +1,9 @@
 # Importaciones
 import uuid
 from datetime import datetime, time
+from typing import Optional
 
+from sqlalchemy import Index
 from sqlmodel import Field, SQLModel
 
 from database.zone_horary import madrid_utc
@@ -18,9 +20,20 @@ class Clase(SQLModel, table=True):
         horaInicio: time - Hora de inicio de la clase.
         horaFin: time - Hora de fin de la clase.
         profesorId: str - Identificador del profesor (fk).
+        horarioId: Optional[str] - Horario que generó la clase (fk), si lo hay.
+
+    Índices:
+        ix_clase_fecha: (fecha, id) - Clases por rango de fechas, en el orden
+            de la paginación (el ID desempata).
+        ix_clase_profesor_fecha: (profesorId, fecha, id) - Clases de un
+            profesor por rango de fechas, en el mismo orden.
     """
 
     __tablename__ = "clase"  # Nombre de la tabla en la base de datos
+    __table_args__ = (
+        Index("ix_clase_fecha", "fecha", "id"),
+        Index("ix_clase_profesor_fecha", "profesorId", "fecha", "id"),
+    )
 
     id: str = Field(
         default_factory=lambda: str(uuid.uuid4()),
@@ -37,3 +50,10 @@ class Clase(SQLModel, table=True):
         nullable=False,
         description="Identificador del profesor (clave foranea)",
     )
+    horarioId: Optional[str] = Field(
+        default=None,
+        foreign_key="horario.id",
+        nullable=True,
+        index=True,
+        description="Identificador del horario (clave foranea)",
+    )
@@ -0,0 +1,52 @@
+# Importaciones
+import uuid
+from datetime import date, time
+
+from sqlalchemy import JSON, Column
+from sqlmodel import Field, SQLModel
+
+
+class Horario(SQLModel, table=True):
+    """
+    Modelo que define la tabla de horarios (series de clases recurrentes).
+    Cada horario genera una clase por cada día de la semana indicado dentro
+    del rango de fechas, salvo los festivos excluidos.
+
+    Campos:
+        id: str (pk) - UUID4 genera un identificador único global de 128 bits.
+        nombre: str - Nombre de las clases del horario.
+        diasSemana: list[int] - Días de la semana (0 = lunes ... 6 = domingo).
+        horaInicio: time - Hora de inicio de las clases.
+        horaFin: time - Hora de fin de las clases.
+        fechaInicio: date - Primer día del horario.
+        fechaFin: date - Último día del horario.
+        festivos: list[str] - Fechas excluidas (ISO 8601).
+        profesorId: str - Identificador del profesor (fk).
+    """
+
+    __tablename__ = "horario"  # Nombre de la tabla en la base de datos
+
+    id: str = Field(
+        default_factory=lambda: str(uuid.uuid4()),
+        primary_key=True,
+        index=True,
+        description="Identificador único del horario",
+    )
+    nombre: str = Field(max_length=50, nullable=False, description="Nombre de la clase")
+    diasSemana: list[int] = Field(
+        sa_column=Column(JSON, nullable=False), description="Días de la semana"
+    )
+    horaInicio: time = Field(nullable=False, description="Hora de inicio de la clase")
+    horaFin: time = Field(nullable=False, description="Hora de fin de la clase")
+    fechaInicio: date = Field(nullable=False, description="Primer día del horario")
+    fechaFin: date = Field(nullable=False, description="Último día del horario")
+    festivos: list[str] = Field(
+        default_factory=list,
+        sa_column=Column(JSON, nullable=False),
+        description="Fechas excluidas",
+    )
+    profesorId: str = Field(
+        foreign_key="usuario.id",
+        nullable=False,
+        description="Identificador del profesor (clave foranea)",
+    )
@@ -0,0 +1,31 @@
+# Importaciones
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+from database.zone_horary import madrid_utc
+
+
+class VersionCambio(SQLModel, table=True):
+    """
+    Modelo que define la tabla de versiones de cambio (validación de cachés
+    HTTP con ETag y Last-Modified). Cada escritura incrementa, en su misma
+    transacción, la versión de los ámbitos a los que afecta.
+
+    Campos:
+        ambito: str (pk) - Datos afectados ("clases#<n>", "asistencias#<n>"
+            o "asistencias:<claseId>"; los ámbitos globales se reparten en
+            varias filas).
+        version: int - Número de cambios del ámbito.
+        fechaActualizacion: datetime - Fecha del último cambio.
+    """
+
+    __tablename__ = "version_cambio"  # Nombre de la tabla en la base de datos
+
+    ambito: str = Field(max_length=100, primary_key=True, description="Datos afectados")
+    version: int = Field(
+        default=0, nullable=False, description="Número de cambios del ámbito"
+    )
+    fechaActualizacion: datetime = Field(
+        default_factory=madrid_utc, description="Fecha del último cambio"
+    )
@@ -0,0 +1,33 @@
+# Importaciones
+from datetime import datetime
+
+from sqlmodel import Field, SQLModel
+
+from database.zone_horary import madrid_utc
+
+
+class VersionToken(SQLModel, table=True):
+    """
+    Modelo que define la tabla de versiones de token (lista de revocación).
+    Un token solo es válido si su versión es mayor o igual a la registrada
+    para el usuario. Incrementar la versión revoca los tokens emitidos.
+
+    Campos:
+        usuarioId: str (pk) - Identificador del usuario (fk).
+        version: int - Versión mínima válida de los tokens del usuario.
+        fechaActualizacion: datetime - Fecha de la última revocación.
+    """
+
+    __tablename__ = "version_token"  # Nombre de la tabla en la base de datos
+
+    usuarioId: str = Field(
+        foreign_key="usuario.id",
+        primary_key=True,
+        description="Identificador del usuario",
+    )
+    version: int = Field(
+        default=0, nullable=False, description="Versión mínima válida de los tokens"
+    )
+    fechaActualizacion: datetime = Field(
+        default_factory=madrid_utc, description="Fecha de la última revocación"
+    )
@@ -38,3 +38,92 @@ class RespuestaAsistencia(SQLModel):
     claseId: str
     fecha: datetime
     estado: EstadoAsistencia
+
+
+class EntradaAsistenciaLote(SQLModel):
+    """
+    Esquema de una entrada del pase de lista.
+
+    Campos:
+        usuarioId: str - Identificador del usuario (clave foranea).
+        estado: EstadoAsistencia - Estado de la asistencia.
+    """
+
+    usuarioId: str
+    estado: EstadoAsistencia
+
+
+class MarcarAsistencia(SQLModel):
+    """
+    Esquema para marcar la asistencia de un usuario en una clase.
+
+    Campos:
+        estado: EstadoAsistencia - Estado de la asistencia.
+    """
+
+    estado: EstadoAsistencia
+
+
+class CrearAsistenciaLote(SQLModel):
+    """
+    Esquema para registrar el pase de lista completo de una clase.
+
+    Campos:
+        asistencias: list[EntradaAsistenciaLote] - Entradas del pase de lista.
+    """
+
+    asistencias: list[EntradaAsistenciaLote]
+
+
+class RechazoAsistencia(SQLModel):
+    """
+    Esquema de una entrada rechazada del pase de lista.
+
+    Campos:
+        usuarioId: str - Identificador del usuario (clave foranea).
+        motivo: str - Motivo del rechazo.
+    """
+
+    usuarioId: str
+    motivo: str
+
+
+class RespuestaAsistenciaLote(SQLModel):
+    """
+    Esquema para devolver el resultado del pase de lista.
+
+    Campos:
+        creadas: list[RespuestaAsistencia] - Asistencias registradas.
+        rechazadas: list[RechazoAsistencia] - Entradas no registradas y su motivo.
+    """
+
+    creadas: list[RespuestaAsistencia]
+    rechazadas: list[RechazoAsistencia]
+
+
+class EstadisticaEstado(SQLModel):
+    """
+    Esquema del recuento de asistencias de un estado.
+
+    Campos:
+        estado: EstadoAsistencia - Estado de la asistencia.
+        total: int - Número de asistencias con el estado.
+        porcentaje: float - Porcentaje sobre el total (0-100, dos decimales).
+    """
+
+    estado: EstadoAsistencia
+    total: int
+    porcentaje: float
+
+
+class EstadisticasAsistencia(SQLModel):
+    """
+    Esquema para devolver las estadísticas de asistencia.
+
+    Campos:
+        total: int - Número total de asistencias.
+        estados: list[EstadisticaEstado] - Recuento por estado (todos los estados).
+    """
+
+    total: int
+    estados: list[EstadisticaEstado]
@@ -1,8 +1,11 @@
 # Importaciones
-from datetime import date, time
+from datetime import date, datetime, time
+from typing import Optional
 
 from sqlmodel import SQLModel
 
+from models.Asistencia import EstadoAsistencia
+
 
 class CrearClase(SQLModel):
     """
@@ -35,7 +38,61 @@ class RespuestaClase(CrearClase):
     Campos adicionales:
         id: str - Identificador único del usuario
         profesorId: str - Identificador del usuario (clave foranea).
+        horarioId: Optional[str] - Horario que generó la clase (clave foranea).
     """
 
     id: str
     profesorId: str
+    horarioId: Optional[str] = None
+
+
+class ProfesorListaClase(SQLModel):
+    """
+    Esquema del profesor en la lista de una clase.
+
+    Campos:
+        id: str - Identificador del profesor.
+        nombre: str - Nombre del profesor.
+        apellido: str - Apellido del profesor.
+    """
+
+    id: str
+    nombre: str
+    apellido: str
+
+
+class EntradaListaClase(SQLModel):
+    """
+    Esquema de una asistencia en la lista de una clase.
+
+    Campos:
+        id: str - Identificador de la asistencia.
+        usuarioId: str - Identificador del estudiante.
+        nombre: str - Nombre del estudiante.
+        apellido: str - Apellido del estudiante.
+        estado: EstadoAsistencia - Estado de la asistencia.
+        fecha: datetime - Fecha de la asistencia.
+    """
+
+    id: str
+    usuarioId: str
+    nombre: str
+    apellido: str
+    estado: EstadoAsistencia
+    fecha: datetime
+
+
+class RespuestaListaClase(RespuestaClase):
+    """
+    Esquema para devolver la lista de una clase: la clase, su profesor y las
+    asistencias con el nombre de cada estudiante.
+
+    Hereda de RespuestaClase.
+    Campos adicionales:
+        profesor: ProfesorListaClase - Profesor de la clase.
+        asistencias: list[EntradaListaClase] - Asistencias ordenadas por
+            apellido y nombre del estudiante.
+    """
+
+    profesor: ProfesorListaClase
+    asistencias: list[EntradaListaClase]
@@ -0,0 +1,81 @@
+# Importaciones
+from datetime import date, time
+from typing import Optional
+
+from sqlmodel import SQLModel
+
+
+class CrearHorario(SQLModel):
+    """
+    Esquema para crear un horario de clases recurrentes.
+
+    Campos:
+        nombre: str - Nombre de las clases.
+        diasSemana: list[int] - Días de la semana (0 = lunes ... 6 = domingo).
+        horaInicio: time - Hora de inicio de las clases.
+        horaFin: time - Hora de fin de las clases.
+        fechaInicio: date - Primer día del horario.
+        fechaFin: date - Último día del horario.
+        festivos: list[date] - Fechas excluidas.
+    """
+
+    nombre: str
+    diasSemana: list[int]
+    horaInicio: time
+    horaFin: time
+    fechaInicio: date
+    fechaFin: date
+    festivos: list[date] = []
+
+
+class RespuestaHorario(CrearHorario):
+    """
+    Esquema para devolver un horario.
+
+    Hereda de CrearHorario.
+    Campos adicionales:
+        id: str - Identificador único del horario.
+        profesorId: str - Identificador del profesor (clave foranea).
+    """
+
+    id: str
+    profesorId: str
+
+
+class RespuestaCrearHorario(RespuestaHorario):
+    """
+    Esquema para devolver un horario recién creado.
+
+    Hereda de RespuestaHorario.
+    Campos adicionales:
+        clasesCreadas: int - Número de clases generadas.
+    """
+
+    clasesCreadas: int
+
+
+class ActualizarSesionesHorario(SQLModel):
+    """
+    Esquema para modificar las clases futuras de un horario.
+
+    Campos:
+        nombre: Optional[str] - Nuevo nombre de las clases.
+        horaInicio: Optional[time] - Nueva hora de inicio.
+        horaFin: Optional[time] - Nueva hora de fin.
+    """
+
+    nombre: Optional[str] = None
+    horaInicio: Optional[time] = None
+    horaFin: Optional[time] = None
+
+
+class RespuestaSesionesHorario(SQLModel):
+    """
+    Esquema para devolver el resultado de una operación sobre las clases
+    futuras de un horario.
+
+    Campos:
+        sesiones: int - Número de clases modificadas o canceladas.
+    """
+
+    sesiones: int
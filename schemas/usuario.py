@@ -77,3 +77,67 @@ class Token(SQLModel):
 
     access_token: str
     token_type: str
+
+
+class UsuarioPrincipal(SQLModel):
+    """
+    Esquema del usuario autenticado (solo los datos necesarios para autorizar).
+
+    Campos:
+        id: str - Identificador único del usuario
+        rol: RolUsuario - Rol del usuario.
+        activo: bool - Estado del usuario.
+    """
+
+    id: str
+    rol: RolUsuario
+    activo: bool
+
+
+class EstadisticasCache(SQLModel):
+    """
+    Esquema para devolver los contadores de la caché de usuarios.
+
+    Campos:
+        entradas: int - Usuarios en caché.
+        max_entradas: int - Capacidad de la caché.
+        ttl: float - Segundos que una entrada es válida.
+        aciertos: int - Consultas resueltas desde la caché.
+        fallos: int - Consultas que han ido a la base de datos.
+        tasa_aciertos: float - Proporción de aciertos.
+    """
+
+    entradas: int
+    max_entradas: int
+    ttl: float
+    aciertos: int
+    fallos: int
+    tasa_aciertos: float
+
+
+class RechazoUsuario(SQLModel):
+    """
+    Esquema de una fila rechazada de la importación de usuarios.
+
+    Campos:
+        fila: int - Número de línea en el archivo (la cabecera CSV es la 1).
+        correoElectronico: Optional[str] - Correo electrónico de la fila.
+        motivo: str - Motivo del rechazo.
+    """
+
+    fila: int
+    correoElectronico: Optional[str] = None
+    motivo: str
+
+
+class RespuestaImportacionUsuarios(SQLModel):
+    """
+    Esquema para devolver el resultado de la importación de usuarios.
+
+    Campos:
+        creados: int - Número de usuarios creados.
+        rechazados: list[RechazoUsuario] - Filas no importadas y su motivo.
+    """
+
+    creados: int
+    rechazados: list[RechazoUsuario]
@@ -1,20 +1,60 @@
 # Importaciones
-from typing import Optional
+import csv
+import io
+import json
+import uuid
+from datetime import datetime
+from typing import AsyncIterator, Optional
 
 from fastapi import HTTPException, status
+from sqlalchemy import Row, and_, func, insert, literal
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from database.zone_horary import madrid_utc
 from models.Asistencia import Asistencia
 from models.Clase import Clase
+from models.Enum import EstadoAsistencia
 from models.Usuario import Usuario
-from schemas.asistencia import CrearAsistencia
+from schemas.asistencia import (
+    CrearAsistencia,
+    CrearAsistenciaLote,
+    EstadisticaEstado,
+    EstadisticasAsistencia,
+    MarcarAsistencia,
+    RechazoAsistencia,
+    RespuestaAsistencia,
+    RespuestaAsistenciaLote,
+)
+from services.paginacion import paginar
+from services.sentencias import (
+    INSERT_ON_CONFLICT,
+    actualizar_fila,
+    eliminar_fila,
+    insertar_fila,
+)
+from services.version_cambio_service import (
+    AMBITO_ASISTENCIAS,
+    ambito_asistencias_clase,
+    incrementar_version,
+)
+
+# Columnas de la exportación, en orden
+COLUMNAS_EXPORTACION = ("id", "usuarioId", "claseId", "fecha", "estado")
+
+# Campos de RespuestaAsistencia, en el orden de las columnas de las filas
+CAMPOS_RESPUESTA_ASISTENCIA = tuple(RespuestaAsistencia.model_fields)
+
+# Filas que se leen de la base de datos y se codifican en cada bloque
+TAMANO_BLOQUE_EXPORTACION = 1000
 
 
 def crear_asistencia_service(db: Session, asistencia: CrearAsistencia) -> Asistencia:
     """
     Crea una nueva asistencia en la base de datos.
     Valida que el usuario y la clase existan.
+    Lanza HTTPException 400 si el usuario ya tiene asistencia en la clase.
 
     Argumentos:
         db: Sesión de base de datos
@@ -24,16 +64,20 @@ def crear_asistencia_service(db: Session, asistencia: CrearAsistencia) -> Asiste
         Asistencia creada
 
     Excepciones:
-        HTTPException: Si el usuario o clase no existen
+        HTTPException: Si el usuario o clase no existen, o la asistencia ya existe
     """
-    usuario = db.exec(select(Usuario).where(Usuario.id == asistencia.usuarioId)).first()
+    # Solo se comprueba que existen: se leen los ids, no las filas completas
+    # (la del usuario incluye el hash de la contraseña)
+    usuario = db.exec(
+        select(Usuario.id).where(Usuario.id == asistencia.usuarioId)
+    ).first()
 
     if not usuario:
         raise HTTPException(
             status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
         )
 
-    clase = db.exec(select(Clase).where(Clase.id == asistencia.claseId)).first()
+    clase = db.exec(select(Clase.id).where(Clase.id == asistencia.claseId)).first()
 
     if not clase:
         raise HTTPException(
@@ -41,15 +85,18 @@ def crear_asistencia_service(db: Session, asistencia: CrearAsistencia) -> Asiste
         )
 
     try:
-        db_asistencia = Asistencia(
-            usuarioId=asistencia.usuarioId,
-            claseId=asistencia.claseId,
-            estado=asistencia.estado,
+        db_asistencia = insertar_fila(
+            db,
+            Asistencia(
+                usuarioId=asistencia.usuarioId,
+                claseId=asistencia.claseId,
+                estado=asistencia.estado,
+            ),
+        )
+        incrementar_version(
+            db, [AMBITO_ASISTENCIAS, ambito_asistencias_clase(asistencia.claseId)]
         )
-
-        db.add(db_asistencia)
         db.commit()
-        db.refresh(db_asistencia)
 
         return db_asistencia
 
@@ -57,25 +104,169 @@ def crear_asistencia_service(db: Session, asistencia: CrearAsistencia) -> Asiste
         db.rollback()
         raise HTTPException(
             status_code=status.HTTP_400_BAD_REQUEST,
-            detail="Error al crear la asistencia",
+            detail="Error al crear la asistencia. El usuario ya tiene una asistencia en esta clase.",
+        )
+
+
+def crear_asistencias_lote_service(
+    db: Session, id_clase: str, lote: CrearAsistenciaLote
+) -> RespuestaAsistenciaLote:
+    """
+    Registra el pase de lista de una clase en una sola transacción.
+    Valida la clase una vez y todos los usuarios con una única consulta IN,
+    e inserta las asistencias válidas con un INSERT de varias filas.
+    Las entradas inválidas se rechazan sin abortar el resto del lote.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_clase: ID de la clase
+        lote: Entradas del pase de lista
+
+    Retorna:
+        Asistencias creadas y entradas rechazadas con su motivo
+
+    Excepciones:
+        HTTPException: Si la clase no existe o falla la inserción
+    """
+    clase = db.exec(select(Clase.id).where(Clase.id == id_clase)).first()
+
+    if not clase:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Clase no encontrada"
+        )
+
+    ids_usuarios = {entrada.usuarioId for entrada in lote.asistencias}
+    existentes: set[str] = set()
+    registrados: set[str] = set()
+
+    if ids_usuarios:
+        # Una sola consulta valida los usuarios y detecta los ya registrados
+        statement = (
+            select(Usuario.id, Asistencia.id)
+            .outerjoin(
+                Asistencia,
+                and_(
+                    Asistencia.usuarioId == Usuario.id, Asistencia.claseId == id_clase
+                ),
+            )
+            .where(Usuario.id.in_(ids_usuarios))
         )
 
+        for id_usuario, id_asistencia in db.exec(statement).all():
+            existentes.add(id_usuario)
+
+            if id_asistencia is not None:
+                registrados.add(id_usuario)
+
+    creadas: list[Asistencia] = []
+    rechazadas: list[RechazoAsistencia] = []
+    procesados: set[str] = set()
+
+    for entrada in lote.asistencias:
+        if entrada.usuarioId not in existentes:
+            motivo = "Usuario no encontrado"
+        elif entrada.usuarioId in registrados:
+            motivo = "Asistencia ya registrada"
+        elif entrada.usuarioId in procesados:
+            motivo = "Usuario duplicado en el lote"
+        else:
+            procesados.add(entrada.usuarioId)
+            creadas.append(
+                Asistencia(
+                    usuarioId=entrada.usuarioId,
+                    claseId=id_clase,
+                    estado=entrada.estado,
+                )
+            )
+            continue
+
+        rechazadas.append(RechazoAsistencia(usuarioId=entrada.usuarioId, motivo=motivo))
+
+    if creadas:
+        try:
+            db.exec(
+                insert(Asistencia),
+                params=[asistencia.model_dump() for asistencia in creadas],
+            )
+            incrementar_version(
+                db, [AMBITO_ASISTENCIAS, ambito_asistencias_clase(id_clase)]
+            )
+            db.commit()
+
+        except IntegrityError:
+            db.rollback()
+            raise HTTPException(
+                status_code=status.HTTP_400_BAD_REQUEST,
+                detail="Error al registrar el pase de lista",
+            )
+
+    return RespuestaAsistenciaLote(creadas=creadas, rechazadas=rechazadas)
+
+
+def filtrar_asistencias(
+    statement,
+    id_clase: Optional[str] = None,
+    id_usuario: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    estado: Optional[EstadoAsistencia] = None,
+    id_profesor: Optional[str] = None,
+):
+    """
+    Aplica a una consulta los filtros de asistencias por clase, usuario,
+    rango de fechas, estado y profesor de la clase.
+
+    Argumentos:
+        statement: Consulta sobre la tabla de asistencias
+        id_clase: ID de la clase (opcional)
+        id_usuario: ID del usuario (opcional)
+        desde: Fecha mínima de la asistencia, incluida (opcional)
+        hasta: Fecha máxima de la asistencia, incluida (opcional)
+        estado: Estado de la asistencia (opcional)
+        id_profesor: ID del profesor de la clase (opcional)
+
+    Retorna:
+        Consulta filtrada
+    """
+    if id_clase:
+        statement = statement.where(Asistencia.claseId == id_clase)
+
+    if id_usuario:
+        statement = statement.where(Asistencia.usuarioId == id_usuario)
+
+    if desde:
+        statement = statement.where(Asistencia.fecha >= desde)
+
+    if hasta:
+        statement = statement.where(Asistencia.fecha <= hasta)
+
+    if estado:
+        statement = statement.where(Asistencia.estado == estado)
+
+    if id_profesor:
+        # Las clases del profesor se obtienen con ix_clase_profesor_fecha
+        clases_profesor = select(Clase.id).where(Clase.profesorId == id_profesor)
+        statement = statement.where(Asistencia.claseId.in_(clases_profesor))
+
+    return statement
+
 
 def obtener_asistencias_service(
-    db: Session, skip: int = 0, limit: int = 100
+    db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
 ) -> list[Asistencia]:
     """
-    Obtiene una lista de asistencias con paginación.
+    Obtiene una lista de asistencias ordenada por ID con paginación.
 
     Argumentos:
         db: Sesión de base de datos
-        skip: Número de registros a saltar
+        skip: Número de registros a saltar (si no hay cursor)
         limit: Número máximo de registros a devolver
+        cursor: Cursor de la página anterior (opcional)
 
     Retorna:
         Lista de asistencias
     """
-    statement = select(Asistencia).offset(skip).limit(limit)
+    statement = paginar(select(Asistencia), [Asistencia.id], cursor, skip, limit)
     return db.exec(statement).all()
 
 
@@ -85,32 +276,147 @@ def obtener_asistencia_service(
     id_usuario: Optional[str] = None,
     skip: int = 0,
     limit: int = 100,
+    cursor: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    estado: Optional[EstadoAsistencia] = None,
+    id_profesor: Optional[str] = None,
 ) -> list[Asistencia]:
     """
-    Obtiene asistencias filtradas por clase y/o usuario con paginación.
+    Obtiene asistencias filtradas por clase, usuario, rango de fechas, estado
+    y/o profesor de la clase, ordenadas por ID con paginación.
 
     Argumentos:
         db: Sesión de base de datos
         id_clase: ID de la clase (opcional)
         id_usuario: ID del usuario (opcional)
-        skip: Número de registros a saltar
+        skip: Número de registros a saltar (si no hay cursor)
         limit: Número máximo de registros a devolver
+        cursor: Cursor de la página anterior (opcional)
+        desde: Fecha mínima de la asistencia, incluida (opcional)
+        hasta: Fecha máxima de la asistencia, incluida (opcional)
+        estado: Estado de la asistencia (opcional)
+        id_profesor: ID del profesor de la clase (opcional)
 
     Retorna:
         Lista de asistencias filtradas
     """
-    statement = select(Asistencia)
+    statement = filtrar_asistencias(
+        select(Asistencia), id_clase, id_usuario, desde, hasta, estado, id_profesor
+    )
+    statement = paginar(statement, [Asistencia.id], cursor, skip, limit)
+    return db.exec(statement).all()
 
-    if id_clase:
-        statement = statement.where(Asistencia.claseId == id_clase)
 
-    if id_usuario:
-        statement = statement.where(Asistencia.usuarioId == id_usuario)
+def obtener_asistencia_filas_service(
+    db: Session,
+    id_clase: Optional[str] = None,
+    id_usuario: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    estado: Optional[EstadoAsistencia] = None,
+    id_profesor: Optional[str] = None,
+) -> list[Row]:
+    """
+    Obtiene la misma página que obtener_asistencia_service como tuplas con
+    las columnas de CAMPOS_RESPUESTA_ASISTENCIA, sin crear objetos ORM
+    (respuesta rápida).
 
-    statement = statement.offset(skip).limit(limit)
+    Argumentos:
+        db: Sesión de base de datos
+        id_clase: ID de la clase (opcional)
+        id_usuario: ID del usuario (opcional)
+        skip: Número de registros a saltar (si no hay cursor)
+        limit: Número máximo de registros a devolver
+        cursor: Cursor de la página anterior (opcional)
+        desde: Fecha mínima de la asistencia, incluida (opcional)
+        hasta: Fecha máxima de la asistencia, incluida (opcional)
+        estado: Estado de la asistencia (opcional)
+        id_profesor: ID del profesor de la clase (opcional)
+
+    Retorna:
+        Lista de filas
+    """
+    columnas = [getattr(Asistencia, campo) for campo in CAMPOS_RESPUESTA_ASISTENCIA]
+    statement = filtrar_asistencias(
+        select(*columnas), id_clase, id_usuario, desde, hasta, estado, id_profesor
+    )
+    statement = paginar(statement, [Asistencia.id], cursor, skip, limit)
     return db.exec(statement).all()
 
 
+def marcar_asistencia_service(
+    db: Session, id_clase: str, id_usuario: str, datos: MarcarAsistencia
+) -> Asistencia:
+    """
+    Fija el estado de la asistencia de un usuario en una clase: la crea si no
+    existe y si existe cambia su estado. Repetir la petición no crea filas
+    duplicadas.
+    La asistencia se escribe con una sola sentencia
+    INSERT ... SELECT ... ON CONFLICT (claseId, usuarioId) DO UPDATE
+    ... RETURNING: el SELECT sobre el usuario y la clase no devuelve filas si
+    alguno no existe, y en ese caso no se inserta nada.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_clase: ID de la clase
+        id_usuario: ID del usuario
+        datos: Estado de la asistencia
+
+    Retorna:
+        Asistencia creada o actualizada
+
+    Excepciones:
+        HTTPException: Si el usuario o la clase no existen, o el motor de base
+            de datos no admite ON CONFLICT
+    """
+    dialecto = db.get_bind().dialect.name
+
+    if dialecto not in INSERT_ON_CONFLICT:
+        raise HTTPException(
+            status_code=status.HTTP_501_NOT_IMPLEMENTED,
+            detail=f"Marcar asistencias no está disponible en {dialecto}",
+        )
+
+    columnas = Asistencia.__table__.c
+    origen = (
+        select(
+            literal(str(uuid.uuid4()), columnas.id.type),
+            literal(madrid_utc(), columnas.fecha.type),
+            literal(datos.estado, columnas.estado.type),
+            Usuario.id,
+            Clase.id,
+        )
+        .join_from(Usuario, Clase, Clase.id == id_clase)
+        .where(Usuario.id == id_usuario)
+    )
+
+    statement = INSERT_ON_CONFLICT[dialecto](Asistencia).from_select(
+        ["id", "fecha", "estado", "usuarioId", "claseId"], origen
+    )
+    statement = statement.on_conflict_do_update(
+        index_elements=["claseId", "usuarioId"],
+        set_={"estado": statement.excluded.estado},
+    ).returning(*columnas)
+
+    fila = db.exec(statement).first()
+
+    if fila is None:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail="Usuario o clase no encontrados",
+        )
+
+    incrementar_version(db, [AMBITO_ASISTENCIAS, ambito_asistencias_clase(id_clase)])
+    db.commit()
+
+    return Asistencia.model_validate(fila._mapping)
+
+
 def obtener_asistencia_id_service(db: Session, id_asistencia: str) -> Asistencia:
     """
     Obtiene una asistencia por su ID.
@@ -140,7 +446,8 @@ def actualizar_asistencia_service(
     db: Session, id_asistencia: str, asistencia_data: CrearAsistencia
 ) -> Asistencia:
     """
-    Actualiza una asistencia existente.
+    Actualiza el estado de una asistencia existente con una sola sentencia
+    UPDATE ... RETURNING.
 
     Argumentos:
         db: Sesión de base de datos
@@ -153,18 +460,25 @@ def actualizar_asistencia_service(
     Excepciones:
         HTTPException: Si la asistencia no existe
     """
-    db_asistencia = obtener_asistencia_id_service(db, id_asistencia)
-
-    db_asistencia.estado = asistencia_data.estado
-
+    db_asistencia = actualizar_fila(
+        db,
+        Asistencia,
+        [Asistencia.id == id_asistencia],
+        {"estado": asistencia_data.estado},
+        "Asistencia no encontrada",
+    )
+
+    incrementar_version(
+        db, [AMBITO_ASISTENCIAS, ambito_asistencias_clase(db_asistencia.claseId)]
+    )
     db.commit()
-    db.refresh(db_asistencia)
     return db_asistencia
 
 
 def eliminar_asistencia_service(db: Session, id_asistencia: str) -> Asistencia:
     """
-    Elimina una asistencia de la base de datos.
+    Elimina una asistencia de la base de datos con una sola sentencia
+    DELETE ... RETURNING.
 
     Argumentos:
         db: Sesión de base de datos
@@ -172,8 +486,327 @@ def eliminar_asistencia_service(db: Session, id_asistencia: str) -> Asistencia:
 
     Retorna:
         Asistencia eliminada
+
+    Excepciones:
+        HTTPException: Si la asistencia no existe
     """
-    db_asistencia = obtener_asistencia_id_service(db, id_asistencia)
-    db.delete(db_asistencia)
+    db_asistencia = eliminar_fila(
+        db, Asistencia, [Asistencia.id == id_asistencia], "Asistencia no encontrada"
+    )
+    incrementar_version(
+        db, [AMBITO_ASISTENCIAS, ambito_asistencias_clase(db_asistencia.claseId)]
+    )
     db.commit()
     return db_asistencia
+
+
+def obtener_estadisticas_asistencia_service(
+    db: Session,
+    id_clase: Optional[str] = None,
+    id_usuario: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> EstadisticasAsistencia:
+    """
+    Obtiene el recuento y el porcentaje de asistencias por estado.
+    La agregación se hace en la base de datos con un único GROUP BY, por lo
+    que solo se transfiere una fila por estado.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_clase: ID de la clase (opcional)
+        id_usuario: ID del usuario (opcional)
+        desde: Fecha mínima de la asistencia, incluida (opcional)
+        hasta: Fecha máxima de la asistencia, incluida (opcional)
+
+    Retorna:
+        Total de asistencias y recuento por estado
+    """
+    statement = filtrar_asistencias(
+        select(Asistencia.estado, func.count()), id_clase, id_usuario, desde, hasta
+    ).group_by(Asistencia.estado)
+    conteos = dict(db.exec(statement).all())
+    total = sum(conteos.values())
+
+    estados = [
+        EstadisticaEstado(
+            estado=estado,
+            total=conteos.get(estado, 0),
+            porcentaje=round(conteos.get(estado, 0) * 100 / total, 2) if total else 0.0,
+        )
+        for estado in EstadoAsistencia
+    ]
+
+    return EstadisticasAsistencia(total=total, estados=estados)
+
+
+def obtener_estadisticas_clase_service(
+    db: Session,
+    id_clase: str,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> EstadisticasAsistencia:
+    """
+    Obtiene las estadísticas de asistencia de una clase.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_clase: ID de la clase
+        desde: Fecha mínima de la asistencia, incluida (opcional)
+        hasta: Fecha máxima de la asistencia, incluida (opcional)
+
+    Retorna:
+        Total de asistencias y recuento por estado
+
+    Excepciones:
+        HTTPException: Si la clase no existe
+    """
+    if not db.exec(select(Clase.id).where(Clase.id == id_clase)).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Clase no encontrada"
+        )
+
+    return obtener_estadisticas_asistencia_service(
+        db, id_clase=id_clase, desde=desde, hasta=hasta
+    )
+
+
+def obtener_estadisticas_usuario_service(
+    db: Session,
+    id_usuario: str,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> EstadisticasAsistencia:
+    """
+    Obtiene las estadísticas de asistencia de un usuario.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_usuario: ID del usuario
+        desde: Fecha mínima de la asistencia, incluida (opcional)
+        hasta: Fecha máxima de la asistencia, incluida (opcional)
+
+    Retorna:
+        Total de asistencias y recuento por estado
+
+    Excepciones:
+        HTTPException: Si el usuario no existe
+    """
+    if not db.exec(select(Usuario.id).where(Usuario.id == id_usuario)).first():
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
+        )
+
+    return obtener_estadisticas_asistencia_service(
+        db, id_usuario=id_usuario, desde=desde, hasta=hasta
+    )
+
+
+# Variantes asíncronas: ejecutan la lógica síncrona sobre la conexión
+# asíncrona de la sesión (AsyncSession.run_sync), sin ocupar hilos del pool.
+
+
+async def crear_asistencia_service_async(
+    db: AsyncSession, asistencia: CrearAsistencia
+) -> Asistencia:
+    """
+    Variante asíncrona de crear_asistencia_service.
+    """
+    return await db.run_sync(crear_asistencia_service, asistencia)
+
+
+async def crear_asistencias_lote_service_async(
+    db: AsyncSession, id_clase: str, lote: CrearAsistenciaLote
+) -> RespuestaAsistenciaLote:
+    """
+    Variante asíncrona de crear_asistencias_lote_service.
+    """
+    return await db.run_sync(crear_asistencias_lote_service, id_clase, lote)
+
+
+async def marcar_asistencia_service_async(
+    db: AsyncSession, id_clase: str, id_usuario: str, datos: MarcarAsistencia
+) -> Asistencia:
+    """
+    Variante asíncrona de marcar_asistencia_service.
+    """
+    return await db.run_sync(marcar_asistencia_service, id_clase, id_usuario, datos)
+
+
+async def obtener_asistencias_service_async(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> list[Asistencia]:
+    """
+    Variante asíncrona de obtener_asistencias_service.
+    """
+    return await db.run_sync(obtener_asistencias_service, skip, limit, cursor)
+
+
+async def obtener_asistencia_service_async(
+    db: AsyncSession,
+    id_clase: Optional[str] = None,
+    id_usuario: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    estado: Optional[EstadoAsistencia] = None,
+    id_profesor: Optional[str] = None,
+) -> list[Asistencia]:
+    """
+    Variante asíncrona de obtener_asistencia_service.
+    """
+    return await db.run_sync(
+        obtener_asistencia_service,
+        id_clase,
+        id_usuario,
+        skip,
+        limit,
+        cursor,
+        desde,
+        hasta,
+        estado,
+        id_profesor,
+    )
+
+
+async def obtener_asistencia_filas_service_async(
+    db: AsyncSession,
+    id_clase: Optional[str] = None,
+    id_usuario: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+    estado: Optional[EstadoAsistencia] = None,
+    id_profesor: Optional[str] = None,
+) -> list[Row]:
+    """
+    Variante asíncrona de obtener_asistencia_filas_service.
+    """
+    return await db.run_sync(
+        obtener_asistencia_filas_service,
+        id_clase,
+        id_usuario,
+        skip,
+        limit,
+        cursor,
+        desde,
+        hasta,
+        estado,
+        id_profesor,
+    )
+
+
+async def obtener_asistencia_id_service_async(
+    db: AsyncSession, id_asistencia: str
+) -> Asistencia:
+    """
+    Variante asíncrona de obtener_asistencia_id_service.
+    """
+    return await db.run_sync(obtener_asistencia_id_service, id_asistencia)
+
+
+async def actualizar_asistencia_service_async(
+    db: AsyncSession, id_asistencia: str, asistencia_data: CrearAsistencia
+) -> Asistencia:
+    """
+    Variante asíncrona de actualizar_asistencia_service.
+    """
+    return await db.run_sync(
+        actualizar_asistencia_service, id_asistencia, asistencia_data
+    )
+
+
+async def eliminar_asistencia_service_async(
+    db: AsyncSession, id_asistencia: str
+) -> Asistencia:
+    """
+    Variante asíncrona de eliminar_asistencia_service.
+    """
+    return await db.run_sync(eliminar_asistencia_service, id_asistencia)
+
+
+async def obtener_estadisticas_clase_service_async(
+    db: AsyncSession,
+    id_clase: str,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> EstadisticasAsistencia:
+    """
+    Variante asíncrona de obtener_estadisticas_clase_service.
+    """
+    return await db.run_sync(obtener_estadisticas_clase_service, id_clase, desde, hasta)
+
+
+async def obtener_estadisticas_usuario_service_async(
+    db: AsyncSession,
+    id_usuario: str,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> EstadisticasAsistencia:
+    """
+    Variante asíncrona de obtener_estadisticas_usuario_service.
+    """
+    return await db.run_sync(
+        obtener_estadisticas_usuario_service, id_usuario, desde, hasta
+    )
+
+
+async def exportar_asistencias_service(
+    db: AsyncSession,
+    formato: str,
+    id_clase: Optional[str] = None,
+    id_usuario: Optional[str] = None,
+    desde: Optional[datetime] = None,
+    hasta: Optional[datetime] = None,
+) -> AsyncIterator[str]:
+    """
+    Exporta asistencias en CSV o NDJSON por bloques.
+    Lee las filas como tuplas de columnas con un cursor del servidor
+    (stream + yield_per), sin crear objetos ORM ni validar cada fila con
+    pydantic, de modo que la memoria no depende del número de filas.
+
+    Argumentos:
+        db: Sesión asíncrona de base de datos
+        formato: "csv" o "ndjson"
+        id_clase: ID de la clase (opcional)
+        id_usuario: ID del usuario (opcional)
+        desde: Fecha mínima de la asistencia, incluida (opcional)
+        hasta: Fecha máxima de la asistencia, incluida (opcional)
+
+    Retorna:
+        Iterador asíncrono con el texto de cada bloque de filas
+    """
+    columnas = [getattr(Asistencia, nombre) for nombre in COLUMNAS_EXPORTACION]
+    statement = filtrar_asistencias(
+        select(*columnas), id_clase, id_usuario, desde, hasta
+    ).execution_options(yield_per=TAMANO_BLOQUE_EXPORTACION)
+
+    resultado = await db.stream(statement)
+
+    if formato == "csv":
+        yield ",".join(COLUMNAS_EXPORTACION) + "\r\n"
+
+    async for filas in resultado.partitions():
+        bloque = io.StringIO()
+        escritor = csv.writer(bloque)
+
+        for id_asistencia, id_usuario_fila, id_clase_fila, fecha, estado in filas:
+            valores = (
+                id_asistencia,
+                id_usuario_fila,
+                id_clase_fila,
+                fecha.isoformat(),
+                estado.value,
+            )
+
+            if formato == "csv":
+                escritor.writerow(valores)
+            else:
+                fila = dict(zip(COLUMNAS_EXPORTACION, valores))
+                bloque.write(json.dumps(fila, ensure_ascii=False) + "\n")
+
+        yield bloque.getvalue()
@@ -0,0 +1,114 @@
+# Importaciones
+import threading
+import time
+from collections import OrderedDict
+
+from configuracion import obtener_entero, obtener_flotante
+from schemas.usuario import UsuarioPrincipal
+
+
+class CacheUsuarios:
+    """
+    Caché LRU acotada y con caducidad (TTL) del usuario autenticado.
+    Evita consultar la base de datos en cada petición protegida. Cada proceso
+    tiene su propia caché: los cambios hechos en otro proceso se ven, como
+    mucho, al caducar la entrada.
+
+    Atributos:
+        max_entradas: Número máximo de usuarios en caché
+        ttl: Segundos que una entrada es válida
+        aciertos: Consultas resueltas desde la caché
+        fallos: Consultas que han necesitado ir a la base de datos
+    """
+
+    def __init__(self, max_entradas: int, ttl: float):
+        self.max_entradas = max_entradas
+        self.ttl = ttl
+        self.aciertos = 0
+        self.fallos = 0
+        self._entradas: OrderedDict[str, tuple[float, UsuarioPrincipal]] = OrderedDict()
+        self._lock = threading.Lock()
+
+    def obtener(self, id_usuario: str) -> UsuarioPrincipal | None:
+        """
+        Obtiene un usuario de la caché si no ha caducado.
+
+        Argumentos:
+            id_usuario: ID del usuario
+
+        Retorna:
+            Usuario en caché o None
+        """
+        with self._lock:
+            entrada = self._entradas.get(id_usuario)
+
+            if entrada is None or entrada[0] < time.monotonic():
+                if entrada is not None:
+                    del self._entradas[id_usuario]
+                self.fallos += 1
+                return None
+
+            self._entradas.move_to_end(id_usuario)
+            self.aciertos += 1
+            return entrada[1]
+
+    def guardar(self, usuario: UsuarioPrincipal) -> None:
+        """
+        Guarda un usuario en la caché, descartando el menos usado si está llena.
+
+        Argumentos:
+            usuario: Usuario a guardar
+        """
+        if self.max_entradas <= 0:
+            return
+
+        with self._lock:
+            self._entradas[usuario.id] = (time.monotonic() + self.ttl, usuario)
+            self._entradas.move_to_end(usuario.id)
+
+            while len(self._entradas) > self.max_entradas:
+                self._entradas.popitem(last=False)
+
+    def invalidar(self, id_usuario: str) -> None:
+        """
+        Elimina un usuario de la caché.
+
+        Argumentos:
+            id_usuario: ID del usuario
+        """
+        with self._lock:
+            self._entradas.pop(id_usuario, None)
+
+    def limpiar(self) -> None:
+        """
+        Vacía la caché y reinicia los contadores.
+        """
+        with self._lock:
+            self._entradas.clear()
+            self.aciertos = 0
+            self.fallos = 0
+
+    def estadisticas(self) -> dict:
+        """
+        Obtiene los contadores de la caché.
+
+        Retorna:
+            Entradas, capacidad, aciertos, fallos y tasa de aciertos
+        """
+        with self._lock:
+            consultas = self.aciertos + self.fallos
+            return {
+                "entradas": len(self._entradas),
+                "max_entradas": self.max_entradas,
+                "ttl": self.ttl,
+                "aciertos": self.aciertos,
+                "fallos": self.fallos,
+                "tasa_aciertos": self.aciertos / consultas if consultas else 0.0,
+            }
+
+
+# Caché compartida del usuario autenticado
+cache_usuarios = CacheUsuarios(
+    obtener_entero("CACHE_USUARIOS_MAX", 10000),
+    obtener_flotante("CACHE_USUARIOS_TTL", 30.0),
+)
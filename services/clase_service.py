@@ -1,10 +1,37 @@
 # Importaciones
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
 from fastapi import HTTPException, status
+from sqlalchemy import Row
 from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm import aliased
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
+from models.Asistencia import Asistencia
 from models.Clase import Clase
-from schemas.clase import CrearClase
+from models.Usuario import Usuario
+from schemas.clase import (
+    CrearClase,
+    EntradaListaClase,
+    ProfesorListaClase,
+    RespuestaClase,
+    RespuestaListaClase,
+)
+from services.paginacion import paginar
+from services.sentencias import actualizar_fila, eliminar_fila, insertar_fila
+from services.version_cambio_service import (
+    AMBITO_CLASES,
+    ambito_asistencias_clase,
+    incrementar_version,
+)
+
+# Las clases se listan en orden cronológico; el ID desempata
+CLAVES_ORDEN_CLASE = (Clase.fecha, Clase.id)
+
+# Campos de RespuestaClase, en el orden de las columnas de las filas
+CAMPOS_RESPUESTA_CLASE = tuple(RespuestaClase.model_fields)
 
 
 def crear_clase_service(db: Session, clase: CrearClase, profesorId: str) -> Clase:
@@ -23,17 +50,18 @@ def crear_clase_service(db: Session, clase: CrearClase, profesorId: str) -> Clas
         HTTPException: Si el profesor no existe
     """
     try:
-        db_clase = Clase(
-            nombre=clase.nombre,
-            fecha=clase.fecha,
-            horaInicio=clase.horaInicio,
-            horaFin=clase.horaFin,
-            profesorId=profesorId,
+        db_clase = insertar_fila(
+            db,
+            Clase(
+                nombre=clase.nombre,
+                fecha=datetime.combine(clase.fecha, time.min),
+                horaInicio=clase.horaInicio,
+                horaFin=clase.horaFin,
+                profesorId=profesorId,
+            ),
         )
-
-        db.add(db_clase)
+        incrementar_version(db, [AMBITO_CLASES])
         db.commit()
-        db.refresh(db_clase)
 
         return db_clase
 
@@ -45,19 +73,99 @@ def crear_clase_service(db: Session, clase: CrearClase, profesorId: str) -> Clas
         )
 
 
-def obtener_clases_service(db: Session, skip: int = 0, limit: int = 100) -> list[Clase]:
+def filtrar_clases(
+    statement,
+    id_profesor: Optional[str] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+):
+    """
+    Aplica a una consulta los filtros de clases por profesor y rango de
+    fechas. Las fechas de las clases se guardan a medianoche, por lo que el
+    rango se compara con la columna sin convertirla y puede usar
+    ix_clase_fecha e ix_clase_profesor_fecha.
+
+    Argumentos:
+        statement: Consulta sobre la tabla de clases
+        id_profesor: ID del profesor (opcional)
+        desde: Primer día, incluido (opcional)
+        hasta: Último día, incluido (opcional)
+
+    Retorna:
+        Consulta filtrada
+    """
+    if id_profesor:
+        statement = statement.where(Clase.profesorId == id_profesor)
+
+    if desde:
+        statement = statement.where(Clase.fecha >= datetime.combine(desde, time.min))
+
+    if hasta:
+        dia_siguiente = datetime.combine(hasta + timedelta(days=1), time.min)
+        statement = statement.where(Clase.fecha < dia_siguiente)
+
+    return statement
+
+
+def obtener_clases_service(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    id_profesor: Optional[str] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+) -> list[Clase]:
     """
-    Obtiene una lista de clases con paginación.
+    Obtiene una lista de clases ordenada por fecha con paginación, filtrada
+    por profesor y/o rango de fechas.
 
     Argumentos:
         db: Sesión de base de datos
-        skip: Número de registros a saltar
+        skip: Número de registros a saltar (si no hay cursor)
         limit: Número máximo de registros a devolver
+        cursor: Cursor de la página anterior (opcional)
+        id_profesor: ID del profesor (opcional)
+        desde: Primer día, incluido (opcional)
+        hasta: Último día, incluido (opcional)
 
     Retorna:
         Lista de clases
     """
-    statement = select(Clase).offset(skip).limit(limit)
+    statement = filtrar_clases(select(Clase), id_profesor, desde, hasta)
+    statement = paginar(statement, CLAVES_ORDEN_CLASE, cursor, skip, limit)
+    return db.exec(statement).all()
+
+
+def obtener_clases_filas_service(
+    db: Session,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    id_profesor: Optional[str] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+) -> list[Row]:
+    """
+    Obtiene la misma página que obtener_clases_service como tuplas con las
+    columnas de CAMPOS_RESPUESTA_CLASE, sin crear objetos ORM (respuesta
+    rápida).
+
+    Argumentos:
+        db: Sesión de base de datos
+        skip: Número de registros a saltar (si no hay cursor)
+        limit: Número máximo de registros a devolver
+        cursor: Cursor de la página anterior (opcional)
+        id_profesor: ID del profesor (opcional)
+        desde: Primer día, incluido (opcional)
+        hasta: Último día, incluido (opcional)
+
+    Retorna:
+        Lista de filas
+    """
+    columnas = [getattr(Clase, campo) for campo in CAMPOS_RESPUESTA_CLASE]
+    statement = filtrar_clases(select(*columnas), id_profesor, desde, hasta)
+    statement = paginar(statement, CLAVES_ORDEN_CLASE, cursor, skip, limit)
     return db.exec(statement).all()
 
 
@@ -87,11 +195,78 @@ def obtener_clase_id_service(db: Session, id_clase: str) -> Clase:
     return clase
 
 
+def obtener_lista_clase_service(db: Session, id_clase: str) -> RespuestaListaClase:
+    """
+    Obtiene la lista de una clase (la clase, su profesor y sus asistencias
+    con el nombre de cada estudiante) en una sola consulta con JOIN. Solo se
+    leen las columnas de la respuesta.
+    Lanza HTTPException 404 si la clase no existe.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_clase: ID de la clase
+
+    Retorna:
+        Lista de la clase
+
+    Excepciones:
+        HTTPException: Si la clase no existe
+    """
+    profesor = aliased(Usuario)
+    estudiante = aliased(Usuario)
+    columnas_clase = [getattr(Clase, campo) for campo in CAMPOS_RESPUESTA_CLASE]
+
+    statement = (
+        select(
+            *columnas_clase,
+            profesor.nombre,
+            profesor.apellido,
+            Asistencia.id,
+            Asistencia.usuarioId,
+            estudiante.nombre,
+            estudiante.apellido,
+            Asistencia.estado,
+            Asistencia.fecha,
+        )
+        .join(profesor, profesor.id == Clase.profesorId)
+        .outerjoin(Asistencia, Asistencia.claseId == Clase.id)
+        .outerjoin(estudiante, estudiante.id == Asistencia.usuarioId)
+        .where(Clase.id == id_clase)
+        .order_by(estudiante.apellido, estudiante.nombre, Asistencia.id)
+    )
+    filas = db.exec(statement).all()
+
+    if not filas:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Clase no encontrada"
+        )
+
+    n = len(CAMPOS_RESPUESTA_CLASE)
+    clase = dict(zip(CAMPOS_RESPUESTA_CLASE, filas[0][:n]))
+    nombre_profesor, apellido_profesor = filas[0][n : n + 2]
+
+    return RespuestaListaClase(
+        **clase,
+        profesor=ProfesorListaClase(
+            id=clase["profesorId"], nombre=nombre_profesor, apellido=apellido_profesor
+        ),
+        # Una clase sin asistencias devuelve una fila con las columnas de la
+        # asistencia a NULL
+        asistencias=[
+            EntradaListaClase(
+                **dict(zip(EntradaListaClase.model_fields, fila[n + 2 :]))
+            )
+            for fila in filas
+            if fila[n + 2] is not None
+        ],
+    )
+
+
 def actualizar_clase_service(
     db: Session, id_clase: str, clase_data: CrearClase
 ) -> Clase:
     """
-    Actualiza una clase existente.
+    Actualiza una clase existente con una sola sentencia UPDATE ... RETURNING.
 
     Argumentos:
         db: Sesión de base de datos
@@ -100,22 +275,30 @@ def actualizar_clase_service(
 
     Retorna:
         Clase actualizada
-    """
-    db_clase = obtener_clase_id_service(db, id_clase)
 
-    db_clase.nombre = clase_data.nombre
-    db_clase.fecha = clase_data.fecha
-    db_clase.horaInicio = clase_data.horaInicio
-    db_clase.horaFin = clase_data.horaFin
+    Excepciones:
+        HTTPException: Si la clase no existe
+    """
+    db_clase = actualizar_fila(
+        db,
+        Clase,
+        [Clase.id == id_clase],
+        {
+            **clase_data.model_dump(),
+            "fecha": datetime.combine(clase_data.fecha, time.min),
+        },
+        "Clase no encontrada",
+    )
 
+    incrementar_version(db, [AMBITO_CLASES])
     db.commit()
-    db.refresh(db_clase)
     return db_clase
 
 
 def eliminar_clase_service(db: Session, id_clase: str) -> Clase:
     """
-    Elimina una clase de la base de datos.
+    Elimina una clase de la base de datos con una sola sentencia
+    DELETE ... RETURNING.
 
     Argumentos:
         db: Sesión de base de datos
@@ -123,8 +306,92 @@ def eliminar_clase_service(db: Session, id_clase: str) -> Clase:
 
     Retorna:
         Clase eliminada
+
+    Excepciones:
+        HTTPException: Si la clase no existe
     """
-    db_clase = obtener_clase_id_service(db, id_clase)
-    db.delete(db_clase)
+    db_clase = eliminar_fila(db, Clase, [Clase.id == id_clase], "Clase no encontrada")
+    # También cambian las asistencias de la clase: sus listados cacheados
+    # (GET /asistencias/?claseId=) no deben seguir respondiendo 304
+    incrementar_version(db, [AMBITO_CLASES, ambito_asistencias_clase(id_clase)])
     db.commit()
     return db_clase
+
+
+# Variantes asíncronas: ejecutan la lógica síncrona sobre la conexión
+# asíncrona de la sesión (AsyncSession.run_sync), sin ocupar hilos del pool.
+
+
+async def crear_clase_service_async(
+    db: AsyncSession, clase: CrearClase, profesorId: str
+) -> Clase:
+    """
+    Variante asíncrona de crear_clase_service.
+    """
+    return await db.run_sync(crear_clase_service, clase, profesorId)
+
+
+async def obtener_clases_service_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    id_profesor: Optional[str] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+) -> list[Clase]:
+    """
+    Variante asíncrona de obtener_clases_service.
+    """
+    return await db.run_sync(
+        obtener_clases_service, skip, limit, cursor, id_profesor, desde, hasta
+    )
+
+
+async def obtener_clases_filas_service_async(
+    db: AsyncSession,
+    skip: int = 0,
+    limit: int = 100,
+    cursor: Optional[str] = None,
+    id_profesor: Optional[str] = None,
+    desde: Optional[date] = None,
+    hasta: Optional[date] = None,
+) -> list[Row]:
+    """
+    Variante asíncrona de obtener_clases_filas_service.
+    """
+    return await db.run_sync(
+        obtener_clases_filas_service, skip, limit, cursor, id_profesor, desde, hasta
+    )
+
+
+async def obtener_clase_id_service_async(db: AsyncSession, id_clase: str) -> Clase:
+    """
+    Variante asíncrona de obtener_clase_id_service.
+    """
+    return await db.run_sync(obtener_clase_id_service, id_clase)
+
+
+async def obtener_lista_clase_service_async(
+    db: AsyncSession, id_clase: str
+) -> RespuestaListaClase:
+    """
+    Variante asíncrona de obtener_lista_clase_service.
+    """
+    return await db.run_sync(obtener_lista_clase_service, id_clase)
+
+
+async def actualizar_clase_service_async(
+    db: AsyncSession, id_clase: str, clase_data: CrearClase
+) -> Clase:
+    """
+    Variante asíncrona de actualizar_clase_service.
+    """
+    return await db.run_sync(actualizar_clase_service, id_clase, clase_data)
+
+
+async def eliminar_clase_service_async(db: AsyncSession, id_clase: str) -> Clase:
+    """
+    Variante asíncrona de eliminar_clase_service.
+    """
+    return await db.run_sync(eliminar_clase_service, id_clase)
@@ -0,0 +1,125 @@
+# Importaciones
+import json
+import logging
+import secrets
+
+import jwt
+from jwt.exceptions import InvalidTokenError
+
+from configuracion import obtener_texto
+
+logger = logging.getLogger(__name__)
+
+# Algoritmo de firma de los tokens
+ALGORITMO_JWT = "HS256"
+
+
+class ConjuntoClaves:
+    """
+    Claves de firma de los tokens, identificadas por kid.
+    Los tokens se firman con la clave activa e incluyen su kid en la cabecera;
+    se validan con la clave de ese kid, de modo que durante una rotación los
+    tokens firmados con la clave anterior siguen siendo válidos mientras
+    esta permanezca en el conjunto.
+
+    Atributos:
+        claves: Secreto de cada clave por kid
+        activa: kid de la clave con la que se firman los tokens nuevos
+    """
+
+    def __init__(self, claves: dict[str, str], activa: str):
+        if activa not in claves:
+            raise ValueError(f"La clave activa '{activa}' no está definida")
+
+        self.claves = claves
+        self.activa = activa
+
+    def firmar(self, datos: dict) -> str:
+        """
+        Firma un token con la clave activa.
+
+        Argumentos:
+            datos: Datos a codificar
+
+        Retorna:
+            Token firmado
+        """
+        return jwt.encode(
+            datos,
+            self.claves[self.activa],
+            algorithm=ALGORITMO_JWT,
+            headers={"kid": self.activa},
+        )
+
+    def decodificar(self, token: str) -> dict:
+        """
+        Valida un token con la clave indicada en su cabecera.
+
+        Argumentos:
+            token: Token a validar
+
+        Retorna:
+            Datos del token
+
+        Excepciones:
+            InvalidTokenError: Si el token no es válido o su kid es desconocido
+        """
+        kid = jwt.get_unverified_header(token).get("kid")
+
+        # Sin kid solo se acepta si hay una única clave
+        if kid is None and len(self.claves) == 1:
+            kid = self.activa
+
+        if kid not in self.claves:
+            raise InvalidTokenError("Clave de firma desconocida")
+
+        return jwt.decode(token, self.claves[kid], algorithms=[ALGORITMO_JWT])
+
+
+def cargar_claves() -> ConjuntoClaves:
+    """
+    Carga las claves de firma desde la configuración, por orden:
+        JWT_CLAVES_ARCHIVO: fichero JSON {"activa": kid, "claves": {kid: secreto}}
+        JWT_CLAVES: lista "kid:secreto,kid:secreto" (activa: JWT_CLAVE_ACTIVA
+            o la primera)
+        JWT_CLAVE_SECRETA: una única clave con kid "principal"
+    Sin configuración genera una clave aleatoria: los tokens solo serán
+    válidos en este proceso, por lo que no sirve con varios workers.
+
+    Retorna:
+        Conjunto de claves
+
+    Excepciones:
+        ValueError: Si la configuración no es válida
+    """
+    archivo = obtener_texto("JWT_CLAVES_ARCHIVO")
+
+    if archivo:
+        with open(archivo, encoding="utf-8") as f:
+            contenido = json.load(f)
+        return ConjuntoClaves(dict(contenido["claves"]), contenido["activa"])
+
+    lista = obtener_texto("JWT_CLAVES")
+
+    if lista:
+        claves = {}
+        for elemento in lista.split(","):
+            kid, separador, secreto = elemento.strip().partition(":")
+            if not separador or not kid or not secreto:
+                raise ValueError("JWT_CLAVES debe tener el formato kid:secreto,...")
+            claves[kid] = secreto
+        return ConjuntoClaves(
+            claves, obtener_texto("JWT_CLAVE_ACTIVA", next(iter(claves)))
+        )
+
+    secreto = obtener_texto("JWT_CLAVE_SECRETA")
+
+    if secreto:
+        return ConjuntoClaves({"principal": secreto}, "principal")
+
+    logger.warning(
+        "Sin claves JWT configuradas: se usa una clave aleatoria por proceso. "
+        "Define JWT_CLAVES_ARCHIVO, JWT_CLAVES o JWT_CLAVE_SECRETA para usar "
+        "varios workers."
+    )
+    return ConjuntoClaves({"local": secrets.token_hex(32)}, "local")
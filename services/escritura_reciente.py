@@ -0,0 +1,52 @@
+# Importaciones
+import math
+import time
+
+from database.connection import (
+    COOKIE_ESCRITURA,
+    EnrutadorLectura,
+    obtener_enrutador_lectura,
+)
+
+# Métodos HTTP que no modifican datos
+METODOS_LECTURA = {"GET", "HEAD", "OPTIONS"}
+
+
+class MiddlewareEscrituraReciente:
+    """
+    Middleware ASGI que marca con la cookie COOKIE_ESCRITURA a los clientes
+    cuya petición de escritura termina con éxito. Durante la ventana del
+    enrutador sus lecturas van al primario (leer sus propias escrituras).
+    Sin réplica configurada no añade la cookie.
+    """
+
+    def __init__(self, app, enrutador: EnrutadorLectura | None = None):
+        self.app = app
+        self.enrutador = enrutador
+
+    async def __call__(self, scope, receive, send):
+        # El enrutador compartido se obtiene en la primera petición
+        enrutador = self.enrutador or obtener_enrutador_lectura()
+
+        if (
+            scope["type"] != "http"
+            or scope["method"] in METODOS_LECTURA
+            or enrutador.replica is None
+        ):
+            await self.app(scope, receive, send)
+            return
+
+        async def enviar(mensaje):
+            if mensaje["type"] == "http.response.start" and mensaje["status"] < 400:
+                cookie = (
+                    f"{COOKIE_ESCRITURA}={time.time():.3f}; "
+                    f"Max-Age={math.ceil(enrutador.ventana)}; Path=/; "
+                    "HttpOnly; SameSite=Lax"
+                )
+                mensaje["headers"] = [
+                    *mensaje.get("headers", []),
+                    (b"set-cookie", cookie.encode("latin-1")),
+                ]
+            await send(mensaje)
+
+        await self.app(scope, receive, enviar)
@@ -0,0 +1,414 @@
+# Importaciones
+from datetime import date, datetime, time, timedelta
+from typing import Optional
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, update
+from sqlalchemy.exc import IntegrityError
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.zone_horary import fecha_madrid
+from models.Asistencia import Asistencia
+from models.Clase import Clase
+from models.Horario import Horario
+from schemas.horario import (
+    ActualizarSesionesHorario,
+    CrearHorario,
+    RespuestaCrearHorario,
+    RespuestaSesionesHorario,
+)
+from services.clase_service import CLAVES_ORDEN_CLASE
+from services.paginacion import paginar
+from services.sentencias import insertar_fila
+from services.version_cambio_service import (
+    AMBITO_ASISTENCIAS,
+    AMBITO_CLASES,
+    ambito_asistencias_clase,
+    incrementar_version,
+)
+
+# Duración máxima de un horario (dos cursos)
+MAX_DIAS_HORARIO = 731
+
+
+def validar_horas(hora_inicio: time, hora_fin: time) -> None:
+    """
+    Comprueba que la hora de fin es posterior a la de inicio.
+
+    Excepciones:
+        HTTPException: Si las horas no son válidas
+    """
+    if hora_fin <= hora_inicio:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="La hora de fin debe ser posterior a la hora de inicio",
+        )
+
+
+def generar_fechas_horario(horario: CrearHorario) -> list[date]:
+    """
+    Genera las fechas de las clases de un horario: cada día del rango cuyo
+    día de la semana está en el horario y que no es festivo.
+    Lanza HTTPException 400 si el horario no es válido.
+
+    Argumentos:
+        horario: Datos del horario
+
+    Retorna:
+        Fechas de las clases en orden cronológico
+
+    Excepciones:
+        HTTPException: Si los días, las horas o el rango de fechas no son válidos
+    """
+    if not horario.diasSemana or not all(0 <= dia <= 6 for dia in horario.diasSemana):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Los días de la semana deben estar entre 0 (lunes) y 6 (domingo)",
+        )
+
+    validar_horas(horario.horaInicio, horario.horaFin)
+
+    dias = (horario.fechaFin - horario.fechaInicio).days + 1
+
+    if not 0 < dias <= MAX_DIAS_HORARIO:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail=f"El rango de fechas debe tener entre 1 y {MAX_DIAS_HORARIO} días",
+        )
+
+    dias_semana = set(horario.diasSemana)
+    festivos = set(horario.festivos)
+    fechas = (horario.fechaInicio + timedelta(days=n) for n in range(dias))
+
+    return [
+        fecha
+        for fecha in fechas
+        if fecha.weekday() in dias_semana and fecha not in festivos
+    ]
+
+
+def crear_horario_service(
+    db: Session, horario: CrearHorario, profesorId: str
+) -> RespuestaCrearHorario:
+    """
+    Crea un horario y genera todas sus clases en una sola transacción con un
+    INSERT de varias filas.
+
+    Argumentos:
+        db: Sesión de base de datos
+        horario: Datos del horario
+        profesorId: ID del profesor que imparte las clases
+
+    Retorna:
+        Horario creado y número de clases generadas
+
+    Excepciones:
+        HTTPException: Si el horario no es válido o el profesor no existe
+    """
+    fechas = generar_fechas_horario(horario)
+
+    db_horario = Horario(
+        nombre=horario.nombre,
+        diasSemana=sorted(set(horario.diasSemana)),
+        horaInicio=horario.horaInicio,
+        horaFin=horario.horaFin,
+        fechaInicio=horario.fechaInicio,
+        fechaFin=horario.fechaFin,
+        festivos=sorted({festivo.isoformat() for festivo in horario.festivos}),
+        profesorId=profesorId,
+    )
+
+    try:
+        db_horario = insertar_fila(db, db_horario)
+
+        if fechas:
+            clases = [
+                Clase(
+                    nombre=horario.nombre,
+                    fecha=datetime.combine(fecha, time.min),
+                    horaInicio=horario.horaInicio,
+                    horaFin=horario.horaFin,
+                    profesorId=profesorId,
+                    horarioId=db_horario.id,
+                )
+                for fecha in fechas
+            ]
+            db.exec(insert(Clase), params=[clase.model_dump() for clase in clases])
+            incrementar_version(db, [AMBITO_CLASES])
+
+        db.commit()
+
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Error al crear el horario. Verifica que el profesor existe.",
+        )
+
+    return RespuestaCrearHorario(**db_horario.model_dump(), clasesCreadas=len(fechas))
+
+
+def obtener_horario_id_service(db: Session, id_horario: str) -> Horario:
+    """
+    Obtiene un horario por su ID.
+    Lanza HTTPException 404 si no existe.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_horario: ID del horario
+
+    Retorna:
+        Horario encontrado
+
+    Excepciones:
+        HTTPException: Si el horario no existe
+    """
+    horario = db.exec(select(Horario).where(Horario.id == id_horario)).first()
+
+    if not horario:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND, detail="Horario no encontrado"
+        )
+
+    return horario
+
+
+def obtener_horario_profesor_service(
+    db: Session, id_horario: str, profesorId: str
+) -> Horario:
+    """
+    Obtiene un horario por su ID comprobando que pertenece al profesor.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_horario: ID del horario
+        profesorId: ID del profesor que hace la petición
+
+    Retorna:
+        Horario encontrado
+
+    Excepciones:
+        HTTPException: 404 si el horario no existe, 403 si es de otro profesor
+    """
+    horario = obtener_horario_id_service(db, id_horario)
+
+    if horario.profesorId != profesorId:
+        raise HTTPException(
+            status_code=status.HTTP_403_FORBIDDEN, detail="Permiso denegado"
+        )
+
+    return horario
+
+
+def inicio_sesiones(desde: Optional[date]) -> datetime:
+    """
+    Calcula el inicio de las sesiones afectadas por una modificación o
+    cancelación. Las sesiones pasadas (y sus asistencias) no se modifican.
+
+    Argumentos:
+        desde: Primera fecha afectada (por defecto, hoy)
+
+    Retorna:
+        Inicio del día de la primera fecha afectada
+
+    Excepciones:
+        HTTPException: 400 si la fecha es anterior a hoy
+    """
+    hoy = fecha_madrid()
+
+    if desde is not None and desde < hoy:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No se pueden modificar sesiones pasadas",
+        )
+
+    return datetime.combine(desde or hoy, time.min)
+
+
+def obtener_clases_horario_service(
+    db: Session, id_horario: str, limit: int = 100, cursor: Optional[str] = None
+) -> list[Clase]:
+    """
+    Obtiene las clases de un horario ordenadas por fecha con paginación.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_horario: ID del horario
+        limit: Número máximo de registros a devolver
+        cursor: Cursor de la página anterior (opcional)
+
+    Retorna:
+        Lista de clases del horario
+
+    Excepciones:
+        HTTPException: Si el horario no existe
+    """
+    obtener_horario_id_service(db, id_horario)
+
+    statement = select(Clase).where(Clase.horarioId == id_horario)
+    statement = paginar(statement, CLAVES_ORDEN_CLASE, cursor, limit=limit)
+    return db.exec(statement).all()
+
+
+def actualizar_sesiones_horario_service(
+    db: Session,
+    id_horario: str,
+    profesorId: str,
+    datos: ActualizarSesionesHorario,
+    desde: Optional[date] = None,
+) -> RespuestaSesionesHorario:
+    """
+    Modifica todas las clases futuras de un horario con un único UPDATE y
+    guarda los nuevos valores en el horario.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_horario: ID del horario
+        profesorId: ID del profesor que hace la petición
+        datos: Campos a modificar
+        desde: Primera fecha afectada (por defecto, hoy; no puede ser pasada)
+
+    Retorna:
+        Número de clases modificadas
+
+    Excepciones:
+        HTTPException: Si el horario no existe, es de otro profesor, la fecha
+            es pasada o los datos no son válidos
+    """
+    db_horario = obtener_horario_profesor_service(db, id_horario, profesorId)
+    valores = datos.model_dump(exclude_none=True)
+
+    if not valores:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="No se ha indicado ningún cambio",
+        )
+
+    validar_horas(
+        valores.get("horaInicio", db_horario.horaInicio),
+        valores.get("horaFin", db_horario.horaFin),
+    )
+
+    inicio = inicio_sesiones(desde)
+    resultado = db.exec(
+        update(Clase)
+        .where(Clase.horarioId == id_horario, Clase.fecha >= inicio)
+        .values(**valores)
+    )
+
+    for campo, valor in valores.items():
+        setattr(db_horario, campo, valor)
+
+    if resultado.rowcount:
+        incrementar_version(db, [AMBITO_CLASES])
+
+    db.commit()
+    return RespuestaSesionesHorario(sesiones=resultado.rowcount)
+
+
+def cancelar_sesiones_horario_service(
+    db: Session, id_horario: str, profesorId: str, desde: Optional[date] = None
+) -> RespuestaSesionesHorario:
+    """
+    Cancela (elimina) todas las clases futuras de un horario con un único
+    DELETE, precedido del DELETE de las asistencias que tuvieran registradas.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_horario: ID del horario
+        profesorId: ID del profesor que hace la petición
+        desde: Primera fecha afectada (por defecto, hoy; no puede ser pasada)
+
+    Retorna:
+        Número de clases canceladas
+
+    Excepciones:
+        HTTPException: Si el horario no existe, es de otro profesor o la
+            fecha es pasada
+    """
+    obtener_horario_profesor_service(db, id_horario, profesorId)
+
+    inicio = inicio_sesiones(desde)
+    filtro = (Clase.horarioId == id_horario, Clase.fecha >= inicio)
+
+    asistencias = Asistencia.claseId.in_(select(Clase.id).where(*filtro))
+    clases_con_asistencias = db.exec(
+        select(Asistencia.claseId).where(asistencias).distinct()
+    ).all()
+
+    if clases_con_asistencias:
+        db.exec(delete(Asistencia).where(asistencias))
+        incrementar_version(
+            db,
+            [AMBITO_ASISTENCIAS]
+            + [
+                ambito_asistencias_clase(id_clase)
+                for id_clase in clases_con_asistencias
+            ],
+        )
+
+    resultado = db.exec(delete(Clase).where(*filtro))
+
+    if resultado.rowcount:
+        incrementar_version(db, [AMBITO_CLASES])
+
+    db.commit()
+    return RespuestaSesionesHorario(sesiones=resultado.rowcount)
+
+
+# Variantes asíncronas: ejecutan la lógica síncrona sobre la conexión
+# asíncrona de la sesión (AsyncSession.run_sync), sin ocupar hilos del pool.
+
+
+async def crear_horario_service_async(
+    db: AsyncSession, horario: CrearHorario, profesorId: str
+) -> RespuestaCrearHorario:
+    """
+    Variante asíncrona de crear_horario_service.
+    """
+    return await db.run_sync(crear_horario_service, horario, profesorId)
+
+
+async def obtener_horario_id_service_async(
+    db: AsyncSession, id_horario: str
+) -> Horario:
+    """
+    Variante asíncrona de obtener_horario_id_service.
+    """
+    return await db.run_sync(obtener_horario_id_service, id_horario)
+
+
+async def obtener_clases_horario_service_async(
+    db: AsyncSession, id_horario: str, limit: int = 100, cursor: Optional[str] = None
+) -> list[Clase]:
+    """
+    Variante asíncrona de obtener_clases_horario_service.
+    """
+    return await db.run_sync(obtener_clases_horario_service, id_horario, limit, cursor)
+
+
+async def actualizar_sesiones_horario_service_async(
+    db: AsyncSession,
+    id_horario: str,
+    profesorId: str,
+    datos: ActualizarSesionesHorario,
+    desde: Optional[date] = None,
+) -> RespuestaSesionesHorario:
+    """
+    Variante asíncrona de actualizar_sesiones_horario_service.
+    """
+    return await db.run_sync(
+        actualizar_sesiones_horario_service, id_horario, profesorId, datos, desde
+    )
+
+
+async def cancelar_sesiones_horario_service_async(
+    db: AsyncSession, id_horario: str, profesorId: str, desde: Optional[date] = None
+) -> RespuestaSesionesHorario:
+    """
+    Variante asíncrona de cancelar_sesiones_horario_service.
+    """
+    return await db.run_sync(
+        cancelar_sesiones_horario_service, id_horario, profesorId, desde
+    )
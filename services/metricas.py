@@ -0,0 +1,425 @@
+# Importaciones
+import logging
+from bisect import bisect_left
+from contextlib import contextmanager
+from contextvars import ContextVar
+from time import perf_counter
+from typing import Iterator
+
+from anyio.to_thread import current_default_thread_limiter
+from sqlalchemy import Engine, event
+
+from configuracion import obtener_booleano, obtener_entero
+from services.pool_cifrado import pool_cifrado
+
+logger = logging.getLogger(__name__)
+
+# Métricas de las peticiones y endpoint /metrics (formato de texto de
+# Prometheus)
+METRICAS_HABILITADAS = obtener_booleano("API_METRICAS", True)
+
+# Sentencias y tiempo de base de datos de cada petición en las métricas.
+# Cualquier evento en el motor saca a SQLAlchemy de su camino rápido de
+# ejecución y añade unos 15-20 µs por sentencia (benchmarks/metricas.py), por
+# lo que está desactivado por defecto.
+METRICAS_BD_HABILITADAS = obtener_booleano("API_METRICAS_BD", False)
+
+# Ejecuciones de una misma sentencia en una petición a partir de las cuales
+# se considera un posible N+1 (una consulta por fila)
+UMBRAL_N_MAS_1 = obtener_entero("DB_UMBRAL_N_MAS_1", 10)
+
+# Tipo de contenido del formato de texto de Prometheus
+TIPO_CONTENIDO = "text/plain; version=0.0.4; charset=utf-8"
+
+# Ruta de las peticiones que no coinciden con ninguna ruta (404), para no
+# crear una serie por cada URL desconocida
+SIN_RUTA = "sin_ruta"
+
+# Límites de las cubetas de los histogramas
+CUBETAS_DURACION = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+CUBETAS_TIEMPO_BD = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0)
+CUBETAS_CONSULTAS_BD = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+
+
+class Histograma:
+    """
+    Histograma acumulativo con cubetas fijas, como el de Prometheus.
+
+    Atributos:
+        cubetas: Límites superiores de las cubetas (ordenados)
+        cuentas: Observaciones de cada cubeta (la última es +Inf)
+        suma: Suma de las observaciones
+        total: Número de observaciones
+    """
+
+    __slots__ = ("cubetas", "cuentas", "suma", "total")
+
+    def __init__(self, cubetas: tuple[float, ...]):
+        self.cubetas = cubetas
+        self.cuentas = [0] * (len(cubetas) + 1)
+        self.suma = 0.0
+        self.total = 0
+
+    def observar(self, valor: float) -> None:
+        # bisect_left: un valor igual al límite cuenta en esa cubeta (le)
+        self.cuentas[bisect_left(self.cubetas, valor)] += 1
+        self.suma += valor
+        self.total += 1
+
+
+class EstadisticasBd:
+    """
+    Consultas y tiempo de base de datos de una petición.
+
+    Atributos:
+        consultas: Sentencias ejecutadas
+        tiempo: Segundos de ejecución de las sentencias
+        sentencias: SQL de cada sentencia (con parámetros) -> ejecuciones
+    """
+
+    __slots__ = ("consultas", "tiempo", "sentencias")
+
+    def __init__(self):
+        self.consultas = 0
+        self.tiempo = 0.0
+        self.sentencias: dict[str, int] = {}
+
+    def agregar(self, otra: "EstadisticasBd") -> None:
+        """
+        Suma las estadísticas de otro objeto a este.
+
+        Argumentos:
+            otra: Estadísticas a sumar
+        """
+        self.consultas += otra.consultas
+        self.tiempo += otra.tiempo
+        for sentencia, veces in otra.sentencias.items():
+            self.sentencias[sentencia] = self.sentencias.get(sentencia, 0) + veces
+
+    def repetidas(self, umbral: int) -> list[tuple[str, int]]:
+        """
+        Obtiene las sentencias ejecutadas al menos `umbral` veces. Como los
+        valores van en los parámetros, una misma sentencia repetida suele ser
+        una consulta por fila de un resultado anterior (N+1).
+
+        Argumentos:
+            umbral: Ejecuciones mínimas
+
+        Retorna:
+            Lista de (sentencia, ejecuciones), de más a menos ejecutada
+        """
+        return sorted(
+            (
+                (sentencia, veces)
+                for sentencia, veces in self.sentencias.items()
+                if veces >= umbral
+            ),
+            key=lambda repetida: -repetida[1],
+        )
+
+
+# Estadísticas de base de datos de la petición en curso. Los hilos del pool
+# y los greenlets de las sesiones asíncronas heredan el contexto, por lo que
+# todas las sentencias de la petición se suman al mismo objeto.
+estadisticas_bd: ContextVar[EstadisticasBd | None] = ContextVar(
+    "estadisticas_bd", default=None
+)
+
+
+@contextmanager
+def contar_consultas() -> Iterator[EstadisticasBd]:
+    """
+    Cuenta las sentencias ejecutadas dentro del bloque, incluidas las de las
+    peticiones que se atiendan en el mismo contexto (TestClient).
+
+    Retorna:
+        Estadísticas de base de datos del bloque
+    """
+    bd = EstadisticasBd()
+    token = estadisticas_bd.set(bd)
+
+    try:
+        yield bd
+
+    finally:
+        estadisticas_bd.reset(token)
+
+
+class MetricasRuta:
+    """
+    Métricas de un método y plantilla de ruta.
+
+    Atributos:
+        codigos: Código de estado -> peticiones atendidas
+        duracion: Histograma de la duración de las peticiones
+        tiempo_bd: Histograma del tiempo de base de datos por petición
+        consultas_bd: Histograma de sentencias por petición
+        n_mas_1: Peticiones con sentencias repetidas (posible N+1)
+    """
+
+    __slots__ = ("codigos", "duracion", "tiempo_bd", "consultas_bd", "n_mas_1")
+
+    def __init__(self):
+        self.codigos: dict[int, int] = {}
+        self.duracion = Histograma(CUBETAS_DURACION)
+        self.tiempo_bd = Histograma(CUBETAS_TIEMPO_BD)
+        self.consultas_bd = Histograma(CUBETAS_CONSULTAS_BD)
+        self.n_mas_1 = 0
+
+
+class Metricas:
+    """
+    Registro en memoria de las métricas de las peticiones HTTP por método y
+    plantilla de ruta (por ejemplo /clases/{id_clase}). Solo se modifica
+    desde el bucle de eventos, por lo que no necesita bloqueos.
+
+    Atributos:
+        rutas: (método, ruta) -> métricas de la ruta
+        en_curso: Peticiones en curso
+    """
+
+    def __init__(self):
+        self.limpiar()
+
+    def limpiar(self) -> None:
+        """
+        Elimina todas las métricas registradas.
+        """
+        self.rutas: dict[tuple[str, str], MetricasRuta] = {}
+        self.en_curso = 0
+
+    def registrar(
+        self,
+        metodo: str,
+        ruta: str,
+        codigo: int,
+        duracion: float,
+        bd: EstadisticasBd,
+    ) -> None:
+        """
+        Registra una petición terminada.
+
+        Argumentos:
+            metodo: Método HTTP
+            ruta: Plantilla de la ruta
+            codigo: Código de estado de la respuesta
+            duracion: Segundos desde la recepción hasta el fin de la respuesta
+            bd: Consultas y tiempo de base de datos de la petición
+        """
+        metricas_ruta = self.rutas.get((metodo, ruta))
+        if metricas_ruta is None:
+            metricas_ruta = self.rutas[(metodo, ruta)] = MetricasRuta()
+
+        codigos = metricas_ruta.codigos
+        codigos[codigo] = codigos.get(codigo, 0) + 1
+        metricas_ruta.duracion.observar(duracion)
+        metricas_ruta.tiempo_bd.observar(bd.tiempo)
+        metricas_ruta.consultas_bd.observar(bd.consultas)
+
+        # Solo se buscan repeticiones si hay sentencias suficientes
+        if bd.consultas >= UMBRAL_N_MAS_1 and (
+            repetidas := bd.repetidas(UMBRAL_N_MAS_1)
+        ):
+            metricas_ruta.n_mas_1 += 1
+            for sentencia, veces in repetidas:
+                logger.warning(
+                    "Posible N+1 en %s %s: %d ejecuciones de %s",
+                    metodo,
+                    ruta,
+                    veces,
+                    sentencia,
+                )
+
+    def exportar(self) -> str:
+        """
+        Exporta las métricas en el formato de texto de Prometheus, junto con
+        la ocupación del pool de hilos y del pool de cifrado. Debe llamarse
+        desde el bucle de eventos.
+
+        Retorna:
+            Texto de las métricas
+        """
+        lineas: list[str] = []
+        rutas = sorted(self.rutas.items())
+
+        cabecera(lineas, "http_peticiones_total", "counter", "Peticiones HTTP")
+        for (metodo, ruta), metricas_ruta in rutas:
+            for codigo, valor in sorted(metricas_ruta.codigos.items()):
+                etiquetas = formatear_etiquetas(metodo=metodo, ruta=ruta, codigo=codigo)
+                lineas.append(f"http_peticiones_total{{{etiquetas}}} {valor}")
+
+        cabecera(
+            lineas,
+            "http_n_mas_1_total",
+            "counter",
+            "Peticiones con una misma sentencia repetida (posible N+1)",
+        )
+        for (metodo, ruta), metricas_ruta in rutas:
+            etiquetas = formatear_etiquetas(metodo=metodo, ruta=ruta)
+            lineas.append(f"http_n_mas_1_total{{{etiquetas}}} {metricas_ruta.n_mas_1}")
+
+        for nombre, ayuda, atributo in (
+            (
+                "http_duracion_peticion_segundos",
+                "Duración de las peticiones HTTP",
+                "duracion",
+            ),
+            (
+                "http_tiempo_bd_peticion_segundos",
+                "Tiempo de base de datos por petición",
+                "tiempo_bd",
+            ),
+            (
+                "http_consultas_bd_peticion",
+                "Sentencias de base de datos por petición",
+                "consultas_bd",
+            ),
+        ):
+            cabecera(lineas, nombre, "histogram", ayuda)
+            for (metodo, ruta), metricas_ruta in rutas:
+                exportar_histograma(
+                    lineas,
+                    nombre,
+                    formatear_etiquetas(metodo=metodo, ruta=ruta),
+                    getattr(metricas_ruta, atributo),
+                )
+
+        limitador = current_default_thread_limiter()
+        for nombre, ayuda, valor in (
+            ("http_peticiones_en_curso", "Peticiones HTTP en curso", self.en_curso),
+            (
+                "threadpool_hilos_ocupados",
+                "Hilos del pool ocupados",
+                limitador.borrowed_tokens,
+            ),
+            ("threadpool_hilos_maximo", "Hilos del pool", limitador.total_tokens),
+            (
+                "threadpool_tareas_en_espera",
+                "Tareas esperando un hilo del pool",
+                limitador.statistics().tasks_waiting,
+            ),
+            (
+                "cifrado_operaciones_pendientes",
+                "Operaciones de cifrado en curso o en cola",
+                pool_cifrado.pendientes,
+            ),
+        ):
+            cabecera(lineas, nombre, "gauge", ayuda)
+            lineas.append(f"{nombre} {valor}")
+
+        return "\n".join(lineas) + "\n"
+
+
+def formatear_etiquetas(**etiquetas) -> str:
+    # Etiquetas con los caracteres especiales escapados
+    return ",".join(
+        '{}="{}"'.format(
+            nombre,
+            str(valor).replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n"),
+        )
+        for nombre, valor in etiquetas.items()
+    )
+
+
+def cabecera(lineas: list[str], nombre: str, tipo: str, ayuda: str) -> None:
+    # Líneas HELP y TYPE de una métrica
+    lineas.append(f"# HELP {nombre} {ayuda}")
+    lineas.append(f"# TYPE {nombre} {tipo}")
+
+
+def exportar_histograma(
+    lineas: list[str], nombre: str, etiquetas: str, histograma: Histograma
+) -> None:
+    # Cubetas acumuladas, suma y número de observaciones de un histograma
+    acumulado = 0
+    limites = (*histograma.cubetas, "+Inf")
+
+    for limite, cuenta in zip(limites, histograma.cuentas):
+        acumulado += cuenta
+        lineas.append(f'{nombre}_bucket{{{etiquetas},le="{limite}"}} {acumulado}')
+
+    lineas.append(f"{nombre}_sum{{{etiquetas}}} {histograma.suma}")
+    lineas.append(f"{nombre}_count{{{etiquetas}}} {histograma.total}")
+
+
+def antes_de_ejecutar(conexion, cursor, statement, parameters, context, many):
+    # El inicio se guarda en el contexto de la ejecución, que se descarta con
+    # ella aunque la sentencia falle. Fuera de una petición no se mide nada.
+    if context is not None and estadisticas_bd.get() is not None:
+        context.inicio_metricas = perf_counter()
+
+
+def despues_de_ejecutar(conexion, cursor, statement, parameters, context, many):
+    inicio = getattr(context, "inicio_metricas", None)
+    if inicio is not None and (bd := estadisticas_bd.get()) is not None:
+        bd.consultas += 1
+        bd.tiempo += perf_counter() - inicio
+        bd.sentencias[statement] = bd.sentencias.get(statement, 0) + 1
+
+
+def instrumentar_engine(engine: Engine) -> None:
+    """
+    Registra en el motor los eventos que suman las sentencias ejecutadas, su
+    duración y su SQL a las estadísticas de la petición en curso. Instrumentar
+    de nuevo un motor ya instrumentado no tiene efecto. Añade unos 15-20 µs a
+    cada sentencia del motor, también fuera de las peticiones.
+
+    Argumentos:
+        engine: Motor síncrono (o sync_engine de un motor asíncrono)
+    """
+    if event.contains(engine, "before_cursor_execute", antes_de_ejecutar):
+        return
+
+    event.listen(engine, "before_cursor_execute", antes_de_ejecutar)
+    event.listen(engine, "after_cursor_execute", despues_de_ejecutar)
+
+
+class MiddlewareMetricas:
+    """
+    Middleware ASGI que registra cada petición HTTP en las métricas con la
+    plantilla de la ruta que la atendió, el código de estado, la duración y
+    las estadísticas de base de datos.
+    """
+
+    def __init__(self, app, registro: Metricas | None = None):
+        self.app = app
+        self.registro = registro or metricas
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        codigo = 500
+
+        async def enviar(mensaje):
+            nonlocal codigo
+            if mensaje["type"] == "http.response.start":
+                codigo = mensaje["status"]
+            await send(mensaje)
+
+        # Las estadísticas de un contexto exterior (contar_consultas) también
+        # reciben las de la petición
+        padre = estadisticas_bd.get()
+        bd = EstadisticasBd()
+        token = estadisticas_bd.set(bd)
+        self.registro.en_curso += 1
+        inicio = perf_counter()
+
+        try:
+            await self.app(scope, receive, enviar)
+
+        finally:
+            duracion = perf_counter() - inicio
+            self.registro.en_curso -= 1
+            estadisticas_bd.reset(token)
+            if padre is not None:
+                padre.agregar(bd)
+
+            # El router guarda en el scope la ruta que atendió la petición
+            ruta = getattr(scope.get("route"), "path", SIN_RUTA)
+            self.registro.registrar(scope["method"], ruta, codigo, duracion, bd)
+
+
+# Métricas compartidas por la aplicación
+metricas = Metricas()
@@ -0,0 +1,133 @@
+# Importaciones
+import base64
+import binascii
+import json
+from datetime import datetime
+from typing import Any, Optional, Sequence
+
+from fastapi import HTTPException, status
+from sqlalchemy import DateTime, tuple_
+from sqlalchemy.orm import InstrumentedAttribute
+from sqlmodel.sql.expression import SelectOfScalar
+
+from configuracion import obtener_entero
+
+# Cabecera de respuesta con el cursor de la página siguiente
+CABECERA_CURSOR = "X-Next-Cursor"
+
+# Máximo de registros por página que admiten los listados (limit)
+LIMITE_MAXIMO = obtener_entero("PAGINACION_LIMITE_MAXIMO", 1000)
+
+
+def codificar_cursor(valores: Sequence[Any]) -> str:
+    """
+    Codifica la clave de ordenación del último registro en un cursor opaco.
+
+    Argumentos:
+        valores: Valores de la clave de ordenación del último registro
+
+    Retorna:
+        Cursor en base64 apto para URL
+    """
+    datos = [v.isoformat() if isinstance(v, datetime) else v for v in valores]
+    contenido = json.dumps(datos, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(contenido).decode().rstrip("=")
+
+
+def decodificar_cursor(
+    cursor: str, claves: Sequence[InstrumentedAttribute]
+) -> list[Any]:
+    """
+    Decodifica un cursor generado por codificar_cursor.
+
+    Argumentos:
+        cursor: Cursor opaco recibido del cliente
+        claves: Columnas de la clave de ordenación
+
+    Retorna:
+        Valores de la clave a partir de los cuales continuar
+
+    Excepciones:
+        HTTPException: Si el cursor no es válido
+    """
+    try:
+        relleno = "=" * (-len(cursor) % 4)
+        datos = json.loads(base64.urlsafe_b64decode(cursor + relleno))
+
+        if not isinstance(datos, list) or len(datos) != len(claves):
+            raise ValueError
+
+        valores = []
+        for clave, valor in zip(claves, datos):
+            if not isinstance(valor, str):
+                raise ValueError
+            if isinstance(clave.type, DateTime):
+                valor = datetime.fromisoformat(valor)
+            valores.append(valor)
+
+    except (binascii.Error, ValueError, TypeError):
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST, detail="Cursor inválido"
+        )
+
+    return valores
+
+
+def paginar(
+    statement: SelectOfScalar,
+    claves: Sequence[InstrumentedAttribute],
+    cursor: Optional[str] = None,
+    skip: int = 0,
+    limit: int = 100,
+) -> SelectOfScalar:
+    """
+    Aplica paginación por clave (keyset) a una consulta.
+    Ordena por una clave única y estable; con cursor continúa a partir de
+    ella usando el índice, sin recorrer los registros anteriores.
+    Sin cursor mantiene la paginación por desplazamiento (skip).
+
+    Argumentos:
+        statement: Consulta a paginar
+        claves: Columnas de la clave de ordenación (la última debe ser única)
+        cursor: Cursor de la página anterior (opcional)
+        skip: Número de registros a saltar si no hay cursor
+        limit: Número máximo de registros a devolver
+
+    Retorna:
+        Consulta ordenada y paginada
+    """
+    statement = statement.order_by(*claves)
+
+    if cursor:
+        valores = decodificar_cursor(cursor, claves)
+
+        if len(claves) == 1:
+            statement = statement.where(claves[0] > valores[0])
+        else:
+            statement = statement.where(tuple_(*claves) > tuple_(*valores))
+
+    elif skip:
+        statement = statement.offset(skip)
+
+    return statement.limit(limit)
+
+
+def siguiente_cursor(
+    registros: list, limit: int, claves: Sequence[str] = ("id",)
+) -> Optional[str]:
+    """
+    Calcula el cursor de la página siguiente.
+
+    Argumentos:
+        registros: Registros de la página actual
+        limit: Tamaño de página solicitado
+        claves: Nombres de los atributos de la clave de ordenación
+
+    Retorna:
+        Cursor de la página siguiente o None si es la última
+    """
+    if not registros or len(registros) < limit:
+        return None
+
+    ultimo = registros[-1]
+    return codificar_cursor([getattr(ultimo, clave) for clave in claves])
@@ -0,0 +1,103 @@
+# Importaciones
+import asyncio
+import multiprocessing
+import os
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from fastapi import HTTPException, status
+from fastapi.concurrency import run_in_threadpool
+
+from configuracion import obtener_entero
+
+
+class PoolCifrado:
+    """
+    Pool de procesos acotado para el cifrado Argon2.
+    Argon2 consume CPU y memoria de forma deliberada; ejecutarlo en procesos
+    aparte reparte el trabajo entre núcleos sin bloquear el bucle de eventos
+    ni el pool de hilos del resto de rutas. Si hay demasiadas operaciones en
+    espera responde 503 de inmediato en lugar de acumular latencia.
+
+    Atributos:
+        trabajadores: Número de procesos (0 ejecuta en el pool de hilos)
+        max_pendientes: Operaciones en curso o en cola antes de rechazar
+        pendientes: Operaciones en curso o en cola
+    """
+
+    def __init__(self, trabajadores: int, max_pendientes: int):
+        self.trabajadores = trabajadores
+        self.max_pendientes = max_pendientes
+        self.pendientes = 0
+        self._executor: ProcessPoolExecutor | None = None
+
+    def _obtener_executor(self) -> ProcessPoolExecutor:
+        # Los procesos se crean con spawn: hacer fork de un proceso con hilos
+        # (bucle de eventos, drivers de base de datos) no es seguro.
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(
+                max_workers=self.trabajadores,
+                mp_context=multiprocessing.get_context("spawn"),
+            )
+        return self._executor
+
+    async def ejecutar(self, funcion: Callable[..., Any], *args: Any) -> Any:
+        """
+        Ejecuta una función de cifrado en el pool.
+
+        Argumentos:
+            funcion: Función de nivel de módulo (debe poder serializarse)
+            args: Argumentos de la función
+
+        Retorna:
+            Resultado de la función
+
+        Excepciones:
+            HTTPException: 503 si el pool está saturado
+        """
+        if self.pendientes >= self.max_pendientes:
+            raise HTTPException(
+                status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+                detail="Servicio de cifrado saturado, inténtalo de nuevo",
+                headers={"Retry-After": "1"},
+            )
+
+        self.pendientes += 1
+
+        try:
+            if self.trabajadores == 0:
+                return await run_in_threadpool(funcion, *args)
+
+            bucle = asyncio.get_running_loop()
+            return await bucle.run_in_executor(self._obtener_executor(), funcion, *args)
+
+        finally:
+            self.pendientes -= 1
+
+    def cerrar(self) -> None:
+        """
+        Detiene los procesos del pool. Se vuelven a crear en el siguiente uso.
+        """
+        if self._executor is not None:
+            self._executor.shutdown(wait=True, cancel_futures=True)
+            self._executor = None
+
+
+def crear_pool_cifrado() -> PoolCifrado:
+    """
+    Crea el pool de cifrado a partir de las variables de entorno
+    HASH_POOL_TRABAJADORES (por defecto, un proceso por núcleo) y
+    HASH_POOL_MAX_PENDIENTES (por defecto, 8 operaciones por proceso).
+
+    Retorna:
+        Pool de cifrado
+    """
+    trabajadores = obtener_entero("HASH_POOL_TRABAJADORES", os.cpu_count() or 1)
+    max_pendientes = obtener_entero(
+        "HASH_POOL_MAX_PENDIENTES", max(trabajadores, 1) * 8
+    )
+    return PoolCifrado(trabajadores, max_pendientes)
+
+
+# Pool de cifrado compartido por los servicios
+pool_cifrado = crear_pool_cifrado()
@@ -0,0 +1,60 @@
+# Importaciones
+from typing import Any, Callable, Iterable, Sequence
+
+from fastapi import Response
+
+from configuracion import obtener_booleano
+
+try:
+    import orjson
+except ImportError:  # Dependencia opcional (extra "rapido")
+    orjson = None
+
+# Modo de respuesta rápida de los listados: en lugar de validar los objetos
+# ORM con el response_model y codificarlos con json, las rutas leen tuplas
+# de columnas y las codifican directamente con orjson.
+RESPUESTA_RAPIDA = obtener_booleano("API_RESPUESTA_RAPIDA", False)
+
+if RESPUESTA_RAPIDA and orjson is None:
+    raise RuntimeError("API_RESPUESTA_RAPIDA requiere orjson (pip install .[rapido])")
+
+
+def respuesta_filas(
+    campos: Sequence[str],
+    filas: Iterable[Sequence[Any]],
+    response: Response,
+    conversiones: dict[str, Callable[[Any], Any]] | None = None,
+) -> Response:
+    """
+    Codifica filas de columnas como una lista JSON de objetos con orjson.
+    Las filas deben venir de una consulta con las columnas en el orden de
+    campos (los del response_model de la ruta), por lo que no se validan.
+
+    Argumentos:
+        campos: Nombres de los campos, en el orden de las columnas
+        filas: Filas de la consulta
+        response: Respuesta de la ruta (se copian sus cabeceras)
+        conversiones: Función a aplicar al valor de algunos campos (opcional)
+
+    Retorna:
+        Respuesta JSON
+    """
+    if conversiones:
+        indices = [(campos.index(campo), f) for campo, f in conversiones.items()]
+        filas = [_convertir_fila(fila, indices) for fila in filas]
+
+    contenido = orjson.dumps([dict(zip(campos, fila)) for fila in filas])
+    cabeceras = {
+        cabecera: valor
+        for cabecera, valor in response.headers.items()
+        if cabecera != "content-length"
+    }
+    return Response(content=contenido, media_type="application/json", headers=cabeceras)
+
+
+def _convertir_fila(fila: Sequence[Any], indices: list[tuple[int, Callable]]) -> list:
+    # Copia la fila aplicando las conversiones indicadas por posición
+    fila = list(fila)
+    for indice, funcion in indices:
+        fila[indice] = funcion(fila[indice])
+    return fila
@@ -0,0 +1,185 @@
+# Importaciones
+import threading
+import time
+from typing import Optional
+
+from sqlalchemy import DateTime, literal, update
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from configuracion import obtener_flotante
+from database.zone_horary import madrid_utc
+from models.Usuario import Usuario
+from models.VersionToken import VersionToken
+from services.sentencias import INSERT_ON_CONFLICT
+
+
+class ListaRevocacion:
+    """
+    Copia en memoria de la tabla version_token, recargada periódicamente.
+    Permite validar tokens sin consultar la base de datos en cada petición.
+    Las revocaciones hechas en este proceso se aplican de inmediato; las de
+    otros procesos, en la siguiente recarga.
+
+    Atributos:
+        intervalo: Segundos entre recargas
+        versiones: Versión mínima válida por usuario
+    """
+
+    def __init__(self, intervalo: float):
+        self.intervalo = intervalo
+        self.versiones: dict[str, int] = {}
+        self._ultima_carga = float("-inf")
+        self._lock = threading.Lock()
+
+    def necesita_recarga(self) -> bool:
+        """
+        Indica si ha pasado el intervalo desde la última recarga.
+        """
+        return time.monotonic() - self._ultima_carga >= self.intervalo
+
+    def cargar(self, versiones: dict[str, int]) -> None:
+        """
+        Sustituye las versiones en memoria por las leídas de la base de datos.
+
+        Argumentos:
+            versiones: Versión mínima válida por usuario
+        """
+        with self._lock:
+            self.versiones = versiones
+            self._ultima_carga = time.monotonic()
+
+    def registrar(self, id_usuario: str, version: int) -> None:
+        """
+        Registra en memoria una revocación hecha en este proceso.
+
+        Argumentos:
+            id_usuario: ID del usuario
+            version: Nueva versión mínima válida
+        """
+        with self._lock:
+            self.versiones[id_usuario] = max(version, self.versiones.get(id_usuario, 0))
+
+    def es_valido(self, id_usuario: str, version: int) -> bool:
+        """
+        Comprueba si un token con la versión dada no ha sido revocado.
+
+        Argumentos:
+            id_usuario: ID del usuario
+            version: Versión incluida en el token
+
+        Retorna:
+            True si el token no ha sido revocado
+        """
+        return version >= self.versiones.get(id_usuario, 0)
+
+    def limpiar(self) -> None:
+        """
+        Vacía la lista y fuerza la recarga en la siguiente consulta.
+        """
+        with self._lock:
+            self.versiones = {}
+            self._ultima_carga = float("-inf")
+
+
+# Lista de revocación compartida
+lista_revocacion = ListaRevocacion(obtener_flotante("AUTH_REVOCACION_INTERVALO", 30.0))
+
+
+def obtener_version_token(db: Session, id_usuario: str) -> int:
+    """
+    Obtiene la versión actual de los tokens de un usuario.
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_usuario: ID del usuario
+
+    Retorna:
+        Versión a incluir en los tokens nuevos (0 si nunca se ha revocado)
+    """
+    statement = select(VersionToken.version).where(VersionToken.usuarioId == id_usuario)
+    return db.exec(statement).first() or 0
+
+
+def revocar_tokens(db: Session, id_usuario: str, *condiciones) -> Optional[int]:
+    """
+    Incrementa la versión de los tokens de un usuario, invalidando los ya
+    emitidos, con un único INSERT ... SELECT ... ON CONFLICT DO UPDATE
+    ... RETURNING. Con condiciones sobre la fila del usuario, solo se revoca
+    si las cumple (se evalúan antes de cualquier cambio posterior de la fila).
+    No hace commit: se confirma junto con la operación que la causa, y el
+    llamante registra la nueva versión en lista_revocacion después del commit
+    (si la transacción se deshiciera, los tokens seguirían siendo válidos).
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_usuario: ID del usuario
+        condiciones: Condiciones adicionales sobre el usuario (opcionales)
+
+    Retorna:
+        Nueva versión de los tokens del usuario, o None si no se ha revocado
+    """
+    fecha = madrid_utc()
+    dialecto = db.get_bind().dialect.name
+    filtro = [Usuario.id == id_usuario, *condiciones]
+
+    if dialecto in INSERT_ON_CONFLICT:
+        origen = select(Usuario.id, literal(1), literal(fecha, DateTime)).where(*filtro)
+        statement = INSERT_ON_CONFLICT[dialecto](VersionToken).from_select(
+            ["usuarioId", "version", "fechaActualizacion"], origen
+        )
+        statement = statement.on_conflict_do_update(
+            index_elements=["usuarioId"],
+            set_={
+                "version": VersionToken.version + 1,
+                "fechaActualizacion": statement.excluded.fechaActualizacion,
+            },
+        ).returning(VersionToken.version)
+        version = db.exec(statement).scalar()
+    else:
+        # Otros dialectos: comprobar el usuario, UPDATE y, si no hay fila, INSERT
+        if db.exec(select(Usuario.id).where(*filtro)).first() is None:
+            return None
+
+        resultado = db.exec(
+            update(VersionToken)
+            .where(VersionToken.usuarioId == id_usuario)
+            .values(version=VersionToken.version + 1, fechaActualizacion=fecha)
+        )
+
+        if resultado.rowcount == 0:
+            db.add(VersionToken(usuarioId=id_usuario, version=1))
+            db.flush()
+
+        version = obtener_version_token(db, id_usuario)
+
+    return version
+
+
+def cargar_lista_revocacion(db: Session) -> None:
+    """
+    Recarga la lista de revocación desde la base de datos.
+
+    Argumentos:
+        db: Sesión de base de datos
+    """
+    filas = db.exec(select(VersionToken.usuarioId, VersionToken.version)).all()
+    lista_revocacion.cargar({id_usuario: version for id_usuario, version in filas})
+
+
+# Variantes asíncronas: ejecutan la lógica síncrona sobre la conexión
+# asíncrona de la sesión (AsyncSession.run_sync), sin ocupar hilos del pool.
+
+
+async def obtener_version_token_async(db: AsyncSession, id_usuario: str) -> int:
+    """
+    Variante asíncrona de obtener_version_token.
+    """
+    return await db.run_sync(obtener_version_token, id_usuario)
+
+
+async def cargar_lista_revocacion_async(db: AsyncSession) -> None:
+    """
+    Variante asíncrona de cargar_lista_revocacion.
+    """
+    await db.run_sync(cargar_lista_revocacion)
@@ -0,0 +1,144 @@
+# Importaciones
+from typing import Any, TypeVar
+
+from fastapi import HTTPException, status
+from sqlalchemy import delete, insert, update
+from sqlalchemy.dialects import postgresql, sqlite
+from sqlmodel import Session, SQLModel, select
+
+# Modelo de tabla de las filas escritas
+Modelo = TypeVar("Modelo", bound=SQLModel)
+
+# INSERT con ON CONFLICT de cada dialecto
+INSERT_ON_CONFLICT = {"sqlite": sqlite.insert, "postgresql": postgresql.insert}
+
+
+def admite_returning(db: Session) -> bool:
+    """
+    Comprueba si el motor de la sesión admite RETURNING en INSERT, UPDATE y
+    DELETE (SQLite >= 3.35, PostgreSQL; MySQL no).
+
+    Argumentos:
+        db: Sesión de base de datos
+
+    Retorna:
+        True si las escrituras pueden devolver la fila en la misma sentencia
+    """
+    dialecto = db.get_bind().dialect
+    return (
+        dialecto.insert_returning
+        and dialecto.update_returning
+        and dialecto.delete_returning
+    )
+
+
+def insertar_fila(db: Session, objeto: Modelo) -> Modelo:
+    """
+    Inserta un objeto con INSERT ... RETURNING y devuelve la fila tal y como
+    queda guardada, sin el SELECT de db.refresh. No hace commit.
+    Sin RETURNING, la fila se lee después con un SELECT por clave primaria.
+
+    Argumentos:
+        db: Sesión de base de datos
+        objeto: Objeto del modelo con todos sus valores (los de Python incluidos)
+
+    Retorna:
+        Nuevo objeto del modelo con los valores guardados
+    """
+    modelo = type(objeto)
+    tabla = modelo.__table__
+    statement = insert(tabla).values(objeto.model_dump())
+
+    if admite_returning(db):
+        fila = db.exec(statement.returning(*tabla.c)).one()
+    else:
+        db.exec(statement)
+        fila = db.exec(select(*tabla.c).where(tabla.c.id == objeto.id)).one()
+
+    return modelo.model_validate(fila._mapping)
+
+
+def actualizar_fila(
+    db: Session,
+    modelo: type[Modelo],
+    condiciones: list,
+    valores: dict[str, Any],
+    detalle: str,
+) -> Modelo:
+    """
+    Actualiza la fila que cumple las condiciones con
+    UPDATE ... WHERE ... RETURNING, sin leerla antes ni después. No hace commit.
+    Sin valores que cambiar solo se lee la fila. Sin RETURNING, la clave
+    primaria de la fila se lee antes del UPDATE y la fila se vuelve a leer por
+    ella después (el UPDATE puede cambiar las columnas de las condiciones).
+
+    Argumentos:
+        db: Sesión de base de datos
+        modelo: Modelo de la tabla
+        condiciones: Condiciones del WHERE (la clave primaria, como mínimo)
+        valores: Columnas y nuevos valores
+        detalle: Mensaje del 404
+
+    Retorna:
+        Objeto del modelo con los valores actualizados
+
+    Excepciones:
+        HTTPException: 404 si ninguna fila cumple las condiciones
+    """
+    tabla = modelo.__table__
+    leer = select(*tabla.c).where(*condiciones)
+
+    if not valores:
+        fila = db.exec(leer).first()
+    elif admite_returning(db):
+        statement = update(tabla).where(*condiciones).values(valores)
+        fila = db.exec(statement.returning(*tabla.c)).first()
+    else:
+        fila = None
+        (columna_clave,) = tabla.primary_key.columns
+        clave = db.exec(select(columna_clave).where(*condiciones)).first()
+
+        if clave is not None:
+            db.exec(update(tabla).where(columna_clave == clave).values(valores))
+            fila = db.exec(select(*tabla.c).where(columna_clave == clave)).first()
+
+    if fila is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detalle)
+
+    return modelo.model_validate(fila._mapping)
+
+
+def eliminar_fila(
+    db: Session, modelo: type[Modelo], condiciones: list, detalle: str
+) -> Modelo:
+    """
+    Elimina la fila que cumple las condiciones con DELETE ... RETURNING y la
+    devuelve, sin leerla antes. No hace commit. Sin RETURNING, la fila se lee
+    con un SELECT antes del DELETE.
+
+    Argumentos:
+        db: Sesión de base de datos
+        modelo: Modelo de la tabla
+        condiciones: Condiciones del WHERE (la clave primaria, como mínimo)
+        detalle: Mensaje del 404
+
+    Retorna:
+        Objeto del modelo con los valores de la fila eliminada
+
+    Excepciones:
+        HTTPException: 404 si ninguna fila cumple las condiciones
+    """
+    tabla = modelo.__table__
+    statement = delete(tabla).where(*condiciones)
+
+    if admite_returning(db):
+        fila = db.exec(statement.returning(*tabla.c)).first()
+    else:
+        fila = db.exec(select(*tabla.c).where(*condiciones)).first()
+        if fila is not None:
+            db.exec(statement)
+
+    if fila is None:
+        raise HTTPException(status_code=status.HTTP_404_NOT_FOUND, detail=detalle)
+
+    return modelo.model_validate(fila._mapping)
@@ -1,14 +1,54 @@
 # Importaciones
+import asyncio
+import csv
+import io
+import json
+from functools import cache
+from typing import Optional
+
 from fastapi import HTTPException, status
 from passlib.context import CryptContext
+from pydantic import ValidationError
+from sqlalchemy import Row, insert
 from sqlalchemy.exc import IntegrityError
 from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from models.Usuario import Usuario
-from schemas.usuario import ActualizarUsuario, CrearUsuario
+from schemas.usuario import (
+    ActualizarUsuario,
+    CrearUsuario,
+    RechazoUsuario,
+    RespuestaImportacionUsuarios,
+    RespuestaUsuario,
+    UsuarioPrincipal,
+)
+from services.cache_usuarios import cache_usuarios
+from services.paginacion import paginar
+from services.pool_cifrado import pool_cifrado
+from services.revocacion_service import lista_revocacion, revocar_tokens
+from services.sentencias import actualizar_fila, insertar_fila
+
+# Campos de RespuestaUsuario, en el orden de las columnas de las filas
+CAMPOS_RESPUESTA_USUARIO = tuple(RespuestaUsuario.model_fields)
+
+# Filas por cada INSERT de varias filas de la importación de usuarios
+TAMANO_LOTE_IMPORTACION = 1000
+
+# Contraseñas que se cifran en cada tarea del pool de cifrado
+TAMANO_BLOQUE_CIFRADO = 32
+
+
+@cache
+def obtener_contexto_cifrado() -> CryptContext:
+    """
+    Crea en su primer uso el contexto de cifrado, que carga argon2, para no
+    hacerlo al importar la aplicación.
 
-# Inicialización del contexto de cifrado
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+    Retorna:
+        Contexto de cifrado de contraseñas
+    """
+    return CryptContext(schemes=["argon2"], deprecated="auto")
 
 
 def cifrar_contrasena(password: str) -> str:
@@ -21,7 +61,7 @@ def cifrar_contrasena(password: str) -> str:
     Retorna:
         Contraseña cifrada
     """
-    return pwd_context.hash(password)
+    return obtener_contexto_cifrado().hash(password)
 
 
 def verificar_contrasena(contrasena: str, contrasena_cifrada: str) -> bool:
@@ -35,10 +75,45 @@ def verificar_contrasena(contrasena: str, contrasena_cifrada: str) -> bool:
     Retorna:
         True si la contraseña coincide, False en caso contrario
     """
-    return pwd_context.verify(contrasena, contrasena_cifrada)
+    return obtener_contexto_cifrado().verify(contrasena, contrasena_cifrada)
+
+
+def cifrar_contrasenas(contrasenas: list[str]) -> list[str]:
+    """
+    Cifra varias contraseñas usando Argon2 (una tarea del pool de cifrado).
+
+    Argumentos:
+        contrasenas: Contraseñas a cifrar
+
+    Retorna:
+        Contraseñas cifradas, en el mismo orden
+    """
+    return [cifrar_contrasena(contrasena) for contrasena in contrasenas]
 
 
-def crear_usuario(db: Session, usuario: CrearUsuario) -> Usuario:
+def construir_usuario(usuario: CrearUsuario, contrasena_cifrada: str) -> Usuario:
+    """
+    Construye el modelo de un usuario nuevo con la contraseña ya cifrada.
+
+    Argumentos:
+        usuario: Datos del usuario a crear
+        contrasena_cifrada: Contraseña cifrada
+
+    Retorna:
+        Usuario sin guardar
+    """
+    return Usuario(
+        nombre=usuario.nombre,
+        apellido=usuario.apellido,
+        correoElectronico=usuario.correoElectronico,
+        contrasena=contrasena_cifrada,
+        rol=usuario.rol,
+    )
+
+
+def crear_usuario(
+    db: Session, usuario: CrearUsuario, contrasena_cifrada: Optional[str] = None
+) -> Usuario:
     """
     Crea un nuevo usuario en la base de datos.
     Lanza HTTPException 400 si el correo ya existe.
@@ -46,6 +121,7 @@ def crear_usuario(db: Session, usuario: CrearUsuario) -> Usuario:
     Argumentos:
         db: Sesión de base de datos
         usuario: Datos del usuario a crear
+        contrasena_cifrada: Contraseña ya cifrada (si se omite, se cifra aquí)
 
     Retorna:
         Usuario creado
@@ -54,17 +130,10 @@ def crear_usuario(db: Session, usuario: CrearUsuario) -> Usuario:
         HTTPException: Si el correo ya existe
     """
     try:
-        contrasena_cifrada = cifrar_contrasena(usuario.contrasena)
-        db_usuario = Usuario(
-            nombre=usuario.nombre,
-            apellido=usuario.apellido,
-            correoElectronico=usuario.correoElectronico,
-            contrasena=contrasena_cifrada,
-            rol=usuario.rol,
-        )
-        db.add(db_usuario)
+        if contrasena_cifrada is None:
+            contrasena_cifrada = cifrar_contrasena(usuario.contrasena)
+        db_usuario = insertar_fila(db, construir_usuario(usuario, contrasena_cifrada))
         db.commit()
-        db.refresh(db_usuario)
         return db_usuario
     except IntegrityError:
         db.rollback()
@@ -74,19 +143,189 @@ def crear_usuario(db: Session, usuario: CrearUsuario) -> Usuario:
         )
 
 
-def obtener_usuarios(db: Session, skip: int = 0, limit: int = 100) -> list[Usuario]:
+def leer_usuarios_importacion(
+    contenido: str, formato: str
+) -> tuple[list[tuple[int, CrearUsuario]], list[RechazoUsuario]]:
     """
-    Obtiene una lista de usuarios con paginación.
+    Lee y valida los usuarios de un archivo de importación.
+    El CSV lleva cabecera con los campos de CrearUsuario; el NDJSON, un objeto
+    JSON por línea. Las líneas vacías se ignoran.
+
+    Argumentos:
+        contenido: Texto del archivo
+        formato: "csv" o "ndjson"
+
+    Retorna:
+        Filas válidas (número de línea y datos) y filas rechazadas
+    """
+    validos: list[tuple[int, CrearUsuario]] = []
+    rechazados: list[RechazoUsuario] = []
+
+    if formato == "csv":
+        lector = csv.DictReader(io.StringIO(contenido))
+        filas = ((lector.line_num, fila) for fila in lector)
+    else:
+        filas = (
+            (numero, linea)
+            for numero, linea in enumerate(contenido.splitlines(), start=1)
+            if linea.strip()
+        )
+
+    for numero, fila in filas:
+        datos = fila
+
+        try:
+            if formato == "ndjson":
+                datos = json.loads(fila)
+            validos.append((numero, CrearUsuario.model_validate(datos)))
+
+        except (ValueError, ValidationError) as error:
+            campos = []
+            if isinstance(error, ValidationError):
+                campos = [str(e["loc"][0]) for e in error.errors() if e["loc"]]
+            correo = datos.get("correoElectronico") if isinstance(datos, dict) else None
+            rechazados.append(
+                RechazoUsuario(
+                    fila=numero,
+                    correoElectronico=correo,
+                    motivo="Fila inválida"
+                    + (f": {', '.join(campos)}" if campos else ""),
+                )
+            )
+
+    return validos, rechazados
+
+
+def preparar_importacion_usuarios(
+    db: Session, contenido: str, formato: str
+) -> tuple[list[CrearUsuario], list[RechazoUsuario]]:
+    """
+    Valida un archivo de importación y descarta los correos electrónicos
+    repetidos en el archivo o ya registrados (consultados por bloques con IN).
 
     Argumentos:
         db: Sesión de base de datos
-        skip: Número de registros a saltar
+        contenido: Texto del archivo
+        formato: "csv" o "ndjson"
+
+    Retorna:
+        Usuarios a crear y filas rechazadas
+    """
+    validos, rechazados = leer_usuarios_importacion(contenido, formato)
+
+    correos = list({usuario.correoElectronico for _, usuario in validos})
+    registrados: set[str] = set()
+
+    for inicio in range(0, len(correos), TAMANO_LOTE_IMPORTACION):
+        bloque = correos[inicio : inicio + TAMANO_LOTE_IMPORTACION]
+        statement = select(Usuario.correoElectronico).where(
+            Usuario.correoElectronico.in_(bloque)
+        )
+        registrados.update(db.exec(statement).all())
+
+    usuarios: list[CrearUsuario] = []
+    vistos: set[str] = set()
+
+    for numero, usuario in validos:
+        correo = usuario.correoElectronico
+
+        if correo in registrados:
+            motivo = "El correo electrónico ya está registrado"
+        elif correo in vistos:
+            motivo = "Correo electrónico duplicado en el archivo"
+        else:
+            vistos.add(correo)
+            usuarios.append(usuario)
+            continue
+
+        rechazados.append(
+            RechazoUsuario(fila=numero, correoElectronico=correo, motivo=motivo)
+        )
+
+    rechazados.sort(key=lambda rechazo: rechazo.fila)
+    return usuarios, rechazados
+
+
+def crear_usuarios_lote(
+    db: Session, usuarios: list[CrearUsuario], contrasenas_cifradas: list[str]
+) -> int:
+    """
+    Crea varios usuarios en una sola transacción con INSERT de varias filas
+    (executemany) por lotes de TAMANO_LOTE_IMPORTACION.
+    Lanza HTTPException 400 si algún correo ya existe (otra petición lo ha
+    registrado mientras tanto); en ese caso no se crea ninguno.
+
+    Argumentos:
+        db: Sesión de base de datos
+        usuarios: Datos de los usuarios a crear
+        contrasenas_cifradas: Contraseñas cifradas, en el mismo orden
+
+    Retorna:
+        Número de usuarios creados
+
+    Excepciones:
+        HTTPException: Si algún correo ya existe
+    """
+    filas = [
+        construir_usuario(usuario, contrasena).model_dump()
+        for usuario, contrasena in zip(usuarios, contrasenas_cifradas)
+    ]
+
+    try:
+        for inicio in range(0, len(filas), TAMANO_LOTE_IMPORTACION):
+            db.exec(
+                insert(Usuario),
+                params=filas[inicio : inicio + TAMANO_LOTE_IMPORTACION],
+            )
+        db.commit()
+
+    except IntegrityError:
+        db.rollback()
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="El correo electrónico ya está registrado",
+        )
+
+    return len(filas)
+
+
+def obtener_usuarios(
+    db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> list[Usuario]:
+    """
+    Obtiene una lista de usuarios ordenada por ID con paginación.
+
+    Argumentos:
+        db: Sesión de base de datos
+        skip: Número de registros a saltar (si no hay cursor)
         limit: Número máximo de registros a devolver
+        cursor: Cursor de la página anterior (opcional)
 
     Retorna:
         Lista de usuarios
     """
-    statement = select(Usuario).offset(skip).limit(limit)
+    statement = paginar(select(Usuario), [Usuario.id], cursor, skip, limit)
+    return db.exec(statement).all()
+
+
+def obtener_usuarios_filas(
+    db: Session, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> list[Row]:
+    """
+    Obtiene la misma página que obtener_usuarios como tuplas con las columnas
+    de CAMPOS_RESPUESTA_USUARIO, sin crear objetos ORM (respuesta rápida).
+
+    Argumentos:
+        db: Sesión de base de datos
+        skip: Número de registros a saltar (si no hay cursor)
+        limit: Número máximo de registros a devolver
+        cursor: Cursor de la página anterior (opcional)
+
+    Retorna:
+        Lista de filas
+    """
+    columnas = [getattr(Usuario, campo) for campo in CAMPOS_RESPUESTA_USUARIO]
+    statement = paginar(select(*columnas), [Usuario.id], cursor, skip, limit)
     return db.exec(statement).all()
 
 
@@ -105,6 +344,29 @@ def obtener_usuario_id(db: Session, id_usuario: str) -> Usuario | None:
     return db.exec(statement).first()
 
 
+def obtener_principal_usuario(db: Session, id_usuario: str) -> UsuarioPrincipal | None:
+    """
+    Obtiene solo los datos necesarios para autorizar a un usuario activo,
+    sin cargar el resto de columnas (como el hash de la contraseña).
+
+    Argumentos:
+        db: Sesión de base de datos
+        id_usuario: ID del usuario
+
+    Retorna:
+        Usuario autenticado o None si no existe o no está activo
+    """
+    statement = select(Usuario.id, Usuario.rol, Usuario.activo).where(
+        Usuario.id == id_usuario, Usuario.activo
+    )
+    fila = db.exec(statement).first()
+
+    if not fila:
+        return None
+
+    return UsuarioPrincipal(id=fila.id, rol=fila.rol, activo=fila.activo)
+
+
 def obtener_usuario_correo_electronico(
     db: Session, correo_electronico: str
 ) -> Usuario | None:
@@ -125,16 +387,24 @@ def obtener_usuario_correo_electronico(
 
 
 def actualizar_usuario_id(
-    db: Session, id_usuario: str, actualizar_usuario: ActualizarUsuario
+    db: Session,
+    id_usuario: str,
+    actualizar_usuario: ActualizarUsuario,
+    contrasena_cifrada: Optional[str] = None,
 ) -> Usuario:
     """
-    Actualiza un usuario existente.
+    Actualiza un usuario existente e invalida su entrada en la caché.
+    Si cambia el rol, revoca los tokens emitidos.
+    El usuario se escribe con una sola sentencia UPDATE ... RETURNING. Si se
+    indica el rol, antes se revocan los tokens con una sola sentencia sobre
+    version_token que solo los revoca si el rol guardado es distinto.
     Lanza HTTPException 404 si el usuario no existe.
 
     Argumentos:
         db: Sesión de base de datos
         id_usuario: ID del usuario
         actualizar_usuario: Datos del usuario a actualizar
+        contrasena_cifrada: Nueva contraseña ya cifrada (si se omite, se cifra aquí)
 
     Retorna:
         Usuario actualizado
@@ -142,29 +412,41 @@ def actualizar_usuario_id(
     Excepciones:
         HTTPException: Si el usuario no existe
     """
-    db_usuario = obtener_usuario_id(db, id_usuario)
-    if not db_usuario:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
-        )
+    condiciones = [Usuario.id == id_usuario, Usuario.activo]
+    valores = {}
 
     if actualizar_usuario.nombre:
-        db_usuario.nombre = actualizar_usuario.nombre
+        valores["nombre"] = actualizar_usuario.nombre
     if actualizar_usuario.apellido:
-        db_usuario.apellido = actualizar_usuario.apellido
-    if actualizar_usuario.contrasena:
-        db_usuario.contrasena = cifrar_contrasena(actualizar_usuario.contrasena)
+        valores["apellido"] = actualizar_usuario.apellido
+    if contrasena_cifrada:
+        valores["contrasena"] = contrasena_cifrada
+    elif actualizar_usuario.contrasena:
+        valores["contrasena"] = cifrar_contrasena(actualizar_usuario.contrasena)
+
+    version = None
     if actualizar_usuario.rol:
-        db_usuario.rol = actualizar_usuario.rol
+        # Los tokens emitidos llevan el rol anterior
+        version = revocar_tokens(
+            db, id_usuario, Usuario.activo, Usuario.rol != actualizar_usuario.rol
+        )
+        valores["rol"] = actualizar_usuario.rol
 
+    db_usuario = actualizar_fila(
+        db, Usuario, condiciones, valores, "Usuario no encontrado"
+    )
     db.commit()
-    db.refresh(db_usuario)
+    cache_usuarios.invalidar(id_usuario)
+    if version is not None:
+        lista_revocacion.registrar(id_usuario, version)
     return db_usuario
 
 
 def desactivar_usuario(db: Session, id_usuario: str) -> Usuario:
     """
-    Desactiva (borrado lógico) un usuario.
+    Desactiva (borrado lógico) un usuario con una sola sentencia
+    UPDATE ... RETURNING, invalida su entrada en la caché y revoca los tokens
+    emitidos.
     Lanza HTTPException 404 si el usuario no existe.
 
     Argumentos:
@@ -177,15 +459,156 @@ def desactivar_usuario(db: Session, id_usuario: str) -> Usuario:
     Excepciones:
         HTTPException: Si el usuario no existe
     """
-    db_usuario = obtener_usuario_id(db, id_usuario)
-    if not db_usuario:
-        raise HTTPException(
-            status_code=status.HTTP_404_NOT_FOUND, detail="Usuario no encontrado"
-        )
-
-    db_usuario.activo = False
-    db.add(db_usuario)
+    db_usuario = actualizar_fila(
+        db,
+        Usuario,
+        [Usuario.id == id_usuario, Usuario.activo],
+        {"activo": False},
+        "Usuario no encontrado",
+    )
+    version = revocar_tokens(db, id_usuario)
     db.commit()
-    db.refresh(db_usuario)
+    cache_usuarios.invalidar(id_usuario)
+    lista_revocacion.registrar(id_usuario, version)
 
     return db_usuario
+
+
+# Variantes asíncronas: ejecutan la lógica síncrona sobre la conexión
+# asíncrona de la sesión (AsyncSession.run_sync), sin ocupar hilos del pool.
+# El cifrado Argon2 se hace en el pool de procesos de cifrado.
+
+
+async def cifrar_contrasena_async(password: str) -> str:
+    """
+    Variante asíncrona de cifrar_contrasena, ejecutada en el pool de cifrado.
+    Lanza HTTPException 503 si el pool está saturado.
+    """
+    return await pool_cifrado.ejecutar(cifrar_contrasena, password)
+
+
+async def verificar_contrasena_async(contrasena: str, contrasena_cifrada: str) -> bool:
+    """
+    Variante asíncrona de verificar_contrasena, ejecutada en el pool de cifrado.
+    Lanza HTTPException 503 si el pool está saturado.
+    """
+    return await pool_cifrado.ejecutar(
+        verificar_contrasena, contrasena, contrasena_cifrada
+    )
+
+
+async def cifrar_contrasenas_async(contrasenas: list[str]) -> list[str]:
+    """
+    Cifra varias contraseñas en paralelo en el pool de cifrado.
+    Las envía en bloques de TAMANO_BLOQUE_CIFRADO con tantos bloques en curso
+    como procesos tiene el pool, de modo que una importación grande usa todos
+    los núcleos sin llenar la cola del pool ni bloquear los inicios de sesión.
+    """
+    en_curso = asyncio.Semaphore(max(pool_cifrado.trabajadores, 1))
+
+    async def cifrar_bloque(bloque: list[str]) -> list[str]:
+        async with en_curso:
+            return await pool_cifrado.ejecutar(cifrar_contrasenas, bloque)
+
+    bloques = await asyncio.gather(
+        *(
+            cifrar_bloque(contrasenas[inicio : inicio + TAMANO_BLOQUE_CIFRADO])
+            for inicio in range(0, len(contrasenas), TAMANO_BLOQUE_CIFRADO)
+        )
+    )
+    return [cifrada for bloque in bloques for cifrada in bloque]
+
+
+async def importar_usuarios_async(
+    db: AsyncSession, contenido: str, formato: str
+) -> RespuestaImportacionUsuarios:
+    """
+    Importa usuarios desde un archivo CSV o NDJSON: valida las filas, descarta
+    los correos duplicados, cifra las contraseñas en paralelo en el pool de
+    cifrado e inserta los usuarios por lotes en una sola transacción.
+    Lanza HTTPException 503 si el pool de cifrado está saturado.
+    """
+    usuarios, rechazados = await db.run_sync(
+        preparar_importacion_usuarios, contenido, formato
+    )
+    contrasenas_cifradas = await cifrar_contrasenas_async(
+        [usuario.contrasena for usuario in usuarios]
+    )
+    creados = await db.run_sync(crear_usuarios_lote, usuarios, contrasenas_cifradas)
+    return RespuestaImportacionUsuarios(creados=creados, rechazados=rechazados)
+
+
+async def crear_usuario_async(db: AsyncSession, usuario: CrearUsuario) -> Usuario:
+    """
+    Variante asíncrona de crear_usuario.
+    """
+    contrasena_cifrada = await cifrar_contrasena_async(usuario.contrasena)
+    return await db.run_sync(crear_usuario, usuario, contrasena_cifrada)
+
+
+async def obtener_usuarios_async(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> list[Usuario]:
+    """
+    Variante asíncrona de obtener_usuarios.
+    """
+    return await db.run_sync(obtener_usuarios, skip, limit, cursor)
+
+
+async def obtener_usuarios_filas_async(
+    db: AsyncSession, skip: int = 0, limit: int = 100, cursor: Optional[str] = None
+) -> list[Row]:
+    """
+    Variante asíncrona de obtener_usuarios_filas.
+    """
+    return await db.run_sync(obtener_usuarios_filas, skip, limit, cursor)
+
+
+async def obtener_usuario_id_async(db: AsyncSession, id_usuario: str) -> Usuario | None:
+    """
+    Variante asíncrona de obtener_usuario_id.
+    """
+    return await db.run_sync(obtener_usuario_id, id_usuario)
+
+
+async def obtener_principal_usuario_async(
+    db: AsyncSession, id_usuario: str
+) -> UsuarioPrincipal | None:
+    """
+    Variante asíncrona de obtener_principal_usuario.
+    """
+    return await db.run_sync(obtener_principal_usuario, id_usuario)
+
+
+async def obtener_usuario_correo_electronico_async(
+    db: AsyncSession, correo_electronico: str
+) -> Usuario | None:
+    """
+    Variante asíncrona de obtener_usuario_correo_electronico.
+    """
+    return await db.run_sync(obtener_usuario_correo_electronico, correo_electronico)
+
+
+async def actualizar_usuario_id_async(
+    db: AsyncSession, id_usuario: str, actualizar_usuario: ActualizarUsuario
+) -> Usuario:
+    """
+    Variante asíncrona de actualizar_usuario_id.
+    """
+    contrasena_cifrada = None
+
+    if actualizar_usuario.contrasena:
+        contrasena_cifrada = await cifrar_contrasena_async(
+            actualizar_usuario.contrasena
+        )
+
+    return await db.run_sync(
+        actualizar_usuario_id, id_usuario, actualizar_usuario, contrasena_cifrada
+    )
+
+
+async def desactivar_usuario_async(db: AsyncSession, id_usuario: str) -> Usuario:
+    """
+    Variante asíncrona de desactivar_usuario.
+    """
+    return await db.run_sync(desactivar_usuario, id_usuario)
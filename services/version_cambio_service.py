@@ -0,0 +1,196 @@
+# Importaciones
+import random
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+from typing import Iterable, Optional
+
+from fastapi import Request, Response, status
+from sqlalchemy import func, update
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+
+from database.zone_horary import madrid_utc
+from models.VersionCambio import VersionCambio
+from services.sentencias import INSERT_ON_CONFLICT
+
+# Ámbitos de versión
+AMBITO_CLASES = "clases"
+AMBITO_ASISTENCIAS = "asistencias"
+
+# Ámbitos globales, que cambian con cualquier escritura de su tabla. Su
+# versión se reparte en FRAGMENTOS_VERSION filas ("clases#0", "clases#1"...):
+# cada escritura incrementa una al azar y la versión es la suma de todas, de
+# modo que las escrituras concurrentes no se esperan en una única fila.
+AMBITOS_FRAGMENTADOS = {AMBITO_CLASES, AMBITO_ASISTENCIAS}
+FRAGMENTOS_VERSION = 16
+
+
+def ambito_asistencias_clase(id_clase: str) -> str:
+    """
+    Obtiene el ámbito de versión de las asistencias de una clase.
+    """
+    return f"{AMBITO_ASISTENCIAS}:{id_clase}"
+
+
+def fragmentos_ambito(ambito: str) -> list[str]:
+    """
+    Obtiene las filas de versión de un ámbito (una sola si no está
+    fragmentado). Los ámbitos fragmentados incluyen la fila sin fragmentar de
+    versiones anteriores, para que su versión siga creciendo y no repita
+    ETags ya enviados.
+    """
+    if ambito not in AMBITOS_FRAGMENTADOS:
+        return [ambito]
+    return [ambito] + [f"{ambito}#{n}" for n in range(FRAGMENTOS_VERSION)]
+
+
+def incrementar_version(db: Session, ambitos: Iterable[str]) -> None:
+    """
+    Incrementa la versión de cada ámbito con un único
+    INSERT ... ON CONFLICT DO UPDATE, que crea la fila si no existe sin
+    conflictos entre escrituras concurrentes. No hace commit: se confirma junto
+    con la escritura que la causa, de modo que la versión nunca avanza sin el
+    cambio ni el cambio sin la versión.
+
+    Argumentos:
+        db: Sesión de base de datos
+        ambitos: Ámbitos afectados por la escritura
+    """
+    filas = sorted(
+        (
+            f"{ambito}#{random.randrange(FRAGMENTOS_VERSION)}"
+            if ambito in AMBITOS_FRAGMENTADOS
+            else ambito
+        )
+        for ambito in set(ambitos)
+    )
+    fecha = madrid_utc()
+    dialecto = db.get_bind().dialect.name
+
+    if dialecto in INSERT_ON_CONFLICT:
+        statement = INSERT_ON_CONFLICT[dialecto](VersionCambio).values(
+            [
+                {"ambito": fila, "version": 1, "fechaActualizacion": fecha}
+                for fila in filas
+            ]
+        )
+        db.exec(
+            statement.on_conflict_do_update(
+                index_elements=["ambito"],
+                set_={
+                    "version": VersionCambio.version + 1,
+                    "fechaActualizacion": statement.excluded.fechaActualizacion,
+                },
+            )
+        )
+        return
+
+    # Otros dialectos: UPDATE y, si la fila no existe, INSERT
+    for fila in filas:
+        resultado = db.exec(
+            update(VersionCambio)
+            .where(VersionCambio.ambito == fila)
+            .values(version=VersionCambio.version + 1, fechaActualizacion=fecha)
+        )
+
+        if resultado.rowcount == 0:
+            db.add(VersionCambio(ambito=fila, version=1, fechaActualizacion=fecha))
+            db.flush()
+
+
+def obtener_version(db: Session, ambito: str) -> tuple[int, Optional[datetime]]:
+    """
+    Obtiene la versión de un ámbito con una consulta por clave primaria (la
+    suma de sus fragmentos en los ámbitos globales).
+
+    Argumentos:
+        db: Sesión de base de datos
+        ambito: Ámbito de versión
+
+    Retorna:
+        Versión y fecha del último cambio (0 y None si nunca ha cambiado)
+    """
+    statement = select(
+        func.sum(VersionCambio.version), func.max(VersionCambio.fechaActualizacion)
+    ).where(VersionCambio.ambito.in_(fragmentos_ambito(ambito)))
+    version, fecha = db.exec(statement).one()
+    return (version or 0, fecha)
+
+
+def respuesta_no_modificada(
+    request: Request,
+    response: Response,
+    ambito: str,
+    version: int,
+    fecha: Optional[datetime],
+) -> Optional[Response]:
+    """
+    Añade las cabeceras ETag y Last-Modified a la respuesta y comprueba las
+    cabeceras condicionales de la petición (If-None-Match tiene prioridad
+    sobre If-Modified-Since).
+
+    Argumentos:
+        request: Petición
+        response: Respuesta de la ruta
+        ambito: Ámbito de versión
+        version: Versión actual del ámbito
+        fecha: Fecha del último cambio (UTC)
+
+    Retorna:
+        Respuesta 304 si el cliente tiene la versión actual, None si no
+    """
+    etag = f'"{ambito}-{version}"'
+    cabeceras = {"ETag": etag}
+
+    if fecha:
+        cabeceras["Last-Modified"] = format_datetime(
+            fecha.replace(tzinfo=timezone.utc), usegmt=True
+        )
+
+    response.headers.update(cabeceras)
+
+    if_none_match = request.headers.get("if-none-match")
+
+    if if_none_match is not None:
+        etiquetas = {etiqueta.strip() for etiqueta in if_none_match.split(",")}
+        no_modificado = (
+            "*" in etiquetas or etag in etiquetas or f"W/{etag}" in etiquetas
+        )
+    elif fecha and (if_modified_since := request.headers.get("if-modified-since")):
+        try:
+            desde = parsedate_to_datetime(if_modified_since)
+        except (TypeError, ValueError):
+            return None
+        # Last-Modified tiene precisión de segundos
+        no_modificado = fecha.replace(tzinfo=timezone.utc, microsecond=0) <= desde
+    else:
+        no_modificado = False
+
+    if no_modificado:
+        return Response(status_code=status.HTTP_304_NOT_MODIFIED, headers=cabeceras)
+
+    return None
+
+
+# Variantes asíncronas: ejecutan la lógica síncrona sobre la conexión
+# asíncrona de la sesión (AsyncSession.run_sync), sin ocupar hilos del pool.
+
+
+async def obtener_version_async(
+    db: AsyncSession, ambito: str
+) -> tuple[int, Optional[datetime]]:
+    """
+    Variante asíncrona de obtener_version.
+    """
+    return await db.run_sync(obtener_version, ambito)
+
+
+async def comprobar_version_async(
+    db: AsyncSession, request: Request, response: Response, ambito: str
+) -> Optional[Response]:
+    """
+    Lee la versión del ámbito y aplica respuesta_no_modificada. Permite a las
+    rutas de lectura responder 304 sin ejecutar su consulta principal.
+    """
+    version, fecha = await obtener_version_async(db, ambito)
+    return respuesta_no_modificada(request, response, ambito, version, fecha)
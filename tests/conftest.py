@@ -1,34 +1,68 @@
 # Importaciones
+import os
+import tempfile
 import uuid
+from contextlib import contextmanager
 from datetime import date, time
 
 import pytest
 from fastapi.testclient import TestClient
-from sqlalchemy.pool import StaticPool
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 from sqlmodel import Session, SQLModel, create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
 
-from database.connection import obtener_db
+from database.connection import obtener_db, obtener_db_async, obtener_db_lectura
 from main import app
 from models.Usuario import RolUsuario, Usuario
 from schemas.clase import CrearClase
+from services.cache_usuarios import cache_usuarios
 from services.clase_service import crear_clase_service
+from services.metricas import (
+    UMBRAL_N_MAS_1,
+    contar_consultas,
+    instrumentar_engine,
+    metricas,
+)
+from services.revocacion_service import lista_revocacion
+
+# Base de datos de pruebas en un fichero temporal, compartido por el motor
+# síncrono (fixtures) y el asíncrono (rutas)
+RUTA_DATABASE_TEST = os.path.join(tempfile.mkdtemp(), "test.db")
 
 # URL conexión de la base de datos de pruebas
-TEST_DATABASE_URL = "sqlite:///:memory:"
+TEST_DATABASE_URL = f"sqlite:///{RUTA_DATABASE_TEST}"
 
 # Crear la base de datos de pruebas
 engine_test = create_engine(
     TEST_DATABASE_URL,
     connect_args={"check_same_thread": False},
-    poolclass=StaticPool,
 )
 
+# Motor asíncrono de pruebas. NullPool evita reutilizar conexiones entre los
+# bucles de eventos de cada TestClient.
+engine_test_async = create_async_engine(
+    f"sqlite+aiosqlite:///{RUTA_DATABASE_TEST}", poolclass=NullPool
+)
+
+# Las sentencias de las rutas cuentan en las métricas de cada petición
+instrumentar_engine(engine_test_async.sync_engine)
+
+
+async def obtener_db_async_test():
+    # Sesión asíncrona sobre la base de datos de pruebas
+    async with AsyncSession(engine_test_async, expire_on_commit=False) as session:
+        yield session
+
 
 @pytest.fixture(autouse=True, scope="function")
 def reset_db():
     # Reinicia la base de datos antes de cada test
     SQLModel.metadata.drop_all(bind=engine_test)
     SQLModel.metadata.create_all(bind=engine_test)
+    cache_usuarios.limpiar()
+    lista_revocacion.limpiar()
+    metricas.limpiar()
     yield
 
 
@@ -41,10 +75,18 @@ def db():
         session.rollback()
 
 
+@pytest.fixture(scope="function")
+def engine_async():
+    # Devuelve el motor asíncrono de pruebas
+    return engine_test_async
+
+
 @pytest.fixture(autouse=True)
 def override_db_dependency(db):
     # Sobrescribe la dependencia de DB de FastAPI para usar la de test
     app.dependency_overrides[obtener_db] = lambda: db
+    app.dependency_overrides[obtener_db_async] = obtener_db_async_test
+    app.dependency_overrides[obtener_db_lectura] = obtener_db_async_test
     yield
     app.dependency_overrides = {}
 
@@ -56,6 +98,24 @@ def client():
         yield c
 
 
+@pytest.fixture(scope="function")
+def assert_max_consultas():
+    # Comprueba que las peticiones del bloque ejecutan como máximo `n`
+    # sentencias y que ninguna se repite como en un N+1
+    @contextmanager
+    def comprobar(n: int):
+        with contar_consultas() as bd:
+            yield bd
+
+        detalle = "\n".join(
+            f"  {veces}x {sentencia}" for sentencia, veces in bd.sentencias.items()
+        )
+        assert bd.consultas <= n, f"{bd.consultas} sentencias (máximo {n}):\n{detalle}"
+        assert not bd.repetidas(UMBRAL_N_MAS_1), f"Posible N+1:\n{detalle}"
+
+    return comprobar
+
+
 @pytest.fixture(scope="function")
 def profesor_test(db):
     # Crear un profesor de prueba
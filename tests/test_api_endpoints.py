@@ -1,8 +1,31 @@
+import asyncio
+import json
+import re
+import sqlite3
+
+import jwt
+import pytest
+from fastapi import HTTPException, Request
 from fastapi.testclient import TestClient
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlalchemy.pool import NullPool
 
+import api.metricas
+import api.usuario
 from api.usuario import obtener_usuario_actual
+from database.connection import (
+    COOKIE_ESCRITURA,
+    enrutador_lectura,
+    obtener_db_lectura,
+)
 from main import app
+from models.Usuario import RolUsuario, Usuario
 from schemas.asistencia import EstadoAsistencia
+from schemas.usuario import UsuarioPrincipal
+from services import respuesta_rapida
+from services.cache_usuarios import cache_usuarios
+from services.metricas import contar_consultas
+from services.revocacion_service import lista_revocacion, obtener_version_token
 
 
 def test_obtener_clase_por_id(client: TestClient, clase_test):
@@ -115,3 +138,826 @@ def test_lista_asistencias_filtros(client: TestClient, clase_test, estudiante_te
     assert response.status_code == 200
     assert len(response.json()) >= 1
     assert response.json()[0]["usuarioId"] == estudiante_test.id
+    # Filtrar por estado, profesor de la clase y rango de fechas
+    response = client.get(
+        "/asistencias/",
+        params={"estado": "presente", "profesorId": clase_test.profesorId},
+    )
+    assert len(response.json()) == 1
+    response = client.get("/asistencias/", params={"estado": "ausente"})
+    assert response.json() == []
+    response = client.get("/asistencias/", params={"hasta": "2000-01-01T00:00:00"})
+    assert response.json() == []
+    # Filtrar clases por profesor y rango de días
+    response = client.get(
+        "/clases/",
+        params={
+            "profesorId": clase_test.profesorId,
+            "desde": clase_test.fecha.date().isoformat(),
+            "hasta": clase_test.fecha.date().isoformat(),
+        },
+    )
+    assert [c["id"] for c in response.json()] == [clase_test.id]
+    response = client.get("/clases/", params={"desde": "2100-01-01"})
+    assert response.json() == []
+
+
+def test_crear_asistencias_lote(
+    client: TestClient, clase_test, estudiante_test, profesor_test
+):
+    app.dependency_overrides[obtener_usuario_actual] = lambda: profesor_test
+    payload = {
+        "asistencias": [
+            {"usuarioId": estudiante_test.id, "estado": EstadoAsistencia.presente},
+            {"usuarioId": "id-inexistente", "estado": EstadoAsistencia.ausente},
+        ]
+    }
+    response = client.post(f"/clases/{clase_test.id}/asistencias/lote", json=payload)
+    del app.dependency_overrides[obtener_usuario_actual]
+    assert response.status_code == 200
+    data = response.json()
+    assert len(data["creadas"]) == 1
+    assert data["creadas"][0]["usuarioId"] == estudiante_test.id
+    assert data["creadas"][0]["claseId"] == clase_test.id
+    assert data["rechazadas"] == [
+        {"usuarioId": "id-inexistente", "motivo": "Usuario no encontrado"}
+    ]
+    # Verificar que la asistencia creada se puede consultar
+    response = client.get(f"/asistencias/{data['creadas'][0]['id']}")
+    assert response.status_code == 200
+
+
+def test_marcar_asistencia_idempotente(
+    client: TestClient, assert_max_consultas, clase_test, estudiante_test, profesor_test
+):
+    app.dependency_overrides[obtener_usuario_actual] = lambda: profesor_test
+    ruta = f"/clases/{clase_test.id}/asistencias/{estudiante_test.id}"
+
+    response = client.put(ruta, json={"estado": "ausente"})
+    assert response.status_code == 200
+    creada = response.json()
+
+    # Reenviar el pase de lista o cambiar el estado no crea otra asistencia:
+    # una sentencia para la asistencia y una por cada ámbito de versión
+    for estado in ("ausente", "retraso"):
+        with assert_max_consultas(3):
+            response = client.put(ruta, json={"estado": estado})
+        assert response.status_code == 200
+        assert response.json() == {**creada, "estado": estado}
+
+    response = client.put(
+        f"/clases/{clase_test.id}/asistencias/id-inexistente",
+        json={"estado": "presente"},
+    )
+    del app.dependency_overrides[obtener_usuario_actual]
+    assert response.status_code == 404
+
+    response = client.get("/asistencias/", params={"claseId": clase_test.id})
+    assert [a["id"] for a in response.json()] == [creada["id"]]
+
+
+def test_lista_asistencias_cursor(client: TestClient, clase_test, db):
+    # Crear varios estudiantes con una asistencia cada uno
+    for i in range(3):
+        estudiante = Usuario(
+            nombre="Test",
+            apellido=f"Estudiante {i}",
+            correoElectronico=f"estudiante_cursor_{i}@test.com",
+            contrasena="hashed_password",
+            rol=RolUsuario.estudiante,
+        )
+        db.add(estudiante)
+        db.commit()
+        payload = {
+            "usuarioId": estudiante.id,
+            "claseId": clase_test.id,
+            "estado": EstadoAsistencia.presente,
+        }
+        client.post("/asistencias/", json=payload)
+    # Recorrer las páginas siguiendo el cursor
+    response = client.get(f"/asistencias/?claseId={clase_test.id}&limit=2")
+    assert response.status_code == 200
+    assert len(response.json()) == 2
+    cursor = response.headers["X-Next-Cursor"]
+    response = client.get(
+        f"/asistencias/?claseId={clase_test.id}&limit=2&cursor={cursor}"
+    )
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert "X-Next-Cursor" not in response.headers
+
+
+def test_inicio_sesion_y_me(client: TestClient):
+    payload = {
+        "nombre": "Ana",
+        "apellido": "García",
+        "correoElectronico": "ana@test.com",
+        "contrasena": "password123",
+        "rol": "estudiante",
+    }
+    response = client.post("/usuarios/", json=payload)
+    assert response.status_code == 200
+    # Contraseña incorrecta
+    response = client.post(
+        "/usuarios/inicio_sesion",
+        data={"username": "ana@test.com", "password": "incorrecta"},
+    )
+    assert response.status_code == 400
+    # Iniciar sesión y consultar el usuario actual con el token
+    response = client.post(
+        "/usuarios/inicio_sesion",
+        data={"username": "ana@test.com", "password": "password123"},
+    )
+    assert response.status_code == 200
+    token = response.json()["access_token"]
+    response = client.get("/usuarios/me", headers={"Authorization": f"Bearer {token}"})
+    assert response.status_code == 200
+    assert response.json()["correoElectronico"] == "ana@test.com"
+
+
+def test_cache_usuario_actual_se_invalida_al_desactivar(client: TestClient):
+    payload = {
+        "nombre": "Luis",
+        "apellido": "Martín",
+        "correoElectronico": "luis@test.com",
+        "contrasena": "password123",
+        "rol": "estudiante",
+    }
+    id_usuario = client.post("/usuarios/", json=payload).json()["id"]
+    response = client.post(
+        "/usuarios/inicio_sesion",
+        data={"username": "luis@test.com", "password": "password123"},
+    )
+    cabeceras = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # La segunda petición se resuelve desde la caché
+    assert client.get("/usuarios/me", headers=cabeceras).status_code == 200
+    assert client.get("/usuarios/me", headers=cabeceras).status_code == 200
+    assert cache_usuarios.estadisticas()["aciertos"] == 1
+    # Al desactivar el usuario, el token deja de ser válido de inmediato
+    client.delete(f"/usuarios/{id_usuario}")
+    assert client.get("/usuarios/me", headers=cabeceras).status_code == 401
+
+
+def test_autorizacion_sin_estado_y_revocacion(client: TestClient, monkeypatch):
+    monkeypatch.setattr(api.usuario, "MODO_AUTENTICACION", "sin_estado")
+    payload = {
+        "nombre": "Admin",
+        "apellido": "Test",
+        "correoElectronico": "admin@test.com",
+        "contrasena": "password123",
+        "rol": "admin",
+    }
+    id_admin = client.post("/usuarios/", json=payload).json()["id"]
+    response = client.post(
+        "/usuarios/inicio_sesion",
+        data={"username": "admin@test.com", "password": "password123"},
+    )
+    token = response.json()["access_token"]
+    datos = jwt.decode(token, options={"verify_signature": False})
+    assert datos["rol"] == "admin"
+    assert datos["ver"] == 0
+    cabeceras = {"Authorization": f"Bearer {token}"}
+    # El rol del token basta para autorizar, sin pasar por la caché de usuarios
+    response = client.get("/usuarios/cache/estadisticas", headers=cabeceras)
+    assert response.status_code == 200
+    assert response.json()["fallos"] == 0
+    # Desactivar el usuario revoca el token en este proceso...
+    client.delete(f"/usuarios/{id_admin}")
+    response = client.get("/usuarios/cache/estadisticas", headers=cabeceras)
+    assert response.status_code == 401
+    # ...y en cualquier otro al recargar la lista desde la base de datos
+    lista_revocacion.limpiar()
+    response = client.get("/usuarios/cache/estadisticas", headers=cabeceras)
+    assert response.status_code == 401
+    assert lista_revocacion.versiones == {id_admin: 1}
+
+
+def test_estadisticas_clase_y_usuario(
+    client: TestClient, clase_test, estudiante_test, profesor_test
+):
+    payload = {
+        "usuarioId": estudiante_test.id,
+        "claseId": clase_test.id,
+        "estado": EstadoAsistencia.retraso,
+    }
+    assert client.post("/asistencias/", json=payload).status_code == 200
+
+    response = client.get(f"/clases/{clase_test.id}/estadisticas")
+    assert response.status_code == 200
+    data = response.json()
+    assert data["total"] == 1
+    assert {"estado": "retraso", "total": 1, "porcentaje": 100.0} in data["estados"]
+
+    # Un estudiante solo puede consultar sus propias estadísticas
+    app.dependency_overrides[obtener_usuario_actual] = lambda: estudiante_test
+    response = client.get(
+        f"/usuarios/{estudiante_test.id}/estadisticas",
+        params={"desde": "2000-01-01T00:00:00", "hasta": "2100-01-01T00:00:00"},
+    )
+    assert response.status_code == 200
+    assert response.json()["total"] == 1
+    response = client.get(f"/usuarios/{profesor_test.id}/estadisticas")
+    del app.dependency_overrides[obtener_usuario_actual]
+    assert response.status_code == 403
+
+
+def test_exportar_asistencias(client: TestClient, clase_test, estudiante_test, db):
+    admin = Usuario(
+        nombre="Admin",
+        apellido="Test",
+        correoElectronico="admin_exportar@test.com",
+        contrasena="hashed_password",
+        rol=RolUsuario.admin,
+    )
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    payload = {
+        "usuarioId": estudiante_test.id,
+        "claseId": clase_test.id,
+        "estado": EstadoAsistencia.presente,
+    }
+    id_asistencia = client.post("/asistencias/", json=payload).json()["id"]
+
+    # Solo los administradores pueden exportar
+    response = client.get("/asistencias/exportar")
+    assert response.status_code == 401
+
+    app.dependency_overrides[obtener_usuario_actual] = lambda: admin
+    response = client.get("/asistencias/exportar", params={"claseId": clase_test.id})
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/csv")
+    lineas = response.text.splitlines()
+    assert lineas[0] == "id,usuarioId,claseId,fecha,estado"
+    assert lineas[1].startswith(f"{id_asistencia},{estudiante_test.id},")
+    assert lineas[1].endswith(",presente")
+
+    response = client.get(
+        "/asistencias/exportar",
+        params={"formato": "ndjson", "usuarioId": estudiante_test.id},
+    )
+    assert response.status_code == 200
+    filas = [json.loads(linea) for linea in response.text.splitlines()]
+    assert [fila["id"] for fila in filas] == [id_asistencia]
+    assert filas[0]["estado"] == "presente"
+
+    response = client.get(
+        "/asistencias/exportar", params={"desde": "2100-01-01T00:00:00"}
+    )
+    assert response.text == "id,usuarioId,claseId,fecha,estado\r\n"
+
+    response = client.get("/asistencias/exportar", params={"formato": "xml"})
+    del app.dependency_overrides[obtener_usuario_actual]
+    assert response.status_code == 422
+
+
+def test_importar_usuarios_ndjson(client: TestClient, db):
+    admin = Usuario(
+        nombre="Admin",
+        apellido="Test",
+        correoElectronico="admin_importar@test.com",
+        contrasena="hashed_password",
+        rol=RolUsuario.admin,
+    )
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    filas = [
+        {
+            "nombre": f"Estudiante{i}",
+            "apellido": "Importado",
+            "correoElectronico": f"importado{i}@test.com",
+            "contrasena": f"clave{i}",
+            "rol": "estudiante",
+        }
+        for i in range(3)
+    ]
+    filas.append(filas[0])
+    contenido = "\n".join(json.dumps(fila) for fila in filas)
+
+    app.dependency_overrides[obtener_usuario_actual] = lambda: admin
+    response = client.post(
+        "/usuarios/importar",
+        files={"archivo": ("usuarios.ndjson", contenido, "application/x-ndjson")},
+    )
+    del app.dependency_overrides[obtener_usuario_actual]
+    assert response.status_code == 200
+    assert response.json() == {
+        "creados": 3,
+        "rechazados": [
+            {
+                "fila": 4,
+                "correoElectronico": "importado0@test.com",
+                "motivo": "Correo electrónico duplicado en el archivo",
+            }
+        ],
+    }
+    # Los usuarios importados pueden iniciar sesión
+    response = client.post(
+        "/usuarios/inicio_sesion",
+        data={"username": "importado2@test.com", "password": "clave2"},
+    )
+    assert response.status_code == 200
+
+
+def test_horario_genera_y_cancela_clases(client: TestClient, profesor_test):
+    payload = {
+        "nombre": "DAW 2A",
+        "diasSemana": [1, 3],
+        "horaInicio": "10:00:00",
+        "horaFin": "11:00:00",
+        "fechaInicio": "2100-01-01",
+        "fechaFin": "2100-01-31",
+        "festivos": ["2100-01-05"],
+    }
+    app.dependency_overrides[obtener_usuario_actual] = lambda: profesor_test
+    response = client.post("/horarios/", json=payload)
+    assert response.status_code == 200
+    horario = response.json()
+    assert horario["clasesCreadas"] == 7
+    assert horario["profesorId"] == profesor_test.id
+
+    response = client.put(
+        f"/horarios/{horario['id']}/sesiones", json={"nombre": "DAW 2B"}
+    )
+    assert response.json() == {"sesiones": 7}
+    response = client.delete(
+        f"/horarios/{horario['id']}/sesiones", params={"desde": "2100-01-20"}
+    )
+    del app.dependency_overrides[obtener_usuario_actual]
+    assert response.json() == {"sesiones": 3}
+
+    response = client.get(f"/horarios/{horario['id']}/clases")
+    assert response.status_code == 200
+    clases = response.json()
+    assert len(clases) == 4
+    assert {clase["nombre"] for clase in clases} == {"DAW 2B"}
+    assert {clase["horarioId"] for clase in clases} == {horario["id"]}
+    assert client.get(f"/horarios/{horario['id']}").json()["nombre"] == "DAW 2B"
+
+
+def test_sesiones_horario_solo_propias_y_futuras(client: TestClient, profesor_test):
+    payload = {
+        "nombre": "DAW 2A",
+        "diasSemana": [1, 3],
+        "horaInicio": "10:00:00",
+        "horaFin": "11:00:00",
+        "fechaInicio": "2100-01-01",
+        "fechaFin": "2100-01-31",
+        "festivos": [],
+    }
+    app.dependency_overrides[obtener_usuario_actual] = lambda: profesor_test
+    id_horario = client.post("/horarios/", json=payload).json()["id"]
+    ruta = f"/horarios/{id_horario}/sesiones"
+
+    # Una fecha pasada alcanzaría clases ya impartidas y sus asistencias
+    response = client.delete(ruta, params={"desde": "2000-01-01"})
+    assert response.status_code == 400
+    response = client.put(ruta, params={"desde": "2000-01-01"}, json={"nombre": "X"})
+    assert response.status_code == 400
+
+    otro = UsuarioPrincipal(id="otro-profesor", rol=RolUsuario.profesor, activo=True)
+    app.dependency_overrides[obtener_usuario_actual] = lambda: otro
+    assert client.put(ruta, json={"nombre": "X"}).status_code == 403
+    assert client.delete(ruta).status_code == 403
+    del app.dependency_overrides[obtener_usuario_actual]
+
+    response = client.get(f"/horarios/{id_horario}/clases")
+    assert {clase["nombre"] for clase in response.json()} == {"DAW 2A"}
+
+
+@pytest.mark.parametrize(
+    "ruta, params",
+    [
+        (ruta, params)
+        for ruta in ["/clases/", "/asistencias/", "/usuarios/", "/horarios/h/clases"]
+        for params in [{"limit": -1}, {"limit": 0}, {"limit": 1_000_000}]
+    ]
+    + [("/usuarios/", {"skip": -1})],
+)
+def test_limites_de_paginacion(client: TestClient, ruta, params):
+    # Sin límites, limit=-1 o uno enorme devolverían la tabla entera
+    admin = UsuarioPrincipal(id="admin", rol=RolUsuario.admin, activo=True)
+    app.dependency_overrides[obtener_usuario_actual] = lambda: admin
+    response = client.get(ruta, params=params)
+    del app.dependency_overrides[obtener_usuario_actual]
+    assert response.status_code == 422
+
+
+def test_lecturas_condicionales_etag(client: TestClient, clase_test, estudiante_test):
+    response = client.get("/clases/")
+    assert response.status_code == 200
+    etag_clases = response.headers["etag"]
+    assert "last-modified" in response.headers
+
+    response = client.get("/clases/", headers={"If-None-Match": etag_clases})
+    assert response.status_code == 304
+    assert response.content == b""
+    response = client.get(
+        f"/clases/{clase_test.id}", headers={"If-None-Match": etag_clases}
+    )
+    assert response.status_code == 304
+
+    url = f"/asistencias/?claseId={clase_test.id}"
+    etag_asistencias = client.get(url).headers["etag"]
+    assert (
+        client.get(url, headers={"If-None-Match": etag_asistencias}).status_code == 304
+    )
+
+    # Una asistencia nueva cambia la versión de las asistencias de la clase,
+    # pero no la de las clases
+    payload = {
+        "usuarioId": estudiante_test.id,
+        "claseId": clase_test.id,
+        "estado": EstadoAsistencia.presente,
+    }
+    assert client.post("/asistencias/", json=payload).status_code == 200
+    response = client.get(url, headers={"If-None-Match": etag_asistencias})
+    assert response.status_code == 200
+    assert len(response.json()) == 1
+    assert response.headers["etag"] != etag_asistencias
+    response = client.get("/clases/", headers={"If-None-Match": etag_clases})
+    assert response.status_code == 304
+
+
+def test_eliminar_clase_invalida_etag_asistencias(
+    client: TestClient, clase_test, profesor_test
+):
+    url = f"/asistencias/?claseId={clase_test.id}"
+    etag = client.get(url).headers["etag"]
+
+    app.dependency_overrides[obtener_usuario_actual] = lambda: profesor_test
+    assert client.delete(f"/clases/{clase_test.id}").status_code == 204
+    del app.dependency_overrides[obtener_usuario_actual]
+
+    response = client.get(url, headers={"If-None-Match": etag})
+    assert response.status_code == 200
+    assert response.headers["etag"] != etag
+
+
+def test_respuesta_rapida_igual_que_response_model(
+    client: TestClient, clase_test, estudiante_test, db, monkeypatch
+):
+    pytest.importorskip("orjson")
+    admin = Usuario(
+        nombre="Admin",
+        apellido="Test",
+        correoElectronico="admin_rapida@test.com",
+        contrasena="hashed_password",
+        rol=RolUsuario.admin,
+    )
+    db.add(admin)
+    db.commit()
+    db.refresh(admin)
+    payload = {
+        "usuarioId": estudiante_test.id,
+        "claseId": clase_test.id,
+        "estado": EstadoAsistencia.retraso,
+    }
+    assert client.post("/asistencias/", json=payload).status_code == 200
+    urls = ["/clases/", f"/asistencias/?claseId={clase_test.id}", "/usuarios/?limit=2"]
+
+    app.dependency_overrides[obtener_usuario_actual] = lambda: admin
+    normales = [client.get(url) for url in urls]
+    monkeypatch.setattr(respuesta_rapida, "RESPUESTA_RAPIDA", True)
+    rapidas = [client.get(url) for url in urls]
+    del app.dependency_overrides[obtener_usuario_actual]
+
+    for normal, rapida in zip(normales, rapidas):
+        assert rapida.status_code == 200
+        assert rapida.headers["content-type"] == "application/json"
+        assert rapida.json() == normal.json()
+        for cabecera in ("etag", "x-next-cursor"):
+            assert rapida.headers.get(cabecera) == normal.headers.get(cabecera)
+    assert "x-next-cursor" in rapidas[2].headers
+
+
+def test_metricas_por_plantilla_de_ruta(client: TestClient, clase_test):
+    for _ in range(2):
+        assert client.get(f"/clases/{clase_test.id}").status_code == 200
+    assert client.get("/clases/no-existe").status_code == 404
+    assert client.get("/no-existe").status_code == 404
+
+    admin = UsuarioPrincipal(id="admin", rol=RolUsuario.admin, activo=True)
+    app.dependency_overrides[obtener_usuario_actual] = lambda: admin
+    response = client.get("/metrics")
+    del app.dependency_overrides[obtener_usuario_actual]
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/plain; version=0.0.4")
+
+    texto = response.text
+    ruta = 'metodo="GET",ruta="/clases/{id_clase}"'
+    assert f'http_peticiones_total{{{ruta},codigo="200"}} 2' in texto
+    assert f'http_peticiones_total{{{ruta},codigo="404"}} 1' in texto
+    assert 'http_peticiones_total{metodo="GET",ruta="sin_ruta",codigo="404"} 1' in texto
+    assert f"http_duracion_peticion_segundos_count{{{ruta}}} 3" in texto
+    assert f'http_duracion_peticion_segundos_bucket{{{ruta},le="+Inf"}} 3' in texto
+
+    # Cada lectura de la clase ejecuta al menos una sentencia
+    consultas = next(
+        linea
+        for linea in texto.splitlines()
+        if linea.startswith(f"http_consultas_bd_peticion_sum{{{ruta}}}")
+    )
+    assert float(consultas.split()[-1]) >= 3
+
+    assert "threadpool_hilos_maximo " in texto
+    # La propia petición a /metrics está en curso
+    assert "http_peticiones_en_curso 1" in texto
+
+
+def test_metricas_requieren_admin_o_token(
+    client: TestClient, profesor_test, monkeypatch
+):
+    assert client.get("/metrics").status_code == 401
+    app.dependency_overrides[obtener_usuario_actual] = lambda: profesor_test
+    assert client.get("/metrics").status_code == 403
+    del app.dependency_overrides[obtener_usuario_actual]
+
+    # Con API_METRICAS_TOKEN, Prometheus las lee con ese token
+    def peticion(autorizacion: str) -> Request:
+        cabeceras = [(b"authorization", autorizacion.encode())]
+        return Request({"type": "http", "headers": cabeceras})
+
+    monkeypatch.setattr(api.metricas, "METRICAS_TOKEN", "secreto")
+    asyncio.run(api.metricas.verificar_token_metricas(peticion("Bearer secreto")))
+    for autorizacion in ("Bearer otro", "Basic secreto", ""):
+        with pytest.raises(HTTPException) as excinfo:
+            asyncio.run(api.metricas.verificar_token_metricas(peticion(autorizacion)))
+        assert excinfo.value.status_code == 401
+
+
+def test_presupuesto_consultas_clases(
+    client: TestClient, assert_max_consultas, clase_test, estudiante_test, profesor_test
+):
+    payload = {
+        "nombre": "Álgebra",
+        "fecha": "2100-01-01",
+        "horaInicio": "10:00:00",
+        "horaFin": "11:00:00",
+    }
+    app.dependency_overrides[obtener_usuario_actual] = lambda: profesor_test
+
+    # Cada escritura: la sentencia con RETURNING y la versión de las clases
+    with assert_max_consultas(2):
+        id_clase = client.post("/clases/", json=payload).json()["id"]
+    with assert_max_consultas(2):
+        client.put(f"/clases/{id_clase}", json={**payload, "nombre": "Geometría"})
+    with assert_max_consultas(2):
+        client.delete(f"/clases/{id_clase}")
+
+    # Pase de lista: clase, usuarios, inserción y versiones, sin consultas
+    # por estudiante
+    lote = {"asistencias": [{"usuarioId": estudiante_test.id, "estado": "presente"}]}
+    with assert_max_consultas(7):
+        response = client.post(f"/clases/{clase_test.id}/asistencias/lote", json=lote)
+    del app.dependency_overrides[obtener_usuario_actual]
+    assert len(response.json()["creadas"]) == 1
+
+    with assert_max_consultas(2):
+        client.get("/clases/")
+    with assert_max_consultas(2):
+        client.get(f"/clases/{clase_test.id}")
+    with assert_max_consultas(2):
+        client.get(f"/clases/{clase_test.id}/estadisticas")
+
+
+def test_presupuesto_consultas_asistencias(
+    client: TestClient, assert_max_consultas, clase_test, estudiante_test
+):
+    payload = {
+        "usuarioId": estudiante_test.id,
+        "claseId": clase_test.id,
+        "estado": EstadoAsistencia.presente,
+    }
+
+    # La primera escritura también crea las filas de versión de sus ámbitos
+    with assert_max_consultas(7):
+        id_asistencia = client.post("/asistencias/", json=payload).json()["id"]
+    with assert_max_consultas(2):
+        client.get("/asistencias/")
+    with assert_max_consultas(2):
+        client.get("/asistencias/", params={"claseId": clase_test.id})
+    with assert_max_consultas(1):
+        client.get(f"/asistencias/{id_asistencia}")
+    with assert_max_consultas(3):
+        client.put(
+            f"/asistencias/{id_asistencia}", json={**payload, "estado": "ausente"}
+        )
+
+    admin = Usuario(id="admin", rol=RolUsuario.admin)
+    app.dependency_overrides[obtener_usuario_actual] = lambda: admin
+    with assert_max_consultas(1):
+        client.get("/asistencias/exportar")
+    with assert_max_consultas(2):
+        client.get(f"/usuarios/{estudiante_test.id}/estadisticas")
+    del app.dependency_overrides[obtener_usuario_actual]
+
+    with assert_max_consultas(3):
+        client.delete(f"/asistencias/{id_asistencia}")
+
+
+def test_presupuesto_consultas_usuarios_y_horarios(
+    client: TestClient, assert_max_consultas, profesor_test
+):
+    payload = {
+        "nombre": "Ana",
+        "apellido": "García",
+        "correoElectronico": "ana@test.com",
+        "contrasena": "password123",
+        "rol": "estudiante",
+    }
+    with assert_max_consultas(1):
+        assert client.post("/usuarios/", json=payload).status_code == 200
+    with assert_max_consultas(2):
+        response = client.post(
+            "/usuarios/inicio_sesion",
+            data={"username": "ana@test.com", "password": "password123"},
+        )
+    cabeceras = {"Authorization": f"Bearer {response.json()['access_token']}"}
+    # Con un token real se comprueba además que el usuario sigue activo
+    with assert_max_consultas(2):
+        client.get("/usuarios/me", headers=cabeceras)
+
+    horario = {
+        "nombre": "DAW 1A",
+        "diasSemana": [0, 1, 2, 3, 4],
+        "horaInicio": "10:00:00",
+        "horaFin": "11:00:00",
+        "fechaInicio": "2100-01-01",
+        "fechaFin": "2100-03-31",
+        "festivos": [],
+    }
+    app.dependency_overrides[obtener_usuario_actual] = lambda: profesor_test
+    # Las clases del horario se insertan en una sola sentencia (más la fila
+    # de versión de las clases, que se crea en la primera escritura)
+    with assert_max_consultas(4):
+        id_horario = client.post("/horarios/", json=horario).json()["id"]
+    with assert_max_consultas(4):
+        client.put(f"/horarios/{id_horario}/sesiones", json={"nombre": "DAW 1B"})
+    with assert_max_consultas(4):
+        client.delete(f"/horarios/{id_horario}/sesiones")
+    del app.dependency_overrides[obtener_usuario_actual]
+
+    with assert_max_consultas(1):
+        client.get(f"/horarios/{id_horario}")
+    with assert_max_consultas(2):
+        client.get(f"/horarios/{id_horario}/clases")
+
+
+def test_escrituras_una_sentencia_por_fila(
+    client: TestClient, db, clase_test, estudiante_test, profesor_test
+):
+    def escribir(tabla: str, total: int, metodo: str, ruta: str, **kwargs):
+        # Cada escritura modifica su fila con una sola sentencia y ejecuta
+        # exactamente `total` sentencias (las versiones de la caché HTTP y de
+        # los tokens van aparte, con una sentencia cada una)
+        with contar_consultas() as bd:
+            response = client.request(metodo, ruta, **kwargs)
+        patron = re.compile(rf"^(INSERT INTO|UPDATE|DELETE FROM) {tabla}\b")
+        sentencias = [s for s in bd.sentencias if patron.search(s)]
+        assert response.status_code < 300
+        assert len(sentencias) == 1, sentencias
+        assert sum(bd.sentencias[s] for s in sentencias) == 1
+        assert bd.consultas == total, list(bd.sentencias)
+        return response
+
+    clase = {
+        "nombre": "Álgebra",
+        "fecha": "2100-01-01",
+        "horaInicio": "10:00:00",
+        "horaFin": "11:00:00",
+    }
+    asistencia = {
+        "usuarioId": estudiante_test.id,
+        "claseId": clase_test.id,
+        "estado": "presente",
+    }
+    usuario = {
+        "nombre": "Ana",
+        "apellido": "García",
+        "correoElectronico": "ana@test.com",
+        "contrasena": "password123",
+        "rol": "estudiante",
+    }
+
+    app.dependency_overrides[obtener_usuario_actual] = lambda: profesor_test
+    id_clase = escribir("clase", 2, "POST", "/clases/", json=clase).json()["id"]
+    ruta = f"/clases/{id_clase}"
+    escribir("clase", 2, "PUT", ruta, json={**clase, "nombre": "Geo"})
+    escribir("clase", 2, "DELETE", ruta)
+    # Si la sentencia no afecta a ninguna fila, la respuesta es 404
+    assert client.delete(f"/clases/{id_clase}").status_code == 404
+
+    ruta = "/asistencias/"
+    # La creación comprueba antes que existen el usuario y la clase
+    respuesta = escribir("asistencia", 4, "POST", ruta, json=asistencia)
+    ruta = f"/asistencias/{respuesta.json()['id']}"
+    escribir("asistencia", 2, "PUT", ruta, json={**asistencia, "estado": "ausente"})
+    escribir("asistencia", 2, "DELETE", ruta)
+    assert client.put(ruta, json=asistencia).status_code == 404
+
+    app.dependency_overrides[obtener_usuario_actual] = lambda: Usuario(
+        id="admin", rol=RolUsuario.admin
+    )
+    id_usuario = escribir("usuario", 1, "POST", "/usuarios/", json=usuario).json()["id"]
+    ruta = f"/usuarios/{id_usuario}"
+    escribir("usuario", 1, "PUT", ruta, json={"nombre": "Eva"})
+    # Con el rol, los tokens se revocan en la misma petición (solo si cambia)
+    escribir("usuario", 2, "PUT", ruta, json={"rol": "profesor"})
+    assert obtener_version_token(db, id_usuario) == 1
+    escribir("usuario", 2, "PUT", ruta, json={"rol": "profesor"})
+    assert obtener_version_token(db, id_usuario) == 1
+    escribir("usuario", 2, "DELETE", ruta)
+    assert obtener_version_token(db, id_usuario) == 2
+    assert client.delete(ruta).status_code == 404
+    del app.dependency_overrides[obtener_usuario_actual]
+
+
+def test_lista_clase_en_una_consulta(
+    client: TestClient, assert_max_consultas, clase_test, estudiante_test
+):
+    payload = {
+        "usuarioId": estudiante_test.id,
+        "claseId": clase_test.id,
+        "estado": EstadoAsistencia.presente,
+    }
+    client.post("/asistencias/", json=payload)
+
+    with assert_max_consultas(1):
+        response = client.get(f"/clases/{clase_test.id}/lista")
+
+    assert response.status_code == 200
+    data = response.json()
+    assert data["id"] == clase_test.id
+    assert set(data["profesor"]) == {"id", "nombre", "apellido"}
+    assert data["asistencias"] == [
+        {
+            "id": data["asistencias"][0]["id"],
+            "usuarioId": estudiante_test.id,
+            "nombre": estudiante_test.nombre,
+            "apellido": estudiante_test.apellido,
+            "estado": "presente",
+            "fecha": data["asistencias"][0]["fecha"],
+        }
+    ]
+    assert "contrasena" not in response.text
+
+    assert client.get("/clases/no-existe/lista").status_code == 404
+
+
+def test_lecturas_en_replica_y_escrituras_propias(
+    client: TestClient, engine_async, profesor_test, monkeypatch, tmp_path
+):
+    # Réplica en un segundo fichero SQLite que se sincroniza a mano
+    ruta_replica = tmp_path / "replica.db"
+    replica = create_async_engine(
+        f"sqlite+aiosqlite:///{ruta_replica}", poolclass=NullPool
+    )
+
+    def sincronizar_replica():
+        with (
+            sqlite3.connect(engine_async.url.database) as origen,
+            sqlite3.connect(ruta_replica) as destino,
+        ):
+            origen.backup(destino)
+
+    sincronizar_replica()
+    monkeypatch.setattr(enrutador_lectura, "primario", engine_async)
+    monkeypatch.setattr(enrutador_lectura, "replica", replica)
+    del app.dependency_overrides[obtener_db_lectura]
+    app.dependency_overrides[obtener_usuario_actual] = lambda: profesor_test
+
+    payload = {
+        "nombre": "DAW 1A",
+        "fecha": "2025-09-21",
+        "horaInicio": "08:00",
+        "horaFin": "13:30",
+    }
+    response = client.post("/clases/", json=payload)
+    assert response.status_code == 200
+    assert COOKIE_ESCRITURA in response.cookies
+    id_clase = response.json()["id"]
+
+    # Quien escribe lee del primario durante la ventana
+    assert client.get(f"/clases/{id_clase}").status_code == 200
+
+    # El resto de clientes leen de la réplica, que aún no tiene la clase
+    client.cookies.clear()
+    assert client.get(f"/clases/{id_clase}").status_code == 404
+    assert client.get("/clases/").json() == []
+
+    sincronizar_replica()
+    assert client.get(f"/clases/{id_clase}").status_code == 200
+
+    # Pasada la ventana, quien escribió también lee de la réplica
+    client.post("/clases/", json=payload)
+    monkeypatch.setattr(enrutador_lectura, "ventana", 0)
+    assert len(client.get("/clases/").json()) == 1
+
+    # Las lecturas no marcan al cliente
+    client.cookies.clear()
+    assert COOKIE_ESCRITURA not in client.get("/clases/").cookies
+
+    del app.dependency_overrides[obtener_usuario_actual]
+    asyncio.run(replica.dispose())
@@ -1,18 +1,51 @@
+import asyncio
+import uuid
+from datetime import datetime
+
 import pytest
 from fastapi import HTTPException
+from sqlmodel.ext.asyncio.session import AsyncSession
 
 from models.Asistencia import EstadoAsistencia
-from schemas.asistencia import CrearAsistencia
+from models.Usuario import RolUsuario, Usuario
+from schemas.asistencia import (
+    CrearAsistencia,
+    CrearAsistenciaLote,
+    EntradaAsistenciaLote,
+    MarcarAsistencia,
+)
 from services.asistencia_service import (
     actualizar_asistencia_service,
     crear_asistencia_service,
+    crear_asistencia_service_async,
+    crear_asistencias_lote_service,
     eliminar_asistencia_service,
+    marcar_asistencia_service,
     obtener_asistencia_id_service,
     obtener_asistencia_service,
+    obtener_asistencia_service_async,
     obtener_asistencias_service,
+    obtener_estadisticas_clase_service,
+    obtener_estadisticas_usuario_service,
 )
 
 
+def crear_estudiante(session) -> Usuario:
+    # Crea un estudiante adicional para registrar varias asistencias en una clase
+    id = str(uuid.uuid4())
+    estudiante = Usuario(
+        id=id,
+        nombre="Test",
+        apellido="Estudiante",
+        correoElectronico=f"estudiante_{id}@test.com",
+        contrasena="hashed_password",
+        rol=RolUsuario.estudiante,
+    )
+    session.add(estudiante)
+    session.commit()
+    return estudiante
+
+
 def test_crear_asistencia_service(db, estudiante_test, clase_test):
     session = db
     estudiante_id = estudiante_test.id
@@ -61,6 +94,22 @@ def test_crear_asistencia_clase_no_existe(db, estudiante_test):
     assert "Clase no encontrada" in exc_info.value.detail
 
 
+def test_crear_asistencia_duplicada(db, estudiante_test, clase_test):
+    session = db
+
+    asistencia_data = CrearAsistencia(
+        usuarioId=estudiante_test.id,
+        claseId=clase_test.id,
+        estado=EstadoAsistencia.presente,
+    )
+    crear_asistencia_service(session, asistencia_data)
+
+    with pytest.raises(HTTPException) as exc_info:
+        crear_asistencia_service(session, asistencia_data)
+
+    assert exc_info.value.status_code == 400
+
+
 def test_obtener_asistencias_service(db, estudiante_test, clase_test):
     session = db
     estudiante_id = estudiante_test.id
@@ -70,7 +119,9 @@ def test_obtener_asistencias_service(db, estudiante_test, clase_test):
         usuarioId=estudiante_id, claseId=clase_id, estado=EstadoAsistencia.presente
     )
     asistencia2 = CrearAsistencia(
-        usuarioId=estudiante_id, claseId=clase_id, estado=EstadoAsistencia.ausente
+        usuarioId=crear_estudiante(session).id,
+        claseId=clase_id,
+        estado=EstadoAsistencia.ausente,
     )
 
     crear_asistencia_service(session, asistencia1)
@@ -80,14 +131,15 @@ def test_obtener_asistencias_service(db, estudiante_test, clase_test):
     assert len(asistencias) == 2
 
 
-def test_obtener_asistencias_paginacion(db, estudiante_test, clase_test):
+def test_obtener_asistencias_paginacion(db, clase_test):
     session = db
-    estudiante_id = estudiante_test.id
     clase_id = clase_test.id
 
     for i in range(5):
         asistencia = CrearAsistencia(
-            usuarioId=estudiante_id, claseId=clase_id, estado=EstadoAsistencia.presente
+            usuarioId=crear_estudiante(session).id,
+            claseId=clase_id,
+            estado=EstadoAsistencia.presente,
         )
         crear_asistencia_service(session, asistencia)
 
@@ -128,6 +180,41 @@ def test_obtener_asistencia_filtro_usuario(db, estudiante_test, clase_test):
     assert asistencias[0].usuarioId == estudiante_id
 
 
+def test_obtener_asistencia_filtro_fechas_estado_profesor(
+    db, estudiante_test, clase_test, profesor_test
+):
+    session = db
+    crear_asistencia_service(
+        session,
+        CrearAsistencia(
+            usuarioId=estudiante_test.id,
+            claseId=clase_test.id,
+            estado=EstadoAsistencia.presente,
+        ),
+    )
+    ausente = crear_asistencia_service(
+        session,
+        CrearAsistencia(
+            usuarioId=crear_estudiante(session).id,
+            claseId=clase_test.id,
+            estado=EstadoAsistencia.ausente,
+        ),
+    )
+
+    asistencias = obtener_asistencia_service(session, estado=EstadoAsistencia.ausente)
+    assert [a.id for a in asistencias] == [ausente.id]
+
+    asistencias = obtener_asistencia_service(session, id_profesor=profesor_test.id)
+    assert len(asistencias) == 2
+    assert obtener_asistencia_service(session, id_profesor="no-existe") == []
+
+    asistencias = obtener_asistencia_service(
+        session, desde=ausente.fecha, hasta=ausente.fecha
+    )
+    assert ausente.id in [a.id for a in asistencias]
+    assert obtener_asistencia_service(session, hasta=datetime(2000, 1, 1)) == []
+
+
 def test_obtener_asistencia_id_service(db, estudiante_test, clase_test):
     session = db
     estudiante_id = estudiante_test.id
@@ -186,3 +273,164 @@ def test_eliminar_asistencia_service(db, estudiante_test, clase_test):
 
     with pytest.raises(HTTPException):
         obtener_asistencia_id_service(session, nueva_asistencia.id)
+
+
+def test_crear_asistencias_lote_service(db, estudiante_test, clase_test):
+    session = db
+
+    lote = CrearAsistenciaLote(
+        asistencias=[
+            EntradaAsistenciaLote(
+                usuarioId=estudiante_test.id, estado=EstadoAsistencia.presente
+            ),
+            EntradaAsistenciaLote(
+                usuarioId="id-inexistente", estado=EstadoAsistencia.ausente
+            ),
+            EntradaAsistenciaLote(
+                usuarioId=estudiante_test.id, estado=EstadoAsistencia.retraso
+            ),
+        ]
+    )
+    resultado = crear_asistencias_lote_service(session, clase_test.id, lote)
+
+    assert len(resultado.creadas) == 1
+    assert resultado.creadas[0].usuarioId == estudiante_test.id
+    assert resultado.creadas[0].estado == EstadoAsistencia.presente
+    assert [r.motivo for r in resultado.rechazadas] == [
+        "Usuario no encontrado",
+        "Usuario duplicado en el lote",
+    ]
+
+    asistencias = obtener_asistencia_service(session, id_clase=clase_test.id)
+    assert len(asistencias) == 1
+    assert asistencias[0].id == resultado.creadas[0].id
+
+    # Repetir el pase de lista no duplica asistencias ya registradas
+    resultado = crear_asistencias_lote_service(session, clase_test.id, lote)
+
+    assert resultado.creadas == []
+    assert resultado.rechazadas[0].motivo == "Asistencia ya registrada"
+
+
+def test_crear_asistencias_lote_clase_no_existe(db, estudiante_test):
+    session = db
+
+    lote = CrearAsistenciaLote(
+        asistencias=[
+            EntradaAsistenciaLote(
+                usuarioId=estudiante_test.id, estado=EstadoAsistencia.presente
+            )
+        ]
+    )
+
+    with pytest.raises(HTTPException) as exc_info:
+        crear_asistencias_lote_service(session, "id-inexistente", lote)
+
+    assert exc_info.value.status_code == 404
+    assert "Clase no encontrada" in exc_info.value.detail
+
+
+def test_marcar_asistencia_service(db, estudiante_test, clase_test):
+    session = db
+
+    creada = marcar_asistencia_service(
+        session,
+        clase_test.id,
+        estudiante_test.id,
+        MarcarAsistencia(estado=EstadoAsistencia.ausente),
+    )
+    assert creada.estado == EstadoAsistencia.ausente
+    assert creada.claseId == clase_test.id
+    assert creada.usuarioId == estudiante_test.id
+
+    # Marcar de nuevo cambia el estado de la misma asistencia
+    actualizada = marcar_asistencia_service(
+        session,
+        clase_test.id,
+        estudiante_test.id,
+        MarcarAsistencia(estado=EstadoAsistencia.retraso),
+    )
+    assert actualizada.id == creada.id
+    assert actualizada.fecha == creada.fecha
+    assert actualizada.estado == EstadoAsistencia.retraso
+
+    asistencias = obtener_asistencia_service(session, id_clase=clase_test.id)
+    assert [(a.id, a.estado) for a in asistencias] == [
+        (creada.id, EstadoAsistencia.retraso)
+    ]
+
+
+@pytest.mark.parametrize("clase_existe", [True, False])
+def test_marcar_asistencia_no_existe(db, estudiante_test, clase_test, clase_existe):
+    id_clase = clase_test.id if clase_existe else "id-inexistente"
+    id_usuario = "id-inexistente" if clase_existe else estudiante_test.id
+
+    with pytest.raises(HTTPException) as exc_info:
+        marcar_asistencia_service(
+            db, id_clase, id_usuario, MarcarAsistencia(estado="presente")
+        )
+
+    assert exc_info.value.status_code == 404
+    assert obtener_asistencia_service(db) == []
+
+
+def test_asistencia_service_async(engine_async, estudiante_test, clase_test):
+    asistencia_data = CrearAsistencia(
+        usuarioId=estudiante_test.id,
+        claseId=clase_test.id,
+        estado=EstadoAsistencia.presente,
+    )
+
+    async def crear_y_listar():
+        async with AsyncSession(engine_async) as session:
+            nueva = await crear_asistencia_service_async(session, asistencia_data)
+            lista = await obtener_asistencia_service_async(
+                session, id_clase=clase_test.id
+            )
+            return nueva, lista
+
+    nueva_asistencia, asistencias = asyncio.run(crear_y_listar())
+
+    assert nueva_asistencia.estado == EstadoAsistencia.presente
+    assert [a.id for a in asistencias] == [nueva_asistencia.id]
+
+
+def test_obtener_estadisticas_clase_service(db, clase_test):
+    estados = [
+        EstadoAsistencia.presente,
+        EstadoAsistencia.presente,
+        EstadoAsistencia.presente,
+        EstadoAsistencia.ausente,
+    ]
+    for estado in estados:
+        crear_asistencia_service(
+            db,
+            CrearAsistencia(
+                usuarioId=crear_estudiante(db).id, claseId=clase_test.id, estado=estado
+            ),
+        )
+
+    estadisticas = obtener_estadisticas_clase_service(db, clase_test.id)
+
+    assert estadisticas.total == 4
+    assert [(e.estado, e.total, e.porcentaje) for e in estadisticas.estados] == [
+        (EstadoAsistencia.presente, 3, 75.0),
+        (EstadoAsistencia.ausente, 1, 25.0),
+        (EstadoAsistencia.retraso, 0, 0.0),
+    ]
+
+    # El rango de fechas excluye todas las asistencias
+    futuro = datetime(2100, 1, 1)
+    estadisticas = obtener_estadisticas_clase_service(db, clase_test.id, desde=futuro)
+    assert estadisticas.total == 0
+    assert all(e.porcentaje == 0.0 for e in estadisticas.estados)
+
+
+def test_obtener_estadisticas_no_existe(db):
+    with pytest.raises(HTTPException) as excinfo:
+        obtener_estadisticas_clase_service(db, "id-inexistente")
+    assert excinfo.value.status_code == 404
+
+    with pytest.raises(HTTPException) as excinfo:
+        obtener_estadisticas_usuario_service(db, "id-inexistente")
+    assert excinfo.value.status_code == 404
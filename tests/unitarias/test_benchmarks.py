@@ -0,0 +1,14 @@
+from benchmarks.suite import obtener_escala, percentil
+
+
+def test_percentil_rango_mas_cercano():
+    muestras = [float(i) for i in range(1, 101)]
+
+    assert percentil(muestras, 50) == 50
+    assert percentil(muestras, 99) == 99
+    assert percentil([3.0], 95) == 3.0
+
+
+def test_obtener_escala():
+    assert obtener_escala("100k") == 100_000
+    assert obtener_escala("2500") == 2500
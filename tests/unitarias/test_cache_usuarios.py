@@ -0,0 +1,47 @@
+import time
+
+from models.Usuario import RolUsuario
+from schemas.usuario import UsuarioPrincipal
+from services.cache_usuarios import CacheUsuarios
+
+
+def crear_principal(id: str) -> UsuarioPrincipal:
+    return UsuarioPrincipal(id=id, rol=RolUsuario.estudiante, activo=True)
+
+
+def test_cache_usuarios_aciertos_y_fallos():
+    cache = CacheUsuarios(max_entradas=10, ttl=60)
+
+    assert cache.obtener("u1") is None
+    cache.guardar(crear_principal("u1"))
+    assert cache.obtener("u1").id == "u1"
+
+    estadisticas = cache.estadisticas()
+    assert estadisticas["aciertos"] == 1
+    assert estadisticas["fallos"] == 1
+    assert estadisticas["tasa_aciertos"] == 0.5
+
+
+def test_cache_usuarios_descarta_el_menos_usado():
+    cache = CacheUsuarios(max_entradas=2, ttl=60)
+    cache.guardar(crear_principal("u1"))
+    cache.guardar(crear_principal("u2"))
+    cache.obtener("u1")
+    cache.guardar(crear_principal("u3"))
+
+    assert cache.obtener("u2") is None
+    assert cache.obtener("u1") is not None
+    assert cache.obtener("u3") is not None
+
+
+def test_cache_usuarios_caducidad_e_invalidacion():
+    cache = CacheUsuarios(max_entradas=10, ttl=0.01)
+    cache.guardar(crear_principal("u1"))
+    time.sleep(0.02)
+    assert cache.obtener("u1") is None
+
+    cache.ttl = 60
+    cache.guardar(crear_principal("u1"))
+    cache.invalidar("u1")
+    assert cache.obtener("u1") is None
+    assert cache.estadisticas()["entradas"] == 0
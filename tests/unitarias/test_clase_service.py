@@ -3,6 +3,8 @@ from datetime import date, time
 import pytest
 from fastapi import HTTPException
 
+from models.Asistencia import Asistencia, EstadoAsistencia
+from models.Usuario import RolUsuario, Usuario
 from schemas.clase import CrearClase
 from services.clase_service import (
     actualizar_clase_service,
@@ -10,7 +12,9 @@ from services.clase_service import (
     eliminar_clase_service,
     obtener_clase_id_service,
     obtener_clases_service,
+    obtener_lista_clase_service,
 )
+from services.paginacion import siguiente_cursor
 
 
 def test_crear_clase_service(db, profesor_test):
@@ -59,6 +63,46 @@ def test_obtener_clases_service(db, profesor_test):
     assert clases[1].nombre == "DAW 2B"
 
 
+def test_obtener_clases_filtros(db, profesor_test):
+    session = db
+    otro_profesor = Usuario(
+        nombre="Otro",
+        apellido="Profesor",
+        correoElectronico="otro_profesor@test.com",
+        contrasena="hashed_password",
+        rol=RolUsuario.profesor,
+    )
+    session.add(otro_profesor)
+    session.commit()
+
+    for dia, profesor_id in (
+        (1, profesor_test.id),
+        (2, otro_profesor.id),
+        (3, profesor_test.id),
+    ):
+        clase = CrearClase(
+            nombre=f"DAW {dia}",
+            fecha=date(2025, 10, dia),
+            horaInicio=time(8, 0),
+            horaFin=time(9, 0),
+        )
+        crear_clase_service(session, clase, profesor_id)
+
+    clases = obtener_clases_service(session, id_profesor=profesor_test.id)
+    assert [c.nombre for c in clases] == ["DAW 1", "DAW 3"]
+
+    # Los dos extremos del rango están incluidos
+    clases = obtener_clases_service(
+        session, desde=date(2025, 10, 2), hasta=date(2025, 10, 3)
+    )
+    assert [c.nombre for c in clases] == ["DAW 2", "DAW 3"]
+
+    clases = obtener_clases_service(
+        session, id_profesor=profesor_test.id, hasta=date(2025, 10, 2)
+    )
+    assert [c.nombre for c in clases] == ["DAW 1"]
+
+
 def test_obtener_clases_paginacion(db, profesor_test):
     session = db
     profesor_id = profesor_test.id
@@ -79,6 +123,40 @@ def test_obtener_clases_paginacion(db, profesor_test):
     assert len(clases) == 2
 
 
+def test_obtener_clases_cursor(db, profesor_test):
+    session = db
+    profesor_id = profesor_test.id
+
+    for i in range(5):
+        clase = CrearClase(
+            nombre=f"Clase {i}",
+            fecha=date(2025, 9, 21 + i % 2),
+            horaInicio=time(8, 0),
+            horaFin=time(13, 30),
+        )
+        crear_clase_service(session, clase, profesor_id)
+
+    primera = obtener_clases_service(session, limit=3)
+    cursor = siguiente_cursor(primera, 3, ("fecha", "id"))
+    segunda = obtener_clases_service(session, limit=3, cursor=cursor)
+
+    assert len(primera) == 3
+    assert len(segunda) == 2
+    assert siguiente_cursor(segunda, 3, ("fecha", "id")) is None
+
+    # Las páginas no se solapan y respetan el orden por fecha
+    clases = primera + segunda
+    assert len({clase.id for clase in clases}) == 5
+    assert [clase.fecha for clase in clases] == sorted(c.fecha for c in clases)
+
+
+def test_obtener_clases_cursor_invalido(db):
+    with pytest.raises(HTTPException) as exc_info:
+        obtener_clases_service(db, cursor="no-es-un-cursor")
+
+    assert exc_info.value.status_code == 400
+
+
 def test_obtener_clase_id_service(db, profesor_test):
     session = db
     profesor_id = profesor_test.id
@@ -150,3 +228,51 @@ def test_eliminar_clase_service(db, profesor_test):
 
     with pytest.raises(HTTPException):
         obtener_clase_id_service(session, nueva_clase.id)
+
+
+def test_obtener_lista_clase_service(db, clase_test, profesor_test):
+    # Dos estudiantes, que se devuelven ordenados por apellido
+    estudiantes = [
+        Usuario(
+            nombre=nombre,
+            apellido=apellido,
+            correoElectronico=f"{nombre.lower()}@test.com",
+            contrasena="hash",
+            rol=RolUsuario.estudiante,
+        )
+        for nombre, apellido in (("Zoe", "Ruiz"), ("Ana", "Blanco"))
+    ]
+    db.add_all(estudiantes)
+    db.add_all(
+        Asistencia(usuarioId=estudiante.id, claseId=clase_test.id, estado=estado)
+        for estudiante, estado in zip(
+            estudiantes, (EstadoAsistencia.presente, EstadoAsistencia.retraso)
+        )
+    )
+    db.commit()
+
+    lista = obtener_lista_clase_service(db, clase_test.id)
+
+    assert lista.id == clase_test.id
+    assert lista.nombre == clase_test.nombre
+    assert lista.profesor.id == profesor_test.id
+    assert lista.profesor.nombre == profesor_test.nombre
+    assert [(a.apellido, a.estado) for a in lista.asistencias] == [
+        ("Blanco", EstadoAsistencia.retraso),
+        ("Ruiz", EstadoAsistencia.presente),
+    ]
+    assert lista.asistencias[0].usuarioId == estudiantes[1].id
+
+
+def test_obtener_lista_clase_sin_asistencias(db, clase_test):
+    lista = obtener_lista_clase_service(db, clase_test.id)
+
+    assert lista.id == clase_test.id
+    assert lista.asistencias == []
+
+
+def test_obtener_lista_clase_no_existe(db):
+    with pytest.raises(HTTPException) as exc:
+        obtener_lista_clase_service(db, "no-existe")
+
+    assert exc.value.status_code == 404
@@ -0,0 +1,105 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+import pytest
+from jwt.exceptions import InvalidTokenError
+
+from services.claves_jwt import ConjuntoClaves, cargar_claves
+
+RAIZ = Path(__file__).resolve().parents[2]
+
+# Código que ejecuta cada worker: carga las claves de su entorno y emite
+# (argumento "emitir") o valida (argumento "validar <token>") un token
+CODIGO_WORKER = """
+import sys
+from services.claves_jwt import cargar_claves
+claves = cargar_claves()
+if sys.argv[1] == "emitir":
+    print(claves.firmar({"sub": "7"}))
+else:
+    print(claves.decodificar(sys.argv[2])["sub"])
+"""
+
+
+def ejecutar_worker(entorno: dict, *args: str) -> subprocess.CompletedProcess:
+    return subprocess.run(
+        [sys.executable, "-c", CODIGO_WORKER, *args],
+        cwd=RAIZ,
+        env={**os.environ, **entorno},
+        capture_output=True,
+        text=True,
+        timeout=60,
+    )
+
+
+def test_firmar_incluye_kid_y_valida_claves_rotadas():
+    anterior = ConjuntoClaves({"v1": "secreto-1"}, "v1")
+    token = anterior.firmar({"sub": "1"})
+
+    rotado = ConjuntoClaves({"v2": "secreto-2", "v1": "secreto-1"}, "v2")
+
+    assert rotado.decodificar(token)["sub"] == "1"
+    assert rotado.decodificar(rotado.firmar({"sub": "2"}))["sub"] == "2"
+
+    retirado = ConjuntoClaves({"v2": "secreto-2"}, "v2")
+    with pytest.raises(InvalidTokenError):
+        retirado.decodificar(token)
+
+
+def test_clave_activa_desconocida():
+    with pytest.raises(ValueError):
+        ConjuntoClaves({"v1": "secreto"}, "v2")
+
+
+def test_cargar_claves_desde_lista(monkeypatch):
+    monkeypatch.delenv("JWT_CLAVES_ARCHIVO", raising=False)
+    monkeypatch.setenv("JWT_CLAVES", "v2:secreto-2,v1:secreto-1")
+    monkeypatch.setenv("JWT_CLAVE_ACTIVA", "v1")
+
+    claves = cargar_claves()
+
+    assert claves.claves == {"v2": "secreto-2", "v1": "secreto-1"}
+    assert claves.activa == "v1"
+
+
+def test_cargar_claves_desde_archivo(monkeypatch, tmp_path):
+    archivo = tmp_path / "claves.json"
+    archivo.write_text(json.dumps({"activa": "b", "claves": {"a": "x", "b": "y"}}))
+    monkeypatch.setenv("JWT_CLAVES_ARCHIVO", str(archivo))
+
+    claves = cargar_claves()
+
+    assert claves.activa == "b"
+    assert set(claves.claves) == {"a", "b"}
+
+
+def test_cargar_claves_formato_invalido(monkeypatch):
+    monkeypatch.delenv("JWT_CLAVES_ARCHIVO", raising=False)
+    monkeypatch.setenv("JWT_CLAVES", "sin-separador")
+
+    with pytest.raises(ValueError):
+        cargar_claves()
+
+
+def test_token_valido_entre_workers():
+    entorno = {"JWT_CLAVES_ARCHIVO": "", "JWT_CLAVES": "v1:secreto-compartido"}
+
+    emision = ejecutar_worker(entorno, "emitir")
+    assert emision.returncode == 0, emision.stderr
+
+    validacion = ejecutar_worker(entorno, "validar", emision.stdout.strip())
+    assert validacion.returncode == 0, validacion.stderr
+    assert validacion.stdout.strip() == "7"
+
+
+def test_token_rechazado_entre_workers_sin_claves_compartidas():
+    entorno = {"JWT_CLAVES_ARCHIVO": "", "JWT_CLAVES": "", "JWT_CLAVE_SECRETA": ""}
+
+    emision = ejecutar_worker(entorno, "emitir")
+    assert emision.returncode == 0, emision.stderr
+
+    validacion = ejecutar_worker(entorno, "validar", emision.stdout.strip())
+    assert validacion.returncode != 0
@@ -0,0 +1,123 @@
+import asyncio
+import logging
+import time
+
+from sqlalchemy import create_engine, text
+from starlette.requests import Request
+
+from database.connection import (
+    COOKIE_ESCRITURA,
+    EnrutadorLectura,
+    configurar_engine,
+    obtener_enrutador_lectura,
+    obtener_opciones_engine,
+    obtener_url_async,
+)
+from services.escritura_reciente import MiddlewareEscrituraReciente
+
+
+def test_obtener_url_async():
+    assert obtener_url_async("sqlite:///database.db") == (
+        "sqlite+aiosqlite:///database.db"
+    )
+    assert obtener_url_async("postgresql://u:p@host/db") == (
+        "postgresql+asyncpg://u:p@host/db"
+    )
+    assert obtener_url_async("mysql+pymysql://u:p@host/db") == (
+        "mysql+aiomysql://u:p@host/db"
+    )
+    # Las URL que ya usan un driver asíncrono no se modifican
+    assert obtener_url_async("sqlite+aiosqlite:///x.db") == "sqlite+aiosqlite:///x.db"
+
+
+def test_obtener_opciones_engine(monkeypatch):
+    monkeypatch.setenv("DB_POOL_SIZE", "20")
+    monkeypatch.setenv("DB_ECHO", "true")
+
+    perfil, opciones = obtener_opciones_engine("postgresql://u:p@host/db")
+    assert perfil == "postgresql"
+    assert opciones["pool_size"] == 20
+    assert opciones["echo"] is True
+
+    # SQLite en memoria no admite las opciones de tamaño del pool
+    perfil, opciones = obtener_opciones_engine("sqlite:///:memory:")
+    assert perfil == "sqlite-memoria"
+    assert "pool_size" not in opciones
+
+    perfil, opciones = obtener_opciones_engine("sqlite:///database.db")
+    assert perfil == "sqlite"
+    assert opciones["pool_size"] == 20
+
+
+def test_configurar_engine_aplica_pragmas_sqlite(tmp_path, monkeypatch):
+    monkeypatch.setenv("DB_SQLITE_BUSY_TIMEOUT", "1234")
+    url = f"sqlite:///{tmp_path / 'pragmas.db'}"
+    perfil, opciones = obtener_opciones_engine(url)
+    engine = create_engine(url, **opciones)
+    configurar_engine(engine, perfil, opciones)
+
+    with engine.connect() as conexion:
+        assert conexion.execute(text("PRAGMA journal_mode")).scalar() == "wal"
+        assert conexion.execute(text("PRAGMA synchronous")).scalar() == 1
+        assert conexion.execute(text("PRAGMA busy_timeout")).scalar() == 1234
+
+    engine.dispose()
+
+
+def test_configurar_engine_registra_el_perfil(caplog):
+    url = "sqlite://"
+    perfil, opciones = obtener_opciones_engine(url)
+    engine = create_engine(url, **opciones)
+
+    with caplog.at_level(logging.INFO, logger="uvicorn.error"):
+        configurar_engine(engine, perfil, opciones)
+
+    assert [registro.name for registro in caplog.records] == ["uvicorn.error"]
+    assert caplog.records[0].levelno == logging.INFO
+    assert "Perfil de base de datos 'sqlite-memoria' (pysqlite)" in caplog.text
+    engine.dispose()
+
+
+def peticion(cookie: str | None = None) -> Request:
+    cabeceras = [(b"cookie", f"{COOKIE_ESCRITURA}={cookie}".encode())] if cookie else []
+    return Request({"type": "http", "headers": cabeceras})
+
+
+def test_enrutador_lectura():
+    primario, replica = object(), object()
+    enrutador = EnrutadorLectura(primario, replica, 5)
+
+    assert enrutador.elegir(peticion()) is replica
+    assert enrutador.elegir(peticion(str(time.time()))) is primario
+    # Cookies caducadas o con un valor inválido no cuentan
+    assert enrutador.elegir(peticion(str(time.time() - 10))) is replica
+    assert enrutador.elegir(peticion("x")) is replica
+
+    # Sin réplica todas las lecturas van al primario
+    assert EnrutadorLectura(primario, None, 5).elegir(peticion()) is primario
+
+
+def test_ventana_escritura_fraccionaria(monkeypatch):
+    # Una ventana de menos de un segundo es válida
+    # (__wrapped__ crea un enrutador nuevo sin tocar el compartido)
+    monkeypatch.setenv("DB_LECTURA_VENTANA_ESCRITURA", "0.5")
+    assert obtener_enrutador_lectura.__wrapped__().ventana == 0.5
+
+    primario, replica = object(), object()
+    enrutador = EnrutadorLectura(primario, replica, 0.5)
+    assert enrutador.elegir(peticion(str(time.time()))) is primario
+    assert enrutador.elegir(peticion(str(time.time() - 1))) is replica
+
+    # La cookie dura al menos la ventana (Max-Age se redondea hacia arriba)
+    mensajes = []
+
+    async def aplicacion(scope, receive, send):
+        await send({"type": "http.response.start", "status": 200, "headers": []})
+
+    async def enviar(mensaje):
+        mensajes.append(mensaje)
+
+    middleware = MiddlewareEscrituraReciente(aplicacion, enrutador)
+    asyncio.run(middleware({"type": "http", "method": "POST"}, None, enviar))
+    cookie = dict(mensajes[0]["headers"])[b"set-cookie"].decode()
+    assert "Max-Age=1;" in cookie
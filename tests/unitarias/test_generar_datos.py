@@ -0,0 +1,52 @@
+from sqlalchemy import inspect
+from sqlmodel import delete, func, select
+
+from database.generar_datos import CONTRASENA, dimensiones, generar_datos
+from models.Asistencia import Asistencia, EstadoAsistencia
+from models.Clase import Clase
+from models.Usuario import Usuario
+from services.usuario_services import verificar_contrasena
+
+
+def test_generar_datos_dimensiones(db):
+    n = generar_datos(db.get_bind(), 130, semilla=1, alumnos_por_grupo=10, lote=40)
+
+    assert n == dimensiones(130, alumnos_por_grupo=10)
+    assert db.exec(select(func.count()).select_from(Clase)).one() == 13
+    assert db.exec(select(func.count()).select_from(Asistencia)).one() == 130
+    assert db.exec(select(func.count()).select_from(Usuario)).one() == (
+        n["estudiantes"] + n["profesores"] + 1
+    )
+
+    # Todos los usuarios comparten la contraseña cifrada una sola vez
+    contrasenas = db.exec(select(Usuario.contrasena).distinct()).all()
+    assert len(contrasenas) == 1
+    assert verificar_contrasena(CONTRASENA, contrasenas[0])
+
+    # Los índices de las asistencias se vuelven a crear tras la carga
+    indices = inspect(db.get_bind()).get_indexes(Asistencia.__tablename__)
+    assert {i["name"] for i in indices} == {
+        i.name for i in Asistencia.__table__.indexes
+    }
+
+
+def test_generar_datos_proporciones(db):
+    generar_datos(db.get_bind(), 5000, semilla=2)
+
+    statement = select(Asistencia.estado, func.count()).group_by(Asistencia.estado)
+    recuento = dict(db.exec(statement).all())
+    assert recuento[EstadoAsistencia.presente] > 0.8 * 5000
+    assert recuento[EstadoAsistencia.retraso] > 0
+    assert recuento[EstadoAsistencia.ausente] > 0
+
+
+def test_generar_datos_reproducibles(db):
+    generar_datos(db.get_bind(), 30, semilla=7)
+    ids = db.exec(select(Asistencia.id).order_by(Asistencia.id)).all()
+
+    for modelo in (Asistencia, Clase, Usuario):
+        db.exec(delete(modelo))
+    db.commit()
+
+    generar_datos(db.get_bind(), 30, semilla=7)
+    assert db.exec(select(Asistencia.id).order_by(Asistencia.id)).all() == ids
@@ -0,0 +1,153 @@
+from datetime import date, time, timedelta
+
+import pytest
+from fastapi import HTTPException
+from sqlmodel import select
+
+from database.zone_horary import fecha_madrid
+from models.Asistencia import Asistencia, EstadoAsistencia
+from models.Clase import Clase
+from schemas.horario import ActualizarSesionesHorario, CrearHorario
+from services.horario_service import (
+    actualizar_sesiones_horario_service,
+    cancelar_sesiones_horario_service,
+    crear_horario_service,
+    generar_fechas_horario,
+    obtener_clases_horario_service,
+)
+
+
+def crear_horario_test(**cambios) -> CrearHorario:
+    # Lunes y miércoles de la primera quincena de septiembre de 2100
+    datos = {
+        "nombre": "DAW 1A",
+        "diasSemana": [0, 2],
+        "horaInicio": time(8, 0),
+        "horaFin": time(9, 0),
+        "fechaInicio": date(2100, 9, 1),
+        "fechaFin": date(2100, 9, 15),
+        "festivos": [date(2100, 9, 8)],
+    }
+    return CrearHorario(**{**datos, **cambios})
+
+
+def test_generar_fechas_horario():
+    assert generar_fechas_horario(crear_horario_test()) == [
+        date(2100, 9, 1),
+        date(2100, 9, 6),
+        date(2100, 9, 13),
+        date(2100, 9, 15),
+    ]
+
+
+@pytest.mark.parametrize(
+    "cambios",
+    [
+        {"diasSemana": []},
+        {"diasSemana": [7]},
+        {"horaFin": time(7, 0)},
+        {"fechaFin": date(2100, 8, 31)},
+        {"fechaFin": date(2103, 1, 1)},
+    ],
+)
+def test_generar_fechas_horario_invalido(cambios):
+    with pytest.raises(HTTPException) as excinfo:
+        generar_fechas_horario(crear_horario_test(**cambios))
+    assert excinfo.value.status_code == 400
+
+
+def test_crear_horario_service(db, profesor_test):
+    horario = crear_horario_service(db, crear_horario_test(), profesor_test.id)
+
+    assert horario.clasesCreadas == 4
+    assert horario.festivos == [date(2100, 9, 8)]
+
+    clases = obtener_clases_horario_service(db, horario.id)
+    assert [clase.fecha.date() for clase in clases] == [
+        date(2100, 9, 1),
+        date(2100, 9, 6),
+        date(2100, 9, 13),
+        date(2100, 9, 15),
+    ]
+    assert all(clase.profesorId == profesor_test.id for clase in clases)
+
+
+def test_actualizar_y_cancelar_sesiones_horario(db, profesor_test, estudiante_test):
+    horario = crear_horario_service(db, crear_horario_test(), profesor_test.id)
+    desde = date(2100, 9, 10)
+
+    resultado = actualizar_sesiones_horario_service(
+        db,
+        horario.id,
+        profesor_test.id,
+        ActualizarSesionesHorario(horaInicio=time(8, 30)),
+        desde,
+    )
+    assert resultado.sesiones == 2
+
+    horas = db.exec(
+        select(Clase.horaInicio)
+        .where(Clase.horarioId == horario.id)
+        .order_by(Clase.fecha)
+    ).all()
+    assert horas == [time(8, 0), time(8, 0), time(8, 30), time(8, 30)]
+
+    # La hora de fin no puede quedar antes de la de inicio
+    with pytest.raises(HTTPException) as excinfo:
+        actualizar_sesiones_horario_service(
+            db,
+            horario.id,
+            profesor_test.id,
+            ActualizarSesionesHorario(horaFin=time(8, 0)),
+            desde,
+        )
+    assert excinfo.value.status_code == 400
+
+    ultima = obtener_clases_horario_service(db, horario.id)[-1]
+    db.add(
+        Asistencia(
+            usuarioId=estudiante_test.id,
+            claseId=ultima.id,
+            estado=EstadoAsistencia.presente,
+        )
+    )
+    db.commit()
+
+    resultado = cancelar_sesiones_horario_service(
+        db, horario.id, profesor_test.id, desde
+    )
+    assert resultado.sesiones == 2
+    assert len(obtener_clases_horario_service(db, horario.id)) == 2
+    assert db.exec(select(Asistencia)).all() == []
+
+
+def test_horario_no_existe(db):
+    with pytest.raises(HTTPException) as excinfo:
+        cancelar_sesiones_horario_service(db, "id-inexistente", "id-profesor")
+    assert excinfo.value.status_code == 404
+
+
+def test_sesiones_horario_otro_profesor_o_fecha_pasada(db, profesor_test):
+    horario = crear_horario_service(db, crear_horario_test(), profesor_test.id)
+    datos = ActualizarSesionesHorario(nombre="DAW 1B")
+
+    # Solo el profesor del horario puede modificar o cancelar sus sesiones
+    with pytest.raises(HTTPException) as excinfo:
+        actualizar_sesiones_horario_service(db, horario.id, "otro-profesor", datos)
+    assert excinfo.value.status_code == 403
+    with pytest.raises(HTTPException) as excinfo:
+        cancelar_sesiones_horario_service(db, horario.id, "otro-profesor")
+    assert excinfo.value.status_code == 403
+
+    # Las sesiones ya impartidas no se modifican ni se cancelan
+    ayer = fecha_madrid() - timedelta(days=1)
+    with pytest.raises(HTTPException) as excinfo:
+        actualizar_sesiones_horario_service(
+            db, horario.id, profesor_test.id, datos, ayer
+        )
+    assert excinfo.value.status_code == 400
+    with pytest.raises(HTTPException) as excinfo:
+        cancelar_sesiones_horario_service(db, horario.id, profesor_test.id, ayer)
+    assert excinfo.value.status_code == 400
+
+    assert len(obtener_clases_horario_service(db, horario.id)) == 4
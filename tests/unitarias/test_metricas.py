@@ -0,0 +1,147 @@
+import asyncio
+import logging
+from time import perf_counter
+
+import pytest
+from sqlalchemy import create_engine, text
+from sqlalchemy.exc import OperationalError
+
+from services.metricas import (
+    CUBETAS_DURACION,
+    UMBRAL_N_MAS_1,
+    EstadisticasBd,
+    Histograma,
+    Metricas,
+    estadisticas_bd,
+    instrumentar_engine,
+)
+
+
+def test_histograma_cubetas_inclusivas():
+    histograma = Histograma((1, 5))
+
+    for valor in (0.5, 1, 3, 10):
+        histograma.observar(valor)
+
+    assert histograma.cuentas == [2, 1, 1]
+    assert histograma.suma == 14.5
+    assert histograma.total == 4
+
+
+def test_exportar_formato_prometheus():
+    registro = Metricas()
+    bd = EstadisticasBd()
+    bd.consultas = 2
+    registro.registrar("GET", "/clases/{id_clase}", 200, 0.02, bd)
+    registro.registrar("GET", "/clases/{id_clase}", 200, 20.0, bd)
+
+    async def exportar():
+        # La ocupación del pool de hilos se lee desde el bucle de eventos
+        return registro.exportar()
+
+    lineas = asyncio.run(exportar()).splitlines()
+    etiquetas = 'metodo="GET",ruta="/clases/{id_clase}"'
+
+    assert "# TYPE http_duracion_peticion_segundos histogram" in lineas
+    assert f'http_peticiones_total{{{etiquetas},codigo="200"}} 2' in lineas
+    # Cubetas acumuladas: 0.02 entra a partir de 0.025, 20 solo en +Inf
+    assert (
+        f'http_duracion_peticion_segundos_bucket{{{etiquetas},le="0.01"}} 0' in lineas
+    )
+    assert (
+        f'http_duracion_peticion_segundos_bucket{{{etiquetas},le="0.025"}} 1' in lineas
+    )
+    assert (
+        f'http_duracion_peticion_segundos_bucket{{{etiquetas},le="10.0"}} 1' in lineas
+    )
+    assert (
+        f'http_duracion_peticion_segundos_bucket{{{etiquetas},le="+Inf"}} 2' in lineas
+    )
+    assert f"http_consultas_bd_peticion_sum{{{etiquetas}}} 4.0" in lineas
+    assert (
+        sum(
+            linea.startswith("http_duracion_peticion_segundos_bucket")
+            for linea in lineas
+        )
+        == len(CUBETAS_DURACION) + 1
+    )
+
+
+def test_instrumentar_engine_cuenta_sentencias_de_la_peticion():
+    engine = create_engine("sqlite://")
+    instrumentar_engine(engine)
+
+    bd = EstadisticasBd()
+    token = estadisticas_bd.set(bd)
+    try:
+        with engine.connect() as conexion:
+            conexion.execute(text("SELECT 1"))
+            conexion.execute(text("SELECT 2"))
+    finally:
+        estadisticas_bd.reset(token)
+
+    assert bd.consultas == 2
+    assert bd.tiempo > 0
+
+    # Fuera de una petición no se registra nada
+    with engine.connect() as conexion:
+        conexion.execute(text("SELECT 1"))
+    assert bd.consultas == 2
+
+
+def test_instrumentar_engine_con_sentencias_fallidas():
+    engine = create_engine("sqlite://")
+    instrumentar_engine(engine)
+
+    bd = EstadisticasBd()
+    token = estadisticas_bd.set(bd)
+    try:
+        with engine.connect() as conexion:
+            for _ in range(3):
+                with pytest.raises(OperationalError):
+                    conexion.execute(text("SELECT * FROM no_existe"))
+
+            # Una sentencia fallida no deja su inicio pendiente en la conexión
+            inicio = perf_counter()
+            conexion.execute(text("SELECT 1"))
+            duracion = perf_counter() - inicio
+            assert conexion.info == {}
+    finally:
+        estadisticas_bd.reset(token)
+
+    assert bd.consultas == 1
+    assert 0 < bd.tiempo <= duracion
+    assert list(bd.sentencias) == ["SELECT 1"]
+
+
+def test_sentencias_repetidas_y_agregar():
+    peticion = EstadisticasBd()
+    peticion.consultas = 12
+    peticion.sentencias = {"SELECT clase WHERE id = ?": 10, "SELECT asistencia": 2}
+
+    total = EstadisticasBd()
+    total.sentencias = {"SELECT asistencia": 1}
+    total.agregar(peticion)
+
+    assert total.consultas == 12
+    assert total.sentencias == {"SELECT clase WHERE id = ?": 10, "SELECT asistencia": 3}
+    assert total.repetidas(10) == [("SELECT clase WHERE id = ?", 10)]
+    assert total.repetidas(3) == [
+        ("SELECT clase WHERE id = ?", 10),
+        ("SELECT asistencia", 3),
+    ]
+
+
+def test_registrar_detecta_n_mas_1(caplog):
+    registro = Metricas()
+    bd = EstadisticasBd()
+    bd.consultas = UMBRAL_N_MAS_1 + 1
+    bd.sentencias = {"SELECT usuario WHERE id = ?": UMBRAL_N_MAS_1, "SELECT 1": 1}
+
+    with caplog.at_level(logging.WARNING, logger="services.metricas"):
+        registro.registrar("GET", "/clases/", 200, 0.01, bd)
+        registro.registrar("GET", "/clases/", 200, 0.01, EstadisticasBd())
+
+    assert registro.rutas[("GET", "/clases/")].n_mas_1 == 1
+    assert "Posible N+1 en GET /clases/" in caplog.text
+    assert "SELECT usuario WHERE id = ?" in caplog.text
@@ -0,0 +1,176 @@
+import json
+import os
+import subprocess
+import sys
+
+from sqlalchemy import create_engine, inspect, text
+from sqlalchemy.pool import StaticPool
+from sqlmodel import SQLModel
+
+from database import migraciones
+from database.migraciones import MIGRACIONES, Migracion, migraciones_pendientes, migrar
+
+
+def test_migrar_crea_indices_en_tabla_existente():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    # Tabla de asistencias creada por una versión anterior, sin índices
+    with engine.begin() as conexion:
+        conexion.execute(
+            text(
+                "CREATE TABLE asistencia (id VARCHAR PRIMARY KEY, fecha DATETIME, "
+                "estado VARCHAR, usuarioId VARCHAR, claseId VARCHAR)"
+            )
+        )
+        conexion.execute(
+            text(
+                "INSERT INTO asistencia VALUES "
+                "('a1', '2025-09-21 08:00:00', 'ausente', 'u1', 'c1'), "
+                "('a2', '2025-09-21 08:05:00', 'retraso', 'u1', 'c1'), "
+                "('a3', '2025-09-21 08:00:00', 'presente', 'u2', 'c1')"
+            )
+        )
+
+    assert migrar(engine) == list(MIGRACIONES)
+
+    indices = {indice["name"] for indice in inspect(engine).get_indexes("asistencia")}
+    assert {
+        "uq_asistencia_clase_usuario",
+        "ix_asistencia_usuario_fecha",
+        "ix_asistencia_clase_fecha",
+    } <= indices
+
+    # Se conserva la asistencia más reciente de cada usuario en la clase
+    with engine.connect() as conexion:
+        ids = conexion.execute(text("SELECT id FROM asistencia ORDER BY id")).all()
+    assert [fila.id for fila in ids] == ["a2", "a3"]
+
+    # La versión queda registrada y ejecutarla de nuevo no aplica nada
+    assert migraciones_pendientes(engine) == []
+    assert migrar(engine) == []
+
+
+def test_migrar_agrega_columnas_en_tabla_existente():
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    # Tabla de clases creada por una versión anterior, sin horarioId
+    with engine.begin() as conexion:
+        conexion.execute(
+            text(
+                "CREATE TABLE clase (id VARCHAR PRIMARY KEY, nombre VARCHAR(50), "
+                "fecha DATETIME, horaInicio TIME, horaFin TIME, profesorId VARCHAR)"
+            )
+        )
+        conexion.execute(
+            text(
+                "INSERT INTO clase VALUES "
+                "('c1', 'DAW', '2025-09-21 00:00:00', '08:00', '09:00', 'p1')"
+            )
+        )
+
+    assert migrar(engine) == list(MIGRACIONES)
+
+    columnas = {columna["name"] for columna in inspect(engine).get_columns("clase")}
+    assert "horarioId" in columnas
+    indices = {indice["name"] for indice in inspect(engine).get_indexes("clase")}
+    assert "ix_clase_horarioId" in indices
+
+    with engine.connect() as conexion:
+        fila = conexion.execute(text('SELECT id, "horarioId" FROM clase')).one()
+    assert tuple(fila) == ("c1", None)
+
+
+def test_migrar_hasta_version_y_estado(monkeypatch, capsys):
+    engine = create_engine(
+        "sqlite:///:memory:",
+        connect_args={"check_same_thread": False},
+        poolclass=StaticPool,
+    )
+
+    def crear_tabla_notas(conexion):
+        conexion.execute(text("CREATE TABLE IF NOT EXISTS nota (id VARCHAR)"))
+
+    nueva = Migracion(len(MIGRACIONES) + 1, "tabla_notas", crear_tabla_notas)
+    monkeypatch.setattr(migraciones, "MIGRACIONES", (*MIGRACIONES, nueva))
+
+    assert migrar(engine, hasta=2) == list(MIGRACIONES[:2])
+    assert not inspect(engine).has_table("horario")
+    assert migrar(engine, hasta=len(MIGRACIONES)) == list(MIGRACIONES[2:])
+    assert migraciones_pendientes(engine) == [nueva]
+    assert not inspect(engine).has_table("nota")
+
+    assert migrar(engine) == [nueva]
+    assert inspect(engine).has_table("nota")
+
+    with engine.connect() as conexion:
+        versiones = conexion.execute(
+            text("SELECT version, nombre FROM version_esquema ORDER BY version")
+        ).all()
+    assert [tuple(fila) for fila in versiones] == [
+        (1, "tablas_base"),
+        (2, "indices_asistencia"),
+        (3, "horarios"),
+        (4, "tablas_versiones"),
+        (5, "indices_filtros"),
+        (6, "tabla_notas"),
+    ]
+
+    # La línea de comandos informa de las pendientes sin aplicarlas
+    monkeypatch.setattr("database.connection.obtener_engine", lambda: engine)
+    migraciones.main(["--estado"])
+    assert json.loads(capsys.readouterr().out) == {"pendientes": []}
+
+
+def test_migraciones_crean_el_esquema_de_los_modelos():
+    # Un cambio en los modelos sin su migración hace fallar esta prueba
+    engine = create_engine("sqlite://", poolclass=StaticPool)
+    migrar(engine)
+    migrado = inspect(engine)
+
+    esperado_engine = create_engine("sqlite://", poolclass=StaticPool)
+    SQLModel.metadata.create_all(esperado_engine)
+    esperado = inspect(esperado_engine)
+
+    def esquema(inspector, tabla):
+        columnas = {
+            c["name"]: (str(c["type"]), c["nullable"])
+            for c in inspector.get_columns(tabla)
+        }
+        indices = {
+            i["name"]: (tuple(i["column_names"]), bool(i["unique"]))
+            for i in inspector.get_indexes(tabla)
+        }
+        claves = {
+            (tuple(f["constrained_columns"]), f["referred_table"])
+            for f in inspector.get_foreign_keys(tabla)
+        }
+        return columnas, indices, claves
+
+    tablas = set(migrado.get_table_names()) - {"version_esquema"}
+    assert tablas == set(esperado.get_table_names())
+    for tabla in tablas:
+        assert esquema(migrado, tabla) == esquema(esperado, tabla), tabla
+
+
+def test_importar_la_aplicacion_no_toca_la_base_de_datos(tmp_path):
+    # Importar main (y arrancar un trabajador) no crea tablas ni el fichero
+    ruta = tmp_path / "sin_migrar.db"
+    entorno = {**os.environ, "DATABASE_URL": f"sqlite:///{ruta}"}
+    entorno.pop("DATABASE_ASYNC_URL", None)
+
+    subprocess.run(
+        [sys.executable, "-c", "import main"],
+        cwd=os.path.dirname(os.path.dirname(os.path.dirname(__file__))),
+        env=entorno,
+        check=True,
+    )
+
+    assert not ruta.exists()
@@ -0,0 +1,83 @@
+from datetime import date, datetime
+
+from sqlalchemy import event
+
+from models.Asistencia import EstadoAsistencia
+from services.asistencia_service import obtener_asistencia_service
+from services.clase_service import obtener_clases_service
+
+
+def planes(db, funcion) -> list[str]:
+    # Ejecuta la función y devuelve el EXPLAIN QUERY PLAN de cada sentencia
+    # que ejecuta, con los mismos parámetros
+    sentencias = []
+    engine = db.get_bind()
+
+    def capturar(conexion, cursor, statement, parameters, context, many):
+        sentencias.append((statement, parameters))
+
+    event.listen(engine, "before_cursor_execute", capturar)
+    try:
+        funcion()
+    finally:
+        event.remove(engine, "before_cursor_execute", capturar)
+
+    conexion = db.connection()
+    return [
+        " | ".join(
+            fila[-1]
+            for fila in conexion.exec_driver_sql(
+                f"EXPLAIN QUERY PLAN {statement}", parameters
+            )
+        )
+        for statement, parameters in sentencias
+    ]
+
+
+def test_plan_clases_por_fechas(db):
+    (plan,) = planes(
+        db,
+        lambda: obtener_clases_service(
+            db, desde=date(2025, 10, 1), hasta=date(2025, 10, 31)
+        ),
+    )
+
+    assert "USING INDEX ix_clase_fecha" in plan
+    assert "SCAN clase" not in plan
+
+
+def test_plan_clases_por_profesor_y_fechas(db, profesor_test):
+    (plan,) = planes(
+        db,
+        lambda: obtener_clases_service(
+            db, id_profesor=profesor_test.id, desde=date(2025, 10, 1)
+        ),
+    )
+
+    assert "USING INDEX ix_clase_profesor_fecha (profesorId=? AND fecha>?)" in plan
+    assert "SCAN clase" not in plan
+
+
+def test_plan_asistencias_por_fechas_y_estado(db):
+    (plan,) = planes(
+        db,
+        lambda: obtener_asistencia_service(
+            db,
+            desde=datetime(2025, 10, 6),
+            hasta=datetime(2025, 10, 12),
+            estado=EstadoAsistencia.ausente,
+        ),
+    )
+
+    assert "USING INDEX ix_asistencia_fecha" in plan
+    assert "SCAN asistencia" not in plan
+
+
+def test_plan_asistencias_por_profesor(db, profesor_test):
+    (plan,) = planes(
+        db,
+        lambda: obtener_asistencia_service(db, id_profesor=profesor_test.id),
+    )
+
+    assert "USING COVERING INDEX ix_clase_profesor_fecha" in plan
+    assert "SCAN" not in plan
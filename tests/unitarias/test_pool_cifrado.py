@@ -0,0 +1,45 @@
+import asyncio
+
+from fastapi import HTTPException
+
+from services.pool_cifrado import PoolCifrado
+from services.usuario_services import cifrar_contrasena, verificar_contrasena
+
+
+def test_pool_cifrado_en_procesos():
+    pool = PoolCifrado(trabajadores=2, max_pendientes=4)
+
+    async def cifrar_y_verificar():
+        cifrada = await pool.ejecutar(cifrar_contrasena, "password123")
+        return await asyncio.gather(
+            pool.ejecutar(verificar_contrasena, "password123", cifrada),
+            pool.ejecutar(verificar_contrasena, "incorrecta", cifrada),
+        )
+
+    try:
+        assert asyncio.run(cifrar_y_verificar()) == [True, False]
+        assert pool.pendientes == 0
+    finally:
+        pool.cerrar()
+
+
+def test_pool_cifrado_saturado():
+    pool = PoolCifrado(trabajadores=0, max_pendientes=1)
+
+    async def cifrar_dos_a_la_vez():
+        return await asyncio.gather(
+            pool.ejecutar(cifrar_contrasena, "uno"),
+            pool.ejecutar(cifrar_contrasena, "dos"),
+            return_exceptions=True,
+        )
+
+    primero, segundo = asyncio.run(cifrar_dos_a_la_vez())
+
+    assert verificar_contrasena("uno", primero)
+    assert isinstance(segundo, HTTPException)
+    assert segundo.status_code == 503
+    assert pool.pendientes == 0
+
+    # Una vez libre, el pool vuelve a aceptar operaciones
+    cifrada = asyncio.run(pool.ejecutar(cifrar_contrasena, "tres"))
+    assert verificar_contrasena("tres", cifrada)
@@ -0,0 +1,83 @@
+import pytest
+from fastapi import HTTPException
+from sqlmodel import select
+
+from models.Usuario import RolUsuario, Usuario
+from services.sentencias import (
+    actualizar_fila,
+    admite_returning,
+    eliminar_fila,
+    insertar_fila,
+)
+from services.usuario_services import desactivar_usuario
+
+
+@pytest.fixture(params=[True, False], ids=["returning", "sin_returning"])
+def returning(request, db, monkeypatch):
+    # Sin RETURNING se simula un motor como MySQL
+    dialecto = db.get_bind().dialect
+    for atributo in ("insert_returning", "update_returning", "delete_returning"):
+        monkeypatch.setattr(dialecto, atributo, request.param)
+    return request.param
+
+
+def test_escrituras_con_y_sin_returning(db, returning):
+    assert admite_returning(db) is returning
+
+    usuario = insertar_fila(
+        db,
+        Usuario(
+            nombre="Ana",
+            apellido="García",
+            correoElectronico="ana@test.com",
+            contrasena="hashed_password",
+            rol=RolUsuario.estudiante,
+        ),
+    )
+    assert usuario.activo is True
+
+    condiciones = [Usuario.id == usuario.id, Usuario.activo]
+    actualizado = actualizar_fila(
+        db, Usuario, condiciones, {"nombre": "Eva"}, "No encontrado"
+    )
+    assert (actualizado.id, actualizado.nombre) == (usuario.id, "Eva")
+
+    # La actualización puede cambiar las columnas de sus propias condiciones
+    # (desactivar un usuario filtra por activo y lo pone a False)
+    desactivado = actualizar_fila(
+        db, Usuario, condiciones, {"activo": False}, "No encontrado"
+    )
+    assert (desactivado.id, desactivado.activo) == (usuario.id, False)
+    with pytest.raises(HTTPException) as exc_info:
+        actualizar_fila(db, Usuario, condiciones, {"activo": False}, "No")
+    assert exc_info.value.status_code == 404
+    condiciones = [Usuario.id == usuario.id]
+
+    eliminado = eliminar_fila(db, Usuario, condiciones, "No encontrado")
+    assert eliminado.nombre == "Eva"
+    assert db.exec(select(Usuario)).all() == []
+
+    # Ninguna fila cumple las condiciones
+    for escribir in (
+        lambda: actualizar_fila(db, Usuario, condiciones, {"nombre": "X"}, "No"),
+        lambda: eliminar_fila(db, Usuario, condiciones, "No"),
+    ):
+        with pytest.raises(HTTPException) as exc_info:
+            escribir()
+        assert exc_info.value.status_code == 404
+
+
+def test_desactivar_usuario_con_y_sin_returning(db, returning):
+    usuario = Usuario(
+        nombre="Ana",
+        apellido="García",
+        correoElectronico="ana_desactivar@test.com",
+        contrasena="hashed_password",
+        rol=RolUsuario.estudiante,
+    )
+    db.add(usuario)
+    db.commit()
+
+    assert desactivar_usuario(db, usuario.id).activo is False
+    db.expire_all()
+    assert db.get(Usuario, usuario.id).activo is False
@@ -5,14 +5,22 @@ from fastapi import HTTPException
 
 from models.Usuario import RolUsuario, Usuario
 from schemas.usuario import ActualizarUsuario, CrearUsuario
+from services import revocacion_service
+from services.revocacion_service import (
+    lista_revocacion,
+    obtener_version_token,
+    revocar_tokens,
+)
 from services.usuario_services import (
     actualizar_usuario_id,
     cifrar_contrasena,
     crear_usuario,
+    crear_usuarios_lote,
     desactivar_usuario,
     obtener_usuario_correo_electronico,
     obtener_usuario_id,
     obtener_usuarios,
+    preparar_importacion_usuarios,
     verificar_contrasena,
 )
 
@@ -140,6 +148,35 @@ def test_actualizar_usuario_no_existe(db):
     assert exc_info.value.status_code == 404
 
 
+@pytest.mark.parametrize("on_conflict", [True, False], ids=["upsert", "sin_upsert"])
+def test_cambio_de_rol_revoca_tokens_solo_si_cambia(db, monkeypatch, on_conflict):
+    if not on_conflict:
+        # Sin ON CONFLICT se simula un motor como MySQL
+        monkeypatch.setattr(revocacion_service, "INSERT_ON_CONFLICT", {})
+
+    usuario = crear_usuario(
+        db,
+        CrearUsuario(
+            nombre="Juan",
+            apellido="Pérez",
+            correoElectronico="juan_rol@test.com",
+            contrasena="password123",
+            rol=RolUsuario.estudiante,
+        ),
+    )
+
+    cambio = ActualizarUsuario(rol=RolUsuario.profesor)
+    assert actualizar_usuario_id(db, usuario.id, cambio).rol == RolUsuario.profesor
+    assert obtener_version_token(db, usuario.id) == 1
+
+    # El mismo rol no revoca los tokens
+    actualizar_usuario_id(db, usuario.id, cambio)
+    assert obtener_version_token(db, usuario.id) == 1
+
+    assert revocar_tokens(db, "id-inexistente") is None
+    assert revocar_tokens(db, usuario.id) == 2
+
+
 def test_desactivar_usuario(db):
     id = str(uuid.uuid4())
     usuario_data = CrearUsuario(
@@ -158,6 +195,28 @@ def test_desactivar_usuario(db):
     assert usuario_encontrado.activo is False
 
 
+def test_revocacion_se_registra_tras_el_commit(db):
+    usuario = crear_usuario(
+        db,
+        CrearUsuario(
+            nombre="Juan",
+            apellido="Pérez",
+            correoElectronico="juan_revocacion@test.com",
+            contrasena="password123",
+            rol=RolUsuario.estudiante,
+        ),
+    )
+
+    # Una revocación deshecha no invalida los tokens en memoria
+    assert revocar_tokens(db, usuario.id) == 1
+    db.rollback()
+    assert lista_revocacion.versiones == {}
+    assert obtener_version_token(db, usuario.id) == 0
+
+    desactivar_usuario(db, usuario.id)
+    assert lista_revocacion.versiones == {usuario.id: 1}
+
+
 def test_desactivar_usuario_no_existe(db):
     with pytest.raises(HTTPException) as exc_info:
         desactivar_usuario(db, "id-inexistente")
@@ -172,3 +231,37 @@ def test_cifrar_y_verificar_contrasena():
     assert hashed != password
     assert verificar_contrasena(password, hashed) is True
     assert verificar_contrasena("password_incorrecto", hashed) is False
+
+
+def test_importar_usuarios_csv_con_duplicados(db):
+    registrado = CrearUsuario(
+        nombre="Ana",
+        apellido="Ruiz",
+        correoElectronico="ana@test.com",
+        contrasena="password123",
+        rol=RolUsuario.estudiante,
+    )
+    crear_usuario(db, registrado)
+    contenido = (
+        "nombre,apellido,correoElectronico,contrasena,rol\n"
+        "Luis,Gómez,luis@test.com,clave1,estudiante\n"
+        "Ana,Ruiz,ana@test.com,clave2,estudiante\n"
+        "Luis,Otro,luis@test.com,clave3,estudiante\n"
+        "Eva,Sanz,eva@test.com,clave4,director\n"
+    )
+
+    usuarios, rechazados = preparar_importacion_usuarios(db, contenido, "csv")
+
+    assert [usuario.correoElectronico for usuario in usuarios] == ["luis@test.com"]
+    assert [(r.fila, r.correoElectronico, r.motivo) for r in rechazados] == [
+        (3, "ana@test.com", "El correo electrónico ya está registrado"),
+        (4, "luis@test.com", "Correo electrónico duplicado en el archivo"),
+        (5, "eva@test.com", "Fila inválida: rol"),
+    ]
+
+    cifradas = [cifrar_contrasena(usuario.contrasena) for usuario in usuarios]
+    assert crear_usuarios_lote(db, usuarios, cifradas) == 1
+
+    importado = obtener_usuario_correo_electronico(db, "luis@test.com")
+    assert importado.nombre == "Luis"
+    assert verificar_contrasena("clave1", importado.contrasena)
@@ -0,0 +1,104 @@
+from datetime import datetime
+
+from fastapi import Request, Response
+from sqlmodel import select
+
+from models.VersionCambio import VersionCambio
+from services.metricas import contar_consultas, instrumentar_engine
+from services.version_cambio_service import (
+    FRAGMENTOS_VERSION,
+    incrementar_version,
+    obtener_version,
+    respuesta_no_modificada,
+)
+
+
+def crear_request(cabeceras: dict) -> Request:
+    return Request(
+        {
+            "type": "http",
+            "method": "GET",
+            "path": "/",
+            "headers": [(k.lower().encode(), v.encode()) for k, v in cabeceras.items()],
+        }
+    )
+
+
+def test_incrementar_version(db):
+    assert obtener_version(db, "clases") == (0, None)
+
+    incrementar_version(db, ["clases", "asistencias"])
+    incrementar_version(db, ["clases"])
+    db.commit()
+
+    version, fecha = obtener_version(db, "clases")
+    assert version == 2
+    assert fecha is not None
+    assert obtener_version(db, "asistencias")[0] == 1
+
+
+def test_incrementar_version_una_sentencia_y_fragmentos(db):
+    # Todas las filas de versión se crean o incrementan en un único upsert,
+    # sin leerlas antes (no hay carrera entre dos primeras escrituras)
+    instrumentar_engine(db.get_bind())
+    with contar_consultas() as bd:
+        incrementar_version(db, ["clases", "asistencias", "asistencias:c1"])
+    assert bd.consultas == 1
+
+    for _ in range(2 * FRAGMENTOS_VERSION):
+        incrementar_version(db, ["clases"])
+    db.commit()
+
+    # La versión global es la suma de sus fragmentos
+    assert obtener_version(db, "clases")[0] == 2 * FRAGMENTOS_VERSION + 1
+    assert obtener_version(db, "asistencias:c1")[0] == 1
+    filas = db.exec(select(VersionCambio.ambito)).all()
+    assert "clases" not in filas
+    assert all(fila.startswith(("clases#", "asistencias")) for fila in filas)
+
+    # La fila sin fragmentar de versiones anteriores sigue contando
+    db.add(VersionCambio(ambito="clases", version=100))
+    db.commit()
+    assert obtener_version(db, "clases")[0] == 2 * FRAGMENTOS_VERSION + 101
+
+
+def test_incrementar_version_sin_commit_no_se_aplica(db):
+    incrementar_version(db, ["clases"])
+    db.rollback()
+
+    assert obtener_version(db, "clases") == (0, None)
+
+
+def test_respuesta_no_modificada():
+    fecha = datetime(2025, 9, 21, 8, 0, 0, 500)
+
+    response = Response()
+    assert (
+        respuesta_no_modificada(crear_request({}), response, "clases", 3, fecha) is None
+    )
+    assert response.headers["etag"] == '"clases-3"'
+    assert response.headers["last-modified"] == "Sun, 21 Sep 2025 08:00:00 GMT"
+
+    actual = crear_request({"If-None-Match": 'W/"clases-2", "clases-3"'})
+    respuesta = respuesta_no_modificada(actual, Response(), "clases", 3, fecha)
+    assert respuesta.status_code == 304
+    assert respuesta.headers["etag"] == '"clases-3"'
+
+    antigua = crear_request({"If-None-Match": '"clases-2"'})
+    assert respuesta_no_modificada(antigua, Response(), "clases", 3, fecha) is None
+
+    # If-None-Match tiene prioridad sobre If-Modified-Since
+    ambas = crear_request(
+        {
+            "If-None-Match": '"clases-2"',
+            "If-Modified-Since": "Sun, 21 Sep 2025 08:00:00 GMT",
+        }
+    )
+    assert respuesta_no_modificada(ambas, Response(), "clases", 3, fecha) is None
+
+    desde = crear_request({"If-Modified-Since": "Sun, 21 Sep 2025 08:00:00 GMT"})
+    respuesta = respuesta_no_modificada(desde, Response(), "clases", 3, fecha)
+    assert respuesta.status_code == 304
+
+    anterior = crear_request({"If-Modified-Since": "Sun, 21 Sep 2025 07:59:59 GMT"})
+    assert respuesta_no_modificada(anterior, Response(), "clases", 3, fecha) is None